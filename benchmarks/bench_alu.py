@@ -0,0 +1,64 @@
+"""
+Benchmark da ULA por tabelas (core/alu.py): tempo de geração e de carga das
+tabelas, memória ocupada e velocidade contra os handlers com flags inline.
+
+Uso: python benchmarks/bench_alu.py [repetições]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core import alu
+from core.assembler import preprocess, first_pass, second_pass
+from core.CPU import CPU
+
+
+def bench_tables():
+    t = time.perf_counter()
+    tables = alu.build_tables()
+    build = time.perf_counter() - t
+
+    path = os.path.join(tempfile.mkdtemp(), "alu_lut.bin")
+    alu.save_tables(tables, path)
+    t = time.perf_counter()
+    alu.read_tables(path)
+    load = time.perf_counter() - t
+
+    print(f"geração das tabelas: {build * 1000:.1f} ms")
+    print(f"carga do cache:      {load * 1000:.2f} ms ({os.path.getsize(path)} bytes em disco)")
+    print(f"memória:             {alu.footprint(tables) / 1024:.0f} KiB")
+
+
+def bench_program(path, reps):
+    lines = path.read_text(encoding='utf-8').splitlines()
+    parsed, labels = first_pass(preprocess(lines))
+    mem, _, code_end = second_pass(parsed, labels)
+    times = {}
+    for engine in ('inline', 'lut'):
+        t = time.perf_counter()
+        for _ in range(reps):
+            cpu = CPU(mem, labels, alu=engine)
+            cpu.program_end = code_end
+            cpu.run()
+        times[engine] = time.perf_counter() - t
+    print(f"{path.name:<22}inline {times['inline']:.3f}s  lut {times['lut']:.3f}s"
+          f"  ({times['inline'] / times['lut']:.2f}x)")
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    bench_tables()
+    alu.lut_handlers()
+    print(f"lut_handlers(): {alu.stats['load_seconds'] * 1000:.1f} ms")
+    print()
+    for path in sorted((ROOT / "code_samples").glob("*.z70")):
+        bench_program(path, reps)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: vazão do montador (linhas por segundo), preprocess + first_pass +
+second_pass contra assemble() em uma passada, nos exemplos de code_samples/
+e num programa grande gerado (perto dos 256 bytes, com muitos rótulos e
+saltos para frente).
+
+Uso: python benchmarks/bench_assembler.py [repetições]
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.assembler import preprocess, first_pass, second_pass, assemble
+
+
+def two_pass(lines):
+    parsed, labels = first_pass(preprocess(lines))
+    mem, listing, code_end = second_pass(parsed, labels)
+    return mem, listing, code_end, labels
+
+
+def generated_program():
+    """~120 instruções misturando modos, rótulos e comentários."""
+    lines = []
+    for k in range(24):
+        lines += [
+            f"L{k}:   // bloco {k}",
+            "    mov A, [I]",
+            f"    add A, {k:02X}H",
+            f"    mov [{0x80 + k:02X}H], A",
+            f"    jz L{k + 1}",
+            "    inc I",
+        ]
+    lines.append("L24: nop")
+    return lines
+
+
+def lines_per_second(fn, lines, reps):
+    n = max(1, 20000 // len(lines))
+    best = float('inf')
+    for _ in range(reps):
+        t = time.perf_counter()
+        for _ in range(n):
+            fn(lines)
+        best = min(best, time.perf_counter() - t)
+    return n * len(lines) / best
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    programs = [(p.stem, p.read_text(encoding='utf-8').splitlines())
+                for p in sorted((ROOT / 'code_samples').glob('*.z70'))]
+    programs.append(('gerado', generated_program()))
+
+    print(f"{'programa':<24}{'linhas':>8}{'3 fases (l/s)':>16}{'assemble (l/s)':>16}{'ganho':>8}")
+    for name, lines in programs:
+        assert assemble(lines) == two_pass(lines), name
+        old = lines_per_second(two_pass, lines, reps)
+        new = lines_per_second(assemble, lines, reps)
+        print(f"{name:<24}{len(lines):>8}{old:>16,.0f}{new:>16,.0f}{new / old:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
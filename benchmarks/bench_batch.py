@@ -0,0 +1,60 @@
+"""
+Benchmark: vazão do modo em lote (core/batch.py) por número de processos,
+num diretório temporário com N cópias variadas dos exemplos, contra um
+processo `python Z70.py` por arquivo (amostra pequena, extrapolada).
+
+Uso: python benchmarks/bench_batch.py [programas]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.batch import find_programs, run_batch
+
+
+def make_programs(directory, n):
+    samples = [p.read_text(encoding='utf-8') for p in sorted((ROOT / 'code_samples').glob('*.z70'))]
+    for k in range(n):
+        # Comentário diferente em cada cópia: nenhum cache reaproveita nada
+        text = f"// programa {k}\n" + samples[k % len(samples)]
+        Path(directory, f"p{k:05d}.z70").write_text(text, encoding='utf-8')
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        make_programs(tmp, n)
+        paths = find_programs([tmp])
+
+        sample = paths[:20]
+        t = time.perf_counter()
+        for path in sample:
+            subprocess.run([sys.executable, str(ROOT / 'Z70.py'), path, '--no-cache'],
+                           capture_output=True, check=True)
+        per_file = (time.perf_counter() - t) / len(sample)
+
+        print(f"{n} programas, {cores} núcleo(s)")
+        print(f"{'modo':<28}{'tempo (s)':>10}{'prog/s':>10}{'ganho':>8}")
+        print(f"{'1 processo por arquivo':<28}{per_file * n:>10.2f}{1 / per_file:>10.0f}{'1.0x':>8}")
+        jobs = 1
+        while True:
+            t = time.perf_counter()
+            for _ in run_batch(paths, jobs=jobs):
+                pass
+            elapsed = time.perf_counter() - t
+            print(f"{f'--batch --jobs {jobs}':<28}{elapsed:>10.2f}{n / elapsed:>10.0f}"
+                  f"{per_file * n / elapsed:>7.1f}x")
+            if jobs >= cores:
+                break
+            jobs = min(jobs * 2, cores)
+
+
+if __name__ == '__main__':
+    main()
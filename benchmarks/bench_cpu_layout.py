@@ -0,0 +1,76 @@
+"""
+Benchmark do layout da CPU: bytes por instância e tempo de criação.
+
+Cria milhares de CPUs com o mesmo programa (como nos workers de correção) e
+mede com tracemalloc a memória ocupada por instância, antes e depois de
+executar (o cache de decodificação só é alocado na primeira execução).
+Também compara a leitura da memória por memory_view() com a cópia em lista.
+
+Uso: python benchmarks/bench_cpu_layout.py [instâncias]
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.assembler import preprocess, first_pass, second_pass
+from core.CPU import CPU
+
+
+def assemble(path):
+    lines = path.read_text(encoding='utf-8').splitlines()
+    parsed, labels = first_pass(preprocess(lines))
+    mem, _, code_end = second_pass(parsed, labels)
+    return mem, labels, code_end
+
+
+def per_instance(n, mem, labels, code_end, run):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    t = time.perf_counter()
+    cpus = []
+    for _ in range(n):
+        cpu = CPU(mem, labels)
+        cpu.program_end = code_end
+        cpus.append(cpu)
+    elapsed = time.perf_counter() - t
+    if run:
+        for cpu in cpus:
+            cpu.run()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # A lista que guarda as CPUs não conta
+    return (size - sys.getsizeof(cpus)) / n, elapsed / n
+
+
+def bench_export(mem, labels, reps=20000):
+    cpu = CPU(mem, labels)
+    t = time.perf_counter()
+    for _ in range(reps):
+        list(cpu.mem)
+    copy = (time.perf_counter() - t) / reps
+    t = time.perf_counter()
+    for _ in range(reps):
+        cpu.memory_view()
+    view = (time.perf_counter() - t) / reps
+    print(f"export da memória: cópia {copy * 1e6:.2f} us, memory_view {view * 1e6:.2f} us")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    path = sorted((ROOT / "code_samples").glob("*.z70"))[0]
+    mem, labels, code_end = assemble(path)
+
+    print(f"{n} instâncias de {path.name}")
+    size, create = per_instance(n, mem, labels, code_end, run=False)
+    print(f"nova:        {size:8.0f} bytes/instância  criação {create * 1e6:6.2f} us")
+    size, _ = per_instance(n, mem, labels, code_end, run=True)
+    print(f"executada:   {size:8.0f} bytes/instância")
+    bench_export(mem, labels)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: handlers especializados (core/codegen.py) x handlers de referência
+(get_loc_val/set_loc_val) de core/CPU.py.
+
+Uso: python benchmarks/bench_handlers.py [repetições]
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.arch import DECODE_TABLE, OPCODES
+from core.assembler import preprocess, first_pass, second_pass
+from core.codegen import BYTE_HANDLERS
+from core.CPU import CPU, BINARY_HANDLERS, UNARY_HANDLERS
+
+
+def reference_step(cpu):
+    """Passo com decodificação e handlers genéricos (comportamento original)."""
+    instr_byte = cpu.mem[cpu.PC]
+    cpu.PC += 1
+    if instr_byte == 0xFF:
+        return
+    if 0xA0 <= instr_byte <= 0xA5:
+        addr = cpu.mem[cpu.PC]
+        cpu.PC += 1
+        take = [True, cpu.get_flag('ZF'), cpu.get_flag('SF'), cpu.get_flag('CF'),
+                cpu.get_flag('OF'), cpu.get_flag('PF')][instr_byte - 0xA0]
+        if take:
+            cpu.PC = addr
+        return
+    _, dst, src, size = DECODE_TABLE[instr_byte]
+    extra = None
+    if size == 2:
+        extra = cpu.mem[cpu.PC]
+        cpu.PC += 1
+    dst = (dst[0], extra) if dst[1] == 'extra' else dst
+    if src is None:
+        UNARY_HANDLERS[instr_byte >> 4](cpu, dst)
+    else:
+        src = (src[0], extra) if src[1] == 'extra' else src
+        BINARY_HANDLERS[instr_byte >> 4](cpu, dst, src)
+
+
+def bench_instructions(reps):
+    print(f"{'byte':<6}{'instr':<8}{'ref (ns)':>10}{'gen (ns)':>10}{'ganho':>8}")
+    total_ref = total_gen = 0.0
+    for b, entry in enumerate(DECODE_TABLE):
+        if not entry or entry[0] not in OPCODES:
+            continue
+        mnemon, dst, src, _ = entry
+        cpu = CPU([0] * 256, {})
+        rdst = (dst[0], 0x90) if dst[1] == 'extra' else dst
+        rsrc = (src[0], 0x90) if src and src[1] == 'extra' else src
+
+        if src is None:
+            h, args = UNARY_HANDLERS[b >> 4], (cpu, rdst)
+        else:
+            h, args = BINARY_HANDLERS[b >> 4], (cpu, rdst, rsrc)
+        t = time.perf_counter()
+        for _ in range(reps):
+            h(*args)
+        ref = (time.perf_counter() - t) / reps * 1e9
+
+        g = BYTE_HANDLERS[b]
+        t = time.perf_counter()
+        for _ in range(reps):
+            g(cpu, 0x90)
+        gen = (time.perf_counter() - t) / reps * 1e9
+
+        total_ref += ref
+        total_gen += gen
+        print(f"{b:02X}H   {mnemon:<8}{ref:>10.0f}{gen:>10.0f}{ref / gen:>7.1f}x")
+    print(f"média: {total_ref / total_gen:.1f}x")
+
+
+def bench_program(path, reps):
+    lines = path.read_text(encoding='utf-8').splitlines()
+    parsed, labels = first_pass(preprocess(lines))
+    mem, _, code_end = second_pass(parsed, labels)
+
+    t = time.perf_counter()
+    for _ in range(reps):
+        cpu = CPU(mem, labels)
+        while cpu.PC < code_end:
+            reference_step(cpu)
+    ref = time.perf_counter() - t
+
+    t = time.perf_counter()
+    for _ in range(reps):
+        cpu = CPU(mem, labels)
+        cpu.program_end = code_end
+        cpu.run()
+    gen = time.perf_counter() - t
+
+    print(f"{path.name:<22}ref {ref:.3f}s  run() {gen:.3f}s  ({ref / gen:.1f}x)")
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    bench_instructions(reps)
+    print()
+    for path in sorted((ROOT / "code_samples").glob("*.z70")):
+        bench_program(path, max(reps // 20, 1))
+
+
+if __name__ == '__main__':
+    main()
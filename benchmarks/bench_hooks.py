@@ -0,0 +1,74 @@
+"""
+Benchmark: custo dos ganchos de instrumentação (core/hooks.py) por tipo,
+contra um run() sem ganchos. Cada gancho é uma função vazia, então o tempo
+a mais é o do laço especializado mais a chamada.
+
+Uso: python benchmarks/bench_hooks.py [repetições]
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.assembler import preprocess, first_pass, second_pass
+from core.CPU import CPU
+from core.hooks import HOOK_KINDS
+
+# Laço com leitura, escrita em memória e saltos condicionais
+PROGRAM = """
+    mov B, 40H
+OUTER:
+    mov A, FFH
+    mov I, 80H
+INNER:
+    mov [I], A
+    cmp A, [I]
+    dec A
+    jz NEXT
+    jmp INNER
+NEXT:
+    dec B
+    jz END
+    jmp OUTER
+END:
+    nop
+"""
+
+
+def noop(*args):
+    pass
+
+
+def time_run(mem, labels, code_end, kinds, reps):
+    best = float('inf')
+    for _ in range(reps):
+        cpu = CPU(mem, labels)
+        cpu.program_end = code_end
+        for kind in kinds:
+            cpu.add_hook(kind, noop)
+        t = time.perf_counter()
+        outcome = cpu.run()
+        best = min(best, time.perf_counter() - t)
+    return best, outcome.steps
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    parsed, labels = first_pass(preprocess(PROGRAM.splitlines()))
+    mem, _, code_end = second_pass(parsed, labels)
+
+    base, _ = time_run(mem, labels, code_end, (), reps)
+    _, steps = time_run(mem, labels, code_end, ('pre_step',), 1)
+    print(f"{steps} instruções por execução (melhor de {reps})")
+    print(f"{'ganchos':<48}{'tempo (s)':>10}{'ns/instr.':>11}{'custo':>8}")
+    print(f"{'run() sem ganchos':<48}{base:>10.3f}{base / steps * 1e9:>11.0f}{'1.0x':>8}")
+    for kinds in [(k,) for k in HOOK_KINDS] + [HOOK_KINDS]:
+        t, _ = time_run(mem, labels, code_end, kinds, reps)
+        name = ' + '.join(kinds)
+        print(f"{name:<48}{t:>10.3f}{t / steps * 1e9:>11.0f}{t / base:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark do JIT de blocos (core/jit.py) contra o interpretador step()/run().
+
+Mostra instruções por segundo em cada motor, nos exemplos de code_samples e
+em laços sintéticos longos.
+
+Uso: python benchmarks/bench_jit.py
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.assembler import preprocess, first_pass, second_pass
+from core.CPU import CPU
+from core.jit import BlockJIT
+
+SYNTHETIC = {
+    "nested_loops": """
+        mov B, FFH
+    OUTER:
+        mov A, FFH
+    INNER:
+        dec A
+        jz NEXT
+        jmp INNER
+    NEXT:
+        dec B
+        jz END
+        jmp OUTER
+    END:
+        nop
+    """,
+    "memory_fill": """
+        mov B, 80H
+    PASS:
+        mov I, 80H
+        mov A, B
+    FILL:
+        mov [I], A
+        add [I], 03H
+        inc I
+        cmp I, FFH
+        jz NEXT
+        jmp FILL
+    NEXT:
+        dec B
+        jz END
+        jmp PASS
+    END:
+        nop
+    """,
+}
+
+
+def assemble(src):
+    parsed, labels = first_pass(preprocess(src.splitlines()))
+    mem, _, code_end = second_pass(parsed, labels)
+    return mem, labels, code_end
+
+
+def new_cpu(image):
+    mem, labels, code_end = image
+    cpu = CPU(mem, labels)
+    cpu.program_end = code_end
+    return cpu
+
+
+def run_steps(cpu):
+    n = 0
+    while cpu.PC < cpu.program_end:
+        cpu.step()
+        n += 1
+    return n
+
+
+def timed(fn, image, reps):
+    t = time.perf_counter()
+    for _ in range(reps):
+        fn(new_cpu(image))
+    return (time.perf_counter() - t) / reps
+
+
+def bench(name, src):
+    image = assemble(src)
+    count = run_steps(new_cpu(image))
+    reps = max(1, 200000 // max(count, 1))
+    engines = {
+        "step": run_steps,
+        "run": lambda cpu: cpu.run(),
+        "jit": lambda cpu: BlockJIT(cpu).run(),
+    }
+    times = {k: timed(fn, image, reps) for k, fn in engines.items()}
+    ips = {k: count / t for k, t in times.items()}
+    print(f"{name:<16}{count:>9}  " + "  ".join(f"{k} {v / 1e6:6.2f}M/s" for k, v in ips.items())
+          + f"  jit/step {times['step'] / times['jit']:5.1f}x")
+
+
+def main():
+    print(f"{'programa':<16}{'instr.':>9}")
+    for path in sorted((ROOT / "code_samples").glob("*.z70")):
+        bench(path.stem, path.read_text(encoding="utf-8"))
+    for name, src in SYNTHETIC.items():
+        bench(name, src)
+
+
+if __name__ == '__main__':
+    main()
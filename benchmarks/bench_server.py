@@ -0,0 +1,64 @@
+"""
+Benchmark: latência por programa pequeno no emulador residente
+(`Z70.py serve`, core/server.py) por stdin/stdout, contra um processo
+`python Z70.py` por programa.
+
+Uso: python benchmarks/bench_server.py [pedidos]
+"""
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+SOURCE = (ROOT / 'code_samples' / 'max_of_three.z70').read_text(encoding='utf-8')
+
+
+def daemon_latencies(n):
+    proc = subprocess.Popen([sys.executable, str(ROOT / 'Z70.py'), 'serve'],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    times = []
+    try:
+        for k in range(n):
+            req = {'jsonrpc': '2.0', 'id': k, 'method': 'run',
+                   'params': {'source': SOURCE, 'dump': [0x80, 0x83]}}
+            t = time.perf_counter()
+            proc.stdin.write(json.dumps(req) + '\n')
+            proc.stdin.flush()
+            resp = json.loads(proc.stdout.readline())
+            times.append(time.perf_counter() - t)
+            assert 'result' in resp, resp
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return times[10:]     # descarta o aquecimento
+
+
+def subprocess_latencies(n, path):
+    times = []
+    for _ in range(n):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, str(ROOT / 'Z70.py'), str(path), '80H-83H', '--no-cache'],
+                       capture_output=True, check=True)
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'modo':<28}{'mediana (ms)':>14}{'p99 (ms)':>10}")
+    for name, times in [
+        ("Z70.py serve (stdio)", daemon_latencies(n)),
+        ("python Z70.py por programa", subprocess_latencies(20, ROOT / 'code_samples' / 'max_of_three.z70')),
+    ]:
+        times.sort()
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        print(f"{name:<28}{statistics.median(times) * 1e3:>14.3f}{p99 * 1e3:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
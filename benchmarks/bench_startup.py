@@ -0,0 +1,86 @@
+"""
+Benchmark: partida de `python Z70.py programa` (importações e tempo total),
+contra um interpretador vazio (`python -c pass`).
+
+Mostra os módulos mais caros do `-X importtime` e sai com código 1 se o
+tempo de importação do Z70.py passar de BUDGET_MS, para uso em CI.
+
+Uso: python benchmarks/bench_startup.py [execuções]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+SAMPLE = ROOT / 'code_samples' / 'hello_world.z70'
+
+# Importações além das do interpretador (soma do tempo próprio, ms). Hoje
+# fica em ~15 ms; antes dos imports preguiçosos e do cache de handlers
+# passava de 40 ms
+BUDGET_MS = 40
+
+
+def environment(cache_dir):
+    env = dict(os.environ)
+    # Mede a partida normal, com .pyc em cache
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['Z70_CACHE_DIR'] = cache_dir
+    return env
+
+
+def importtime(env, *args):
+    """[(módulo, próprio µs, acumulado µs)] de `python -X importtime args`."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+    mods = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        mods.append((name.strip(), int(own), int(cumulative)))
+    return mods
+
+
+def wall_times(env, n, *args):
+    times = []
+    for _ in range(n):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, check=True)
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    run = (str(ROOT / 'Z70.py'), str(SAMPLE))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = environment(cache_dir)
+        wall_times(env, 1, *run)     # aquece .pyc e o cache de handlers
+
+        base = {name for name, _, _ in importtime(env, '-c', 'pass')}
+        mods = [m for m in importtime(env, *run) if m[0] not in base]
+        total = sum(own for _, own, _ in mods) / 1000
+
+        print(f"{'módulo':<32}{'próprio (ms)':>14}{'acumulado (ms)':>16}")
+        for name, own, cumulative in sorted(mods, key=lambda m: -m[2])[:12]:
+            print(f"{name:<32}{own / 1000:>14.2f}{cumulative / 1000:>16.2f}")
+        print(f"\nimportações do Z70.py: {total:.2f} ms (limite {BUDGET_MS} ms)")
+
+        empty = statistics.median(wall_times(env, n, '-c', 'pass'))
+        full = statistics.median(wall_times(env, n, *run))
+        print(f"python -c pass:        {empty * 1e3:.2f} ms")
+        print(f"python Z70.py {SAMPLE.name}: {full * 1e3:.2f} ms (+{(full - empty) * 1e3:.2f} ms)")
+
+    if total > BUDGET_MS:
+        print("ACIMA DO LIMITE")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,11 @@
+import time
+
 from core.arch import *
+from core.codegen import FUSIBLE, MEM_DST, MEM_SRC, MEM_IND, lazy_flags, handlers, io_handlers
+from core.debugger import Breakpoints
+from core.hooks import Hooks, hook_loop
+from core.perf import DEFAULT_MODEL, PerfCounters
+from core.profile import COND_MASKS
 
 def handle_mov(cpu, dst_loc, src_loc):
     val = cpu.get_loc_val(*src_loc)
@@ -97,16 +104,139 @@ def handle_shl(cpu, dst_loc):
     cpu.set_flags(res, cf, of)
     cpu.set_loc_val(*dst_loc, res)
 
+# =========================
+# RESULTADO DE run()
+# =========================
+HALTED = 'halted'      # PC chegou ao fim do programa
+BUDGET = 'budget'      # limite de instruções atingido
+TIMEOUT = 'timeout'    # limite de tempo atingido
+LOOP = 'loop'          # laço infinito provado
+BREAKPOINT = 'breakpoint'  # PC chegou a um breakpoint (ou ao alvo de run_until)
+WATCHPOINT = 'watchpoint'  # instrução acessou memória vigiada
+
+# A cada quantas instruções run() confere o relógio
+CHECK_EVERY = 4096
+
+
+class RunOutcome:
+    """
+    Como run() terminou. `steps` é o número de instruções executadas (None
+    numa execução sem limites). Em LOOP, `loop` é a faixa (primeiro, último)
+    de endereços das instruções do laço e `period` quantas instruções ele
+    executa por volta. `cached` indica que o resultado veio do cache de
+    resultados (core/result_cache.py) sem executar. Em WATCHPOINT, `addr` é
+    o endereço vigiado que a última instrução acessou.
+    """
+    __slots__ = ('status', 'steps', 'loop', 'period', 'cached', 'addr')
+
+    def __init__(self, status, steps=None, loop=None, period=None, cached=False, addr=None):
+        self.status = status
+        self.steps = steps
+        self.loop = loop
+        self.period = period
+        self.cached = cached
+        self.addr = addr
+
+    @property
+    def halted(self):
+        return self.status == HALTED
+
+    def __repr__(self):
+        if self.status == LOOP:
+            lo, hi = self.loop
+            return (f"RunOutcome({self.status}, steps={self.steps}, "
+                    f"loop={lo:02X}H-{hi:02X}H, period={self.period})")
+        if self.status == WATCHPOINT:
+            return f"RunOutcome({self.status}, steps={self.steps}, addr={self.addr:02X}H)"
+        return f"RunOutcome({self.status}, steps={self.steps})"
+
+
+# Nenhum endereço coberto: compartilhado até a CPU decodificar algo
+_NOT_COVERED = bytes(256)
+
+
 class CPU:
-    def __init__(self, mem, labels):
-        self.mem = list(mem)
+    # Layout fixo: sem __dict__ por instância
+    __slots__ = (
+        'mem', 'labels', 'A', 'B', 'I', 'PC', 'program_end',
+        '_flags', '_lazy', 'lazy_flags', 'alu', '_handlers', '_fused',
+        '_icache', '_fcache', '_covered', 'journal', 'trace', 'bus',
+        'breakpoints', 'hooks', 'cycle_model', '_perf', '_taken', '_host_time',
+        '_stopped_at',
+    )
+
+    def __init__(self, mem, labels, lazy_flags=False, alu='inline', bus=None, cycle_model=None):
+        # 256 bytes contíguos; aceita a lista de second_pass ou qualquer buffer
+        self.mem = bytearray(mem)
         self.labels = labels
         self.A = 0
         self.B = 0
         self.I = 0
-        self.FLAGS = 0
+        # FLAGS materializado e, no modo preguiçoso, a última operação pendente
+        self._flags = 0
+        self._lazy = None
+        self.lazy_flags = lazy_flags
+        self.alu = alu
+        # Barramento de dispositivos (core/devices.py); None = só RAM
+        self.bus = bus
+        if alu == 'lut':
+            if lazy_flags:
+                raise ValueError("Lazy flags and LUT ALU are exclusive")
+            if bus is not None:
+                raise ValueError("Device bus needs the inline ALU")
+            from core.alu import lut_handlers
+            self._handlers, self._fused = lut_handlers()
+        elif alu != 'inline':
+            raise ValueError(f"Invalid ALU: {alu}")
+        elif bus is not None:
+            self._handlers, self._fused = io_handlers(lazy_flags)
+        else:
+            self._handlers, self._fused = handlers(lazy_flags)
         self.PC = 0
         self.program_end = 0
+        # Cache de decodificação por endereço: pc -> (handler, byte extra, próximo
+        # pc, peso dos contadores) e o mesmo cache com pares fundidos (ex.:
+        # cmp + jz), usado por run().
+        # Só são alocados na primeira execução (ver _init_decode).
+        self._icache = None
+        self._fcache = None
+        # Endereços cobertos por alguma entrada em cache
+        self._covered = _NOT_COVERED
+        # Journal de desfazer (core/journal.py); None = não grava
+        self.journal = None
+        # Trace binário (core/trace.py); None = não grava
+        self.trace = None
+        # Breakpoints e watchpoints (core/debugger.py), criados no primeiro uso
+        self.breakpoints = None
+        # (PC, _perf) do último BREAKPOINT: run() seguinte continua dali sem parar de novo
+        self._stopped_at = None
+        # Ganchos de instrumentação (core/hooks.py), criados no primeiro uso
+        self.hooks = None
+        # Contadores de desempenho (core/perf.py): pesos empacotados somados
+        # por passo, saltos tomados e tempo de host dentro de run()
+        self.cycle_model = cycle_model or DEFAULT_MODEL
+        self._perf = 0
+        self._taken = 0
+        self._host_time = 0.0
+
+    def memory_view(self):
+        """
+        Memória como memoryview somente leitura, sem cópia. Acompanha a
+        execução (é a mesma área de `mem`) e serve para np.frombuffer.
+        """
+        return memoryview(self.mem).toreadonly()
+
+    @property
+    def FLAGS(self):
+        if self._lazy is not None:
+            self._flags = lazy_flags(self._lazy, self._flags)
+            self._lazy = None
+        return self._flags
+
+    @FLAGS.setter
+    def FLAGS(self, val):
+        self._flags = val
+        self._lazy = None
 
     def get_flag(self, flag):
         masks = {'OF': 7, 'CF': 6, 'ZF': 5, 'PF': 4, 'SF': 3}
@@ -142,50 +272,463 @@ class CPU:
         val &= 0xFF
         if loc_type == 'reg':
             setattr(self, loc_val, val)
+            return
         elif loc_type == 'ind_i':
-            self.mem[self.I] = val
+            addr = self.I
         elif loc_type == 'dir':
-            self.mem[loc_val] = val
+            addr = loc_val
         else:
             raise ValueError("Invalid set loc")
+        self.mem[addr] = val
+        if self._covered[addr]:
+            self.invalidate_decode(addr)
+
+    # =========================
+    # CONTADORES DE DESEMPENHO
+    # =========================
+    def counters(self):
+        """Instantâneo dos contadores (core.perf.PerfCounters)."""
+        return PerfCounters(self._perf, self._taken, self._host_time)
+
+    def reset_counters(self):
+        self._perf = 0
+        self._taken = 0
+        self._host_time = 0.0
+
+    def set_cycle_model(self, model):
+        """Troca a tabela de ciclos; só afeta as instruções executadas depois."""
+        self.cycle_model = model
+        self.invalidate_decode()
+
+    # =========================
+    # CACHE DE DECODIFICAÇÃO
+    # =========================
+    def invalidate_decode(self, addr=None):
+        """
+        Descarta as entradas em cache que cobrem `addr` (ou todas, se None).
+        Deve ser chamado por quem escrever em `mem` sem passar por set_loc_val.
+        """
+        if self._icache is None:
+            return
+        if addr is None:
+            self._icache[:] = [None] * 256
+            self._fcache[:] = [None] * 256
+            self._covered[:] = bytes(256)
+            return
+        # Uma entrada cobre no máximo 4 bytes (par fundido de 2 + 2)
+        for start in range(max(addr - 3, 0), addr + 1):
+            for cache in (self._icache, self._fcache):
+                rec = cache[start]
+                if rec is not None and rec[2] > addr:
+                    cache[start] = None
+
+    def _init_decode(self):
+        self._icache = [None] * 256
+        self._fcache = [None] * 256
+        self._covered = bytearray(256)
+
+    def _decode(self, pc):
+        instr_byte = self.mem[pc]
+        handler = self._handlers[instr_byte]
+        if handler is None:
+            raise ValueError(f"Invalid instruction: {instr_byte:02X}H at {pc:02X}H")
+        size = DECODE_TABLE[instr_byte][3]
+        extra = self.mem[pc + 1] if size == 2 else None
+        rec = (handler, extra, pc + size, self.cycle_model.weights[instr_byte])
+        self._icache[pc] = rec
+        for a in range(pc, pc + size):
+            self._covered[a] = 1
+        return rec
+
+    def _decode_fused(self, pc):
+        rec = self._icache[pc] or self._decode(pc)
+        nxt = rec[2]
+        if (FUSIBLE[self.mem[pc]] and nxt < self.program_end
+                and self.mem[nxt] in self._fused):
+            jrec = self._icache[nxt] or self._decode(nxt)
+            rec = (self._fused[self.mem[nxt]], (rec[0], rec[1], jrec[1]), jrec[2], rec[3] + jrec[3])
+        self._fcache[pc] = rec
+        return rec
 
-    def run(self):
-        while self.PC < self.program_end:
-            self.step()
+    # =========================
+    # EXECUÇÃO
+    # =========================
+    def run(self, max_steps=None, timeout=None, detect_loops=False, profile=None):
+        """
+        Executa até o fim do programa e devolve um RunOutcome.
+
+        `max_steps` limita o número de instruções e `timeout` o tempo (em
+        segundos). Com `detect_loops`, a CPU prova que o programa nunca
+        termina: o estado (A, B, I, FLAGS, PC, memória e, com barramento, o
+        estado dos dispositivos) é determinístico, então um estado repetido
+        é um laço infinito.
+        Com um journal ou trace ligado, cada passo é gravado neles.
+        `profile` (core.profile.Profile) liga os contadores do profiler.
+        Com breakpoints ou watchpoints definidos, para neles (BREAKPOINT /
+        WATCHPOINT); sem nenhum, o laço é o mesmo de sempre. Ganchos
+        registrados com add_hook() usam um laço gerado para os tipos em uso.
+        O tempo gasto aqui entra nos contadores de desempenho (counters()).
+        """
+        start = time.perf_counter()
+        try:
+            return self._run(max_steps, timeout, detect_loops, profile)
+        finally:
+            self._host_time += time.perf_counter() - start
+
+    def _run(self, max_steps, timeout, detect_loops, profile):
+        debug = self.breakpoints is not None and self.breakpoints.active
+        if self.hooks is not None and self.hooks.active:
+            if profile is not None or detect_loops or debug:
+                raise ValueError("Hooks cannot be combined with profiling, breakpoints or loop detection")
+            return self._run_hooks(max_steps, timeout)
+        if profile is not None:
+            if detect_loops:
+                raise ValueError("Profiling and loop detection are exclusive")
+            if debug:
+                raise ValueError("Profiling and breakpoints are exclusive")
+            return self._run_profiled(profile, max_steps, timeout)
+        if debug:
+            return self._run_debug(self.breakpoints, max_steps, timeout, detect_loops)
+        if (max_steps is None and timeout is None and not detect_loops
+                and self.journal is None and self.trace is None):
+            self._run_fast()
+            return RunOutcome(HALTED)
+        return self._run_limited(max_steps, timeout, detect_loops)
+
+    def _run_fast(self):
+        if self._fcache is None:
+            self._init_decode()
+        cache = self._fcache
+        end = self.program_end
+        pc = self.PC
+        perf = 0
+        try:
+            while pc < end:
+                rec = cache[pc] or self._decode_fused(pc)
+                perf += rec[3]
+                self.PC = rec[2]
+                rec[0](self, rec[1])
+                pc = self.PC
+        finally:
+            self._perf += perf
+
+    def _run_limited(self, max_steps, timeout, detect_loops):
+        """
+        Mesmo laço de run(), sem pares fundidos (para contar instruções
+        exatas), em blocos de até CHECK_EVERY instruções entre as
+        conferências de limite.
+
+        Laços: toda execução infinita passa infinitas vezes por um salto
+        para trás (senão o PC só avançaria até o fim). O estado é anotado
+        nesses saltos e comparado com um estado salvo, salvo de novo a cada
+        potência de 2 de saltos (algoritmo de Brent): um laço de período p
+        após m saltos é provado em no máximo ~2(m + p) saltos, com memória
+        constante e comparação exata.
+        """
+        if self._icache is None:
+            self._init_decode()
+        cache = self._icache
+        hooked = self.journal is not None or self.trace is not None
+        end = self.program_end
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        steps = 0
+        saved = None
+        power = lam = 1
+        pc = self.PC
+        while True:
+            if pc >= end:
+                return RunOutcome(HALTED, steps)
+            if max_steps is not None and steps >= max_steps:
+                return RunOutcome(BUDGET, steps)
+            if deadline is not None and time.monotonic() >= deadline:
+                return RunOutcome(TIMEOUT, steps)
+            n = CHECK_EVERY if max_steps is None else min(CHECK_EVERY, max_steps - steps)
+            done = n
+            for i in range(n):
+                rec = cache[pc] or self._decode(pc)
+                self._perf += rec[3]
+                if hooked:
+                    self._exec_hooked(pc, rec)
+                else:
+                    self.PC = rec[2]
+                    rec[0](self, rec[1])
+                if self.PC <= pc and detect_loops:
+                    snap = self._snapshot()
+                    if snap == saved:
+                        return self._loop_outcome(steps + i + 1, snap)
+                    if lam == power:
+                        saved = snap
+                        power *= 2
+                        lam = 0
+                    lam += 1
+                pc = self.PC
+                if pc >= end:
+                    done = i + 1
+                    break
+            steps += done
+
+    def run_until(self, pc, max_steps=None, timeout=None):
+        """
+        Executa até o PC chegar a `pc` (BREAKPOINT), parando antes nos
+        breakpoints e watchpoints definidos, no fim do programa ou nos limites.
+        """
+        if not 0 <= pc <= 0xFF:
+            raise ValueError(f"Invalid address: {pc:X}H")
+        start = time.perf_counter()
+        try:
+            return self._run_debug(self.breakpoints or Breakpoints(), max_steps, timeout, False, until=pc)
+        finally:
+            self._host_time += time.perf_counter() - start
+
+    def _run_debug(self, bp, max_steps, timeout, detect_loops, until=None):
+        """
+        Laço de _run_limited com breakpoints e watchpoints: por passo, um
+        acesso ao bitmap `stops` (condições só nos endereços marcados) e,
+        se houver watchpoints, aos bitmaps de leitura/escrita no endereço
+        acessado. Breakpoints param antes da instrução; watchpoints, depois
+        dela. Se a CPU está parada no breakpoint em que o último run()
+        parou (mesmo PC, nenhuma instrução executada desde então), a primeira
+        instrução não para, então chamar run() de novo continua dali.
+        """
+        if self._icache is None:
+            self._init_decode()
+        cache = self._icache
+        mem = self.mem
+        hooked = self.journal is not None or self.trace is not None
+        stops = bp.pcs
+        if until is not None:
+            stops = bytearray(stops)
+            stops[until] = 1
+        watching = bp.watching
+        reads, writes = bp.reads, bp.writes
+        end = self.program_end
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        steps = 0
+        saved = None
+        power = lam = 1
+        pc = self.PC
+        resumed = self._stopped_at == (pc, self._perf)
+        self._stopped_at = None
+        while True:
+            if pc >= end:
+                return RunOutcome(HALTED, steps)
+            if max_steps is not None and steps >= max_steps:
+                return RunOutcome(BUDGET, steps)
+            if deadline is not None and time.monotonic() >= deadline:
+                return RunOutcome(TIMEOUT, steps)
+            n = CHECK_EVERY if max_steps is None else min(CHECK_EVERY, max_steps - steps)
+            done = n
+            for i in range(n):
+                if stops[pc] and not (resumed and steps + i == 0) and (pc == until or bp.hit(self, pc)):
+                    self._stopped_at = (pc, self._perf)
+                    return RunOutcome(BREAKPOINT, steps + i)
+                rec = cache[pc] or self._decode(pc)
+                hit = None
+                if watching:
+                    op = mem[pc]
+                    kind = MEM_SRC[op]
+                    if kind:
+                        addr = self.I if kind == MEM_IND else rec[1]
+                        if reads[addr]:
+                            hit = addr
+                    kind = MEM_DST[op]
+                    if kind:
+                        addr = self.I if kind == MEM_IND else rec[1]
+                        if writes[addr]:
+                            hit = addr
+                self._perf += rec[3]
+                if hooked:
+                    self._exec_hooked(pc, rec)
+                else:
+                    self.PC = rec[2]
+                    rec[0](self, rec[1])
+                if hit is not None:
+                    return RunOutcome(WATCHPOINT, steps + i + 1, addr=hit)
+                if self.PC <= pc and detect_loops:
+                    snap = self._snapshot()
+                    if snap == saved:
+                        return self._loop_outcome(steps + i + 1, snap)
+                    if lam == power:
+                        saved = snap
+                        power *= 2
+                        lam = 0
+                    lam += 1
+                pc = self.PC
+                if pc >= end:
+                    done = i + 1
+                    break
+            steps += done
+
+    def _run_profiled(self, profile, max_steps, timeout):
+        """Laço com os contadores do profiler (separado para não pesar em run())."""
+        if self._icache is None:
+            self._init_decode()
+        cache = self._icache
+        mem = self.mem
+        hooked = self.journal is not None or self.trace is not None
+        counts, taken, not_taken = profile.counts, profile.taken, profile.not_taken
+        reads, writes = profile.reads, profile.writes
+        end = self.program_end
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        steps = 0
+        pc = self.PC
+        while True:
+            if pc >= end:
+                return RunOutcome(HALTED, steps)
+            if max_steps is not None and steps >= max_steps:
+                return RunOutcome(BUDGET, steps)
+            if deadline is not None and time.monotonic() >= deadline:
+                return RunOutcome(TIMEOUT, steps)
+            n = CHECK_EVERY if max_steps is None else min(CHECK_EVERY, max_steps - steps)
+            done = n
+            for i in range(n):
+                rec = cache[pc] or self._decode(pc)
+                op = mem[pc]
+                counts[pc] += 1
+                kind = MEM_SRC[op]
+                if kind:
+                    reads[self.I if kind == MEM_IND else rec[1]] += 1
+                kind = MEM_DST[op]
+                if kind:
+                    writes[self.I if kind == MEM_IND else rec[1]] += 1
+                mask = COND_MASKS[op]
+                if mask:
+                    if self.FLAGS & mask:
+                        taken[pc] += 1
+                    else:
+                        not_taken[pc] += 1
+                self._perf += rec[3]
+                if hooked:
+                    self._exec_hooked(pc, rec)
+                else:
+                    self.PC = rec[2]
+                    rec[0](self, rec[1])
+                pc = self.PC
+                if pc >= end:
+                    done = i + 1
+                    break
+            steps += done
+
+    def _run_hooks(self, max_steps, timeout):
+        """Limites de _run_limited em volta do laço gerado para os ganchos."""
+        if self._icache is None:
+            self._init_decode()
+        loop = hook_loop(self.hooks.kinds, self.journal is not None or self.trace is not None)
+        args = (self._icache, self.mem, *self.hooks.callbacks())
+        end = self.program_end
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        steps = 0
+        while True:
+            if self.PC >= end:
+                return RunOutcome(HALTED, steps)
+            if max_steps is not None and steps >= max_steps:
+                return RunOutcome(BUDGET, steps)
+            if deadline is not None and time.monotonic() >= deadline:
+                return RunOutcome(TIMEOUT, steps)
+            n = CHECK_EVERY if max_steps is None else min(CHECK_EVERY, max_steps - steps)
+            steps += loop(self, self.PC, n, end, *args)
+
+    def _snapshot(self):
+        snap = (self.A, self.B, self.I, self.FLAGS, self.PC, bytes(self.mem))
+        if self.bus is not None:
+            # Leituras de dispositivos dependem do estado deles (ex.: bytes já consumidos)
+            snap += (self.bus.state(),)
+        return snap
+
+    def _loop_outcome(self, steps, snap):
+        """
+        Dá mais uma volta no laço a partir de `snap` para saber sua faixa de
+        endereços e período; o estado final é o mesmo do início da volta.
+        A volta não é execução do programa: não entra nos contadores, no
+        journal nem no trace, e escritas em dispositivos são descartadas
+        (o console não repete saída).
+        """
+        cache = self._icache
+        bus, journal, trace = self.bus, self.journal, self.trace
+        if bus is not None:
+            self.bus = bus.muted()
+        self.journal = self.trace = None
+        lo = hi = pc = self.PC
+        period = 0
+        try:
+            while True:
+                rec = cache[pc] or self._decode(pc)
+                self.PC = rec[2]
+                rec[0](self, rec[1])
+                period += 1
+                lo, hi = min(lo, pc), max(hi, pc)
+                back = self.PC <= pc
+                pc = self.PC
+                if back and self._snapshot() == snap:
+                    return RunOutcome(LOOP, steps, (lo, hi), period)
+        finally:
+            self.bus, self.journal, self.trace = bus, journal, trace
 
     def step(self):
-        instr_byte = self.mem[self.PC]
-        self.PC += 1
-        if instr_byte == 0xFF:
-            return  # nop
-        if 0xA0 <= instr_byte <= 0xA5:
-            addr = self.mem[self.PC]
-            self.PC += 1
-            cond_code = instr_byte - 0xA0
-            take = [True, self.get_flag('ZF'), self.get_flag('SF'), self.get_flag('CF'), self.get_flag('OF'), self.get_flag('PF')][cond_code]
-            if take:
-                self.PC = addr
+        if self._icache is None:
+            self._init_decode()
+        if self.hooks is not None and self.hooks.active:
+            loop = hook_loop(self.hooks.kinds, self.journal is not None or self.trace is not None)
+            loop(self, self.PC, 1, 256, self._icache, self.mem, *self.hooks.callbacks())
             return
-        op = instr_byte >> 4
-        mode = instr_byte & 0xF
-        is_unary = op in [0x3, 0x4, 0x7, 0x8, 0x9]
-        if is_unary:
-            dst_loc, _ = UNARY_MODES[mode]
-            src_loc = None
-        else:
-            dst_loc, src_loc = MODES[mode]
-            has_extra = dst_loc[1] == 'extra' or (src_loc and src_loc[1] == 'extra')
-            extra = self.mem[self.PC] if has_extra else None
-            if has_extra:
-                self.PC += 1
-            if dst_loc[1] == 'extra':
-                dst_loc = (dst_loc[0], extra)
-            if src_loc and src_loc[1] == 'extra':
-                src_loc = (src_loc[0], extra)
-        if is_unary:
-            UNARY_HANDLERS[op](self, dst_loc)
-        else:
-            BINARY_HANDLERS[op](self, dst_loc, src_loc)
+        rec = self._icache[self.PC] or self._decode(self.PC)
+        self._perf += rec[3]
+        if self.journal is not None or self.trace is not None:
+            self._exec_hooked(self.PC, rec)
+            return
+        self.PC = rec[2]
+        rec[0](self, rec[1])
+
+    # =========================
+    # BREAKPOINTS / WATCHPOINTS
+    # =========================
+    def _debug(self):
+        if self.breakpoints is None:
+            self.breakpoints = Breakpoints()
+        return self.breakpoints
+
+    def add_breakpoint(self, pc, **cond):
+        """Breakpoint em `pc`, opcionalmente condicional (ex.: A=05H, ZF=1)."""
+        self._debug().add(pc, **cond)
+
+    def remove_breakpoint(self, pc):
+        if self.breakpoints is not None:
+            self.breakpoints.remove(pc)
+
+    def add_watchpoint(self, start, end=None, read=False, write=True):
+        """Para depois de ler/escrever em start..end (inclusive)."""
+        self._debug().watch(start, end, read, write)
+
+    def remove_watchpoint(self, start, end=None):
+        if self.breakpoints is not None:
+            self.breakpoints.unwatch(start, end)
+
+    def clear_breakpoints(self):
+        if self.breakpoints is not None:
+            self.breakpoints.clear()
+
+    # =========================
+    # GANCHOS
+    # =========================
+    def add_hook(self, kind, fn):
+        """Registra `fn` em 'pre_step', 'post_step', 'mem_write' ou 'branch'."""
+        if self.hooks is None:
+            self.hooks = Hooks()
+        self.hooks.add(kind, fn)
+
+    def remove_hook(self, kind, fn):
+        if self.hooks is not None:
+            self.hooks.remove(kind, fn)
+
+    def _exec_hooked(self, pc, rec):
+        """Executa um registro decodificado avisando journal e trace."""
+        if self.journal is not None:
+            self.journal.record()
+        op = self.mem[pc]
+        self.PC = rec[2]
+        rec[0](self, rec[1])
+        if self.trace is not None:
+            self.trace.record(pc, op, rec[1])
 
     def regs(self):
         return f"A={self.A:02X}H B={self.B:02X}H I={self.I:02X}H PC={self.PC:02X}H"
@@ -208,4 +751,5 @@ UNARY_HANDLERS = {
     0x7: handle_not,
     0x8: handle_shr,
     0x9: handle_shl,
-}
\ No newline at end of file
+}
+
@@ -1,6 +1,13 @@
+import argparse
+import os
 import sys
-from core.assembler import *
-from core.CPU import *
+from core.CPU import LOOP, BUDGET
+from core.objfile import BuildCache, is_object, save
+from core.api import load_program, run_program
+
+# Lote, servidor, trace, perfil, dispositivos e cache de resultados são
+# importados só no caminho que os usa: a partida de uma execução simples
+# não paga multiprocessing, sockets nem numpy (ver benchmarks/bench_startup.py).
 
 import re
 DUMP_RE = re.compile(r'^[0-9A-Fa-f]{1,3}H?-[0-9A-Fa-f]{1,3}H?$')
@@ -14,51 +21,232 @@ def parse_dump_arg(s):
     b = int(b[:-1] if b.upper().endswith('H') else b, 16)
     return (a & 0xFF, b & 0xFF)
 
-def main():
-    if len(sys.argv) < 2:
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="z70.py",
+        usage="python z70.py src.z70|obj.z70o [dump-range (hex)] [outfile] [options]",
+        epilog="Example [dump-range]: 80H-83H (memory [00H-FFH])",
+    )
+    parser.add_argument("src")
+    parser.add_argument("rest", nargs="*", metavar="[dump-range] [outfile]")
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help="stop after N instructions")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="stop after S seconds (--batch: 10 per program by default)")
+    parser.add_argument("--detect-loops", action="store_true",
+                        help="stop when the program provably never halts")
+    parser.add_argument("--trace", metavar="FILE", default=None,
+                        help="write a binary execution trace (.npz needs numpy)")
+    parser.add_argument("--profile", action="store_true",
+                        help="print the hottest instructions and memory bytes")
+    parser.add_argument("--stats", action="store_true",
+                        help="print performance counters (instructions, cycles, branches, memory)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always assemble and execute, ignoring the build and result caches")
+    parser.add_argument("--emit", metavar="OBJ", default=None,
+                        help="write the assembled object file to OBJ and exit")
+    parser.add_argument("--batch", action="store_true",
+                        help="run every source/directory given and print one JSON line per program")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="worker processes for --batch (default: one per core)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="programs sent to a worker at a time in --batch")
+    parser.add_argument("--dump", metavar="RANGE", default=None,
+                        help="memory range included in each --batch result (e.g. 80H-8FH)")
+    parser.add_argument("--console", metavar="RANGE", default=None,
+                        help="stream bytes written to RANGE (e.g. 80H-FFH) to stdout")
+    parser.add_argument("--input", metavar="ADDR=FILE", default=None,
+                        help="reads from ADDR consume the bytes of FILE ('-' = stdin)")
+    args = parser.parse_args(argv)
+    if args.console and not is_dump_range(args.console):
+        parser.error(f"invalid console range: {args.console}")
+    if args.input:
+        addr, _, path = args.input.partition('=')
+        if not path or not is_dump_range(f"{addr}-{addr}"):
+            parser.error(f"invalid input mapping: {args.input}")
+        args.input = (parse_dump_arg(f"{addr}-{addr}")[0], path)
+    if args.profile and args.detect_loops:
+        parser.error("--profile and --detect-loops are exclusive")
+    if args.batch:
+        for name in ('trace', 'profile', 'stats', 'console', 'input', 'emit'):
+            if getattr(args, name):
+                parser.error(f"--{name} cannot be used with --batch")
+        if args.dump and not is_dump_range(args.dump):
+            parser.error(f"invalid dump range: {args.dump}")
+        if args.jobs is not None and args.jobs < 1 or args.chunksize is not None and args.chunksize < 1:
+            parser.error("--jobs and --chunksize must be positive")
+        args.sources = [args.src] + args.rest
+        args.dump = parse_dump_arg(args.dump) if args.dump else None
+        args.outfile = None
+        return args
+    if args.dump or args.jobs or args.chunksize:
+        parser.error("--dump, --jobs and --chunksize need --batch")
+
+    args.dump = None
+    args.outfile = None
+    if args.rest:
+        maybe = args.rest[0]
+        if is_dump_range(maybe):
+            args.dump = parse_dump_arg(maybe)
+            if len(args.rest) >= 2:
+                args.outfile = args.rest[1]
+        else:
+            args.outfile = maybe
+    return args
+
+def describe_outcome(outcome):
+    if outcome.status == LOOP:
+        lo, hi = outcome.loop
+        return (f"infinite loop at {lo:02X}H-{hi:02X}H "
+                f"(period {outcome.period}) after {outcome.steps} steps")
+    if outcome.status == BUDGET:
+        return f"step budget exhausted after {outcome.steps} steps"
+    return f"timeout after {outcome.steps} steps"
+
+def main_batch(args):
+    """Uma linha JSON por programa; código 1 se algum deu erro."""
+    import json
+    from core.batch import find_programs, run_batch, DEFAULT_TIMEOUT
+    failed = False
+    timeout = DEFAULT_TIMEOUT if args.timeout is None else args.timeout
+    for rec in run_batch(find_programs(args.sources), jobs=args.jobs, chunksize=args.chunksize,
+                         dump=args.dump, max_steps=args.max_steps, timeout=timeout,
+                         detect_loops=args.detect_loops):
+        failed = failed or rec['error'] is not None
+        print(json.dumps(rec), flush=True)
+    if failed:
+        sys.exit(1)
+
+def main_serve(argv):
+    """Emulador residente (core/server.py) por stdin/stdout ou socket Unix."""
+    parser = argparse.ArgumentParser(prog="z70.py serve", usage="python z70.py serve [--socket PATH]")
+    parser.add_argument("--socket", metavar="PATH", default=None,
+                        help="listen on a Unix socket instead of stdin/stdout")
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help="cap on the instructions of each run/step request")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="cap in seconds on each run/step request (default 10)")
+    args = parser.parse_args(argv)
+    from core.server import Server, DEFAULT_TIMEOUT, remove_socket
+    server = Server(max_steps=args.max_steps,
+                    timeout=DEFAULT_TIMEOUT if args.timeout is None else args.timeout)
+    if args.socket is None:
+        server.serve_stream(sys.stdin, sys.stdout)
+        return
+    try:
+        unix = server.unix_server(args.socket)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        unix.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        unix.server_close()
+        try:
+            remove_socket(args.socket)
+        except ValueError:
+            pass
+
+def dump_lines(dump, values):
+    """Linhas DUMP/ASCII da faixa `dump` com os bytes `values`."""
+    a, b = dump
+    rng = range(a, b + 1) if a <= b else list(range(a, 256)) + list(range(0, b + 1))
+    hx = ' '.join(f"{i:02X}H:{v:02X}H" for i, v in zip(rng, values))
+    s = ''.join(chr(v) if 32 <= v <= 126 else '.' for v in values)
+    return [f"DUMP: {hx}", f"ASCII: {s}"]
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'serve':
+        return main_serve(argv[1:])
+    if not argv:
         print("Use: python z70.py src.z70 [dump-range (hex)] [outfile]")
         print("Example [dump-range]: 80H-83H (memory [00H-FFH])")
         sys.exit(1)
 
-    src = sys.argv[1]
-    dump = None
-    outfile = None
+    args = parse_args(argv)
+    if args.batch:
+        return main_batch(args)
 
-    if len(sys.argv) >= 3:
-        maybe = sys.argv[2]
-        if is_dump_range(maybe):
-            dump = parse_dump_arg(maybe)
-            if len(sys.argv) >= 4:
-                outfile = sys.argv[3]
-        else:
-            outfile = maybe
-
-    lines = open(src, encoding='utf-8').read().splitlines()
-    pp = preprocess(lines)
-    parsed, labels = first_pass(pp)
-    mem, listing, code_end = second_pass(parsed, labels)
-
-    cpu = CPU(mem, labels)
-    cpu.program_end = code_end
-    cpu.run()
-
-    print(f'REGS:  {cpu.regs()}')
-    print(f'FLAGS: {cpu.flags()}')
-
-    if dump:
-        a, b = dump
-        rng = range(a, b + 1) if a <= b else list(range(a, 256)) + list(range(0, b + 1))
-        hx = ' '.join(f"{i:02X}H:{cpu.mem[i]:02X}H" for i in rng)
-        s = ''.join(chr(cpu.mem[i]) if 32 <= cpu.mem[i] <= 126 else '.' for i in rng)
-        print("DUMP:", hx)
-        print("ASCII:", s)
-
-    if outfile:
-        with open(outfile, 'w', encoding='utf-8') as fo:
-            for start_addr, bs, src in listing:
+    with open(args.src, 'rb') as f:
+        data = f.read()
+    # Objeto (.z70o) não é montado; fonte passa pelo cache de montagem
+    if is_object(data) or args.no_cache:
+        prog = load_program(data)
+    else:
+        prog = BuildCache().build(data.decode('utf-8'))
+    if args.emit:
+        save(prog, args.emit)
+        print("Wrote", args.emit)
+        return
+
+    raw = npz = None
+    if args.trace:
+        npz = args.trace.lower().endswith('.npz')
+        raw = args.trace + '.z70t' if npz else args.trace
+    profile = None
+    if args.profile:
+        from core.profile import Profile
+        profile = Profile()
+    # Um acerto do cache não executa nada, então --stats sempre executa
+    cache = None
+    if profile is None and not args.no_cache and not args.stats:
+        from core.result_cache import ResultCache
+        cache = ResultCache()
+
+    bus = console = infile = None
+    try:
+        if args.console or args.input:
+            from core.devices import Bus, ConsoleDevice, InputDevice
+            bus = Bus()
+            if args.console:
+                a, b = parse_dump_arg(args.console)
+                console = bus.map(a, b, ConsoleDevice())
+            if args.input:
+                addr, path = args.input
+                if path != '-':
+                    infile = open(path, 'rb')
+                bus.map(addr, addr, InputDevice(infile or sys.stdin.buffer))
+        result = run_program(prog, dump=args.dump, max_steps=args.max_steps, timeout=args.timeout,
+                             detect_loops=args.detect_loops, bus=bus, profile=profile,
+                             trace=raw, cache=cache)
+    finally:
+        if infile is not None:
+            infile.close()
+        if npz and os.path.exists(raw):
+            from core.trace import trace_to_npz
+            trace_to_npz(raw, args.trace)
+            os.remove(raw)
+        if console and console.written:
+            print()
+
+    print(f'REGS:  {result.cpu.regs()}')
+    print(f'FLAGS: {result.cpu.flags()}')
+
+    if args.dump:
+        for line in dump_lines(args.dump, result.dump):
+            print(line)
+
+    if args.outfile:
+        with open(args.outfile, 'w', encoding='utf-8') as fo:
+            for start_addr, bs, src in result.listing:
                 cod = f"{start_addr:02X}H " + ' '.join(f"{b:02X}H" for b in bs)
                 fo.write(f"{cod:<18}{src}\n")
-        print("Wrote", outfile)
+        print("Wrote", args.outfile)
+
+    if profile:
+        print(profile.report(result.listing))
+
+    if args.stats:
+        print(result.cpu.counters().report())
+
+    if args.trace:
+        print(f"Trace: {result.trace_count} instructions -> {args.trace}")
+
+    if not result.halted:
+        print("STOP:", describe_outcome(result.outcome))
+        sys.exit(2)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
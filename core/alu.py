@@ -0,0 +1,137 @@
+"""
+ULA por tabelas (LUT).
+
+Como a ULA do Z70 é de 8 bits, cada operação cabe numa tabela:
+ADD/SUB (e CMP) e AND/OR com 256x256 entradas, INC/DEC/NOT/SHR/SHL com 256.
+Cada entrada é `resultado | (FLAGS << 8)` num `array('H')`. Em INC/DEC o CF
+guardado é 0: o handler junta o CF anterior em tempo de execução.
+
+As tabelas são geradas a partir das mesmas expressões de ALU_OPS
+(core/codegen.py) e gravadas num arquivo de cache; a assinatura das
+expressões vai no cabeçalho, então qualquer mudança na ULA regera o arquivo.
+"""
+import hashlib
+import os
+import time
+from array import array
+
+from core.codegen import ALU_OPS, ZSP, build_handlers, lut_name
+
+MAGIC = b"Z70LUT1\n"
+
+# Operações com tabela e quantos operandos indexam a tabela
+LUT_OPS = {
+    'add': 2,
+    'sub': 2,
+    'and': 2,
+    'or': 2,
+    'inc': 1,
+    'dec': 1,
+    'not': 1,
+    'shr': 1,
+    'shl': 1,
+}
+
+
+def default_table_path():
+    base = os.environ.get('Z70_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'z70')
+    return os.path.join(base, 'alu_lut.bin')
+
+
+def signature():
+    src = repr(sorted((m, ALU_OPS[m]) for m in LUT_OPS)).encode()
+    return hashlib.sha256(src).hexdigest()[:16].encode()
+
+
+def _entry_function(mnemon):
+    lines, flags = ALU_OPS[mnemon]
+    body = lines + [f"return r | (({flags.format(cf='0') if flags else '0'}) << 8)"]
+    src = "def entry(a, b=0):\n" + "".join(f"    {ln}\n" for ln in body)
+    namespace = {'ZSP': ZSP}
+    exec(compile(src, f"<z70-lut-{mnemon}>", "exec"), namespace)
+    return namespace['entry']
+
+
+def build_tables():
+    tables = {}
+    for mnemon, arity in LUT_OPS.items():
+        f = _entry_function(mnemon)
+        if arity == 2:
+            tables[mnemon] = array('H', [f(a, b) for a in range(256) for b in range(256)])
+        else:
+            tables[mnemon] = array('H', [f(a) for a in range(256)])
+    return tables
+
+
+def save_tables(tables, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + signature() + b"\n")
+        for mnemon in LUT_OPS:
+            f.write(tables[mnemon].tobytes())
+    os.replace(tmp, path)
+
+
+def read_tables(path):
+    """Lê as tabelas do cache; None se o arquivo não existir ou estiver velho."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    header = MAGIC + signature() + b"\n"
+    sizes = [(65536 if arity == 2 else 256) * 2 for arity in LUT_OPS.values()]
+    # Arquivo truncado (ou com sobra) é tratado como velho e regerado
+    if not data.startswith(header) or len(data) != len(header) + sum(sizes):
+        return None
+    tables = {}
+    pos = len(header)
+    for mnemon, size in zip(LUT_OPS, sizes):
+        tables[mnemon] = array('H')
+        try:
+            tables[mnemon].frombytes(data[pos:pos + size])
+        except ValueError:
+            return None
+        pos += size
+    return tables
+
+
+def load_tables(path=None):
+    """
+    Carrega as tabelas do cache ou as gera (e grava) se necessário.
+    """
+    path = path or default_table_path()
+    tables = read_tables(path)
+    if tables is None:
+        tables = build_tables()
+        try:
+            save_tables(tables, path)
+        except OSError:
+            pass
+    return tables
+
+
+def footprint(tables):
+    """Bytes ocupados pelos dados das tabelas."""
+    return sum(t.itemsize * len(t) for t in tables.values())
+
+
+_handlers = {}
+stats = {}
+
+
+def lut_handlers(path=None):
+    """
+    Tabelas de handlers com a ULA por LUT (geradas na primeira chamada para
+    cada arquivo de tabelas). Guarda em `stats` o tempo de carga/geração e o
+    tamanho das tabelas.
+    """
+    path = path or default_table_path()
+    if path not in _handlers:
+        t = time.perf_counter()
+        tables = load_tables(path)
+        stats['load_seconds'] = time.perf_counter() - t
+        stats['bytes'] = footprint(tables)
+        _handlers[path] = build_handlers(lut={lut_name(m): t for m, t in tables.items()})
+    return _handlers[path]
@@ -0,0 +1,94 @@
+"""
+Fachada do núcleo: montar e executar um programa numa chamada.
+
+    result = run_source(text, dump=(0x80, 0x8F), max_steps=10000)
+    result.regs       {'A': 8, 'B': 3, 'I': 0, 'PC': 6}
+    result.flags      {'OF': 0, 'CF': 0, 'ZF': 0, 'PF': 0, 'SF': 0}
+    result.dump       bytes de 80H a 8FH (None sem `dump`)
+    result.status     HALTED, BUDGET, TIMEOUT ou LOOP
+
+Z70.py, o modo em lote e os testes usam esta função em vez de montar a CPU
+à mão; `result.cpu` dá acesso ao resto (contadores, trace, dispositivos).
+"""
+from core.arch import FLAG_MASKS
+from core.CPU import CPU
+from core.objfile import build, loads, is_object
+from core.trace import TraceRecorder
+
+
+def registers(cpu):
+    """Campos "regs" e "flags" de um registro de resultado."""
+    return {
+        'regs': {'A': cpu.A, 'B': cpu.B, 'I': cpu.I, 'PC': cpu.PC},
+        'flags': {name: int(bool(cpu.FLAGS & mask)) for name, mask in FLAG_MASKS.items()},
+    }
+
+
+def dump_range(mem, dump):
+    """Bytes de `mem` na faixa (início, fim); fim < início dá a volta em FFH."""
+    a, b = dump
+    rng = range(a, b + 1) if a <= b else list(range(a, 256)) + list(range(0, b + 1))
+    return [mem[i] for i in rng]
+
+
+class RunResult:
+    def __init__(self, cpu, outcome, program, dump=None, trace_count=None):
+        self.cpu = cpu
+        self.outcome = outcome
+        self.status = outcome.status
+        # Num acerto do cache de resultados nada executou: os passos vêm do cache
+        self.steps = outcome.steps if outcome.cached else cpu.counters().instructions
+        state = registers(cpu)
+        self.regs = state['regs']
+        self.flags = state['flags']
+        self.memory = bytes(cpu.mem)
+        self.dump = dump_range(self.memory, dump) if dump is not None else None
+        self.listing = program.listing
+        self.labels = program.labels
+        self.program_end = program.program_end
+        # Instruções gravadas no trace (com `trace`)
+        self.trace_count = trace_count
+
+    @property
+    def halted(self):
+        return self.outcome.halted
+
+    def __repr__(self):
+        return f"RunResult({self.status}, steps={self.steps}, {self.cpu.regs()})"
+
+
+def load_program(data):
+    """Program de um fonte (str) ou dos bytes de um arquivo (objeto ou fonte UTF-8)."""
+    if isinstance(data, str):
+        return build(data)
+    if is_object(data):
+        return loads(data)
+    return build(data.decode('utf-8'))
+
+
+def run_program(program, dump=None, max_steps=None, timeout=None, detect_loops=False,
+                bus=None, profile=None, trace=None, cache=None):
+    """
+    Executa um Program (core/objfile.py) numa CPU nova. `bus` mapeia
+    dispositivos, `profile` recebe um core.profile.Profile, `trace` é o
+    caminho de um trace binário e `cache` um ResultCache (ignorado com
+    profile, que precisa da execução).
+    """
+    cpu = CPU(program.mem, program.labels, bus=bus)
+    cpu.program_end = program.program_end
+    tracer = TraceRecorder(cpu, trace) if trace else None
+    try:
+        if cache is not None and profile is None:
+            outcome = cache.run(cpu, max_steps=max_steps, timeout=timeout, detect_loops=detect_loops)
+        else:
+            outcome = cpu.run(max_steps=max_steps, timeout=timeout,
+                              detect_loops=detect_loops, profile=profile)
+    finally:
+        if tracer:
+            tracer.close()
+    return RunResult(cpu, outcome, program, dump, tracer.count if tracer else None)
+
+
+def run_source(text, dump=None, max_steps=None, **options):
+    """Monta `text` e executa; `options` como em run_program."""
+    return run_program(build(text), dump=dump, max_steps=max_steps, **options)
@@ -45,5 +45,67 @@ JUMP_CODES = {
     'jp' : 0xA5,
 }
 
+# Bit de FLAGS de cada flag
+FLAG_MASKS = {
+    'OF': 0x80,
+    'CF': 0x40,
+    'ZF': 0x20,
+    'PF': 0x10,
+    'SF': 0x08,
+}
+
+# Bit de FLAGS testado por cada salto (0 = incondicional)
+JUMP_MASKS = {
+    0xA0: 0x00,
+    0xA1: FLAG_MASKS['ZF'],
+    0xA2: FLAG_MASKS['SF'],
+    0xA3: FLAG_MASKS['CF'],
+    0xA4: FLAG_MASKS['OF'],
+    0xA5: FLAG_MASKS['PF'],
+}
+
 BINARY_MNEMONS = ['add', 'sub', 'cmp', 'and', 'or', 'mov']
-UNARY_MNEMONS = ['inc', 'dec', 'not', 'shr', 'shl']
\ No newline at end of file
+UNARY_MNEMONS = ['inc', 'dec', 'not', 'shr', 'shl']
+
+def build_decode_table():
+    """
+    Tabela de 256 entradas: byte de instrução -> (mnemônico, dst, src, tamanho).
+    Bytes inválidos ficam como None.
+    """
+    table = [None] * 256
+    for mnemon, op in OPCODES.items():
+        modes = UNARY_MODES if mnemon in UNARY_MNEMONS else MODES
+        for mode, (dst, src) in modes.items():
+            has_extra = dst[1] == 'extra' or (src is not None and src[1] == 'extra')
+            table[(op << 4) | mode] = (mnemon, dst, src, 2 if has_extra else 1)
+    for mnemon, code in JUMP_CODES.items():
+        table[code] = (mnemon, ('addr', 'extra'), None, 2)
+    table[0xFF] = ('nop', None, None, 1)
+    return table
+
+DECODE_TABLE = build_decode_table()
+
+# Tipos de operando que levam o byte extra (o valor não faz parte da chave)
+EXTRA_KINDS = ('const', 'dir')
+
+def operand_key(loc):
+    """Parte da chave de MODE_INDEX de um operando: (tipo, registrador ou None)."""
+    return (loc[0], None if loc[0] in EXTRA_KINDS else loc[1])
+
+def build_mode_index():
+    """
+    Índices de modo de endereçamento, na ordem de MODES/UNARY_MODES (o
+    primeiro modo que casa vence, como na busca linear):
+    (destino, fonte) -> (modo, lado do byte extra: 'dst', 'src' ou None)
+    e destino -> modo nas instruções unárias.
+    """
+    index = {}
+    for mode, (dst, src) in MODES.items():
+        side = 'dst' if dst[1] == 'extra' else 'src' if src[1] == 'extra' else None
+        index.setdefault(operand_key(dst) + operand_key(src), (mode, side))
+    unary = {}
+    for mode, (dst, _) in UNARY_MODES.items():
+        unary.setdefault(dst, mode)
+    return index, unary
+
+MODE_INDEX, UNARY_MODE_INDEX = build_mode_index()
@@ -102,25 +102,16 @@ def get_dst_src(mnemon, args):
     return dst, src
 
 def find_mode(dst, src=None):
-    is_unary = src is None
-    if is_unary:
-        target_dst = dst
-        modes_dict = UNARY_MODES
-        for m, (d, _) in modes_dict.items():
-            if d[0] == target_dst[0] and d[1] == target_dst[1]:
-                return m, None
+    if src is None:
+        mode = UNARY_MODE_INDEX.get(dst)
+        if mode is not None:
+            return mode, None
     else:
-        modes_dict = MODES
-        for m, (d, s) in modes_dict.items():
-            match_d = (d[0] == dst[0]) and (d[1] == dst[1] if d[1] != 'extra' else True)
-            match_s = (s[0] == src[0]) and (s[1] == src[1] if s[1] != 'extra' else True)
-            if match_d and match_s:
-                extra = None
-                if d[1] == 'extra':
-                    extra = dst[1]
-                elif s[1] == 'extra':
-                    extra = src[1]
-                return m, extra
+        hit = MODE_INDEX.get(operand_key(dst) + operand_key(src))
+        if hit is not None:
+            mode, side = hit
+            extra = dst[1] if side == 'dst' else src[1] if side == 'src' else None
+            return mode, extra
     raise ValueError(f"No mode found for {dst} {src}")
 
 def second_pass(parsed, labels):
@@ -158,4 +149,159 @@ def encode(instr, args, labels, current_addr):
             return [instr_byte, extra]
         return [instr_byte]
     else:
-        raise ValueError(f"Unknown instr: {instr}")
\ No newline at end of file
+        raise ValueError(f"Unknown instr: {instr}")
+
+# =========================
+# MONTAGEM EM UMA PASSADA
+# =========================
+# Operandos já analisados (texto -> (tipo, valor)); esvaziado ao passar do limite
+_ARGS = {}
+ARGS_CACHE_LIMIT = 4096
+_UNARY = frozenset(UNARY_MNEMONS)
+
+
+def _operand(arg):
+    loc = _ARGS.get(arg)
+    if loc is None:
+        loc = parse_arg(arg)
+        if len(_ARGS) >= ARGS_CACHE_LIMIT:
+            _ARGS.clear()
+        _ARGS[arg] = loc
+    return loc
+
+
+def assemble(lines):
+    """
+    Monta `lines` numa passada só. Devolve (mem, listing, code_end, labels),
+    os mesmos de preprocess + first_pass + second_pass, com os mesmos erros.
+
+    Cada linha é analisada uma vez e o modo sai de MODE_INDEX. Saltos para
+    rótulos ainda não definidos são corrigidos no fim. Erros que as duas
+    passadas só veriam na segunda (rótulo desconhecido, instrução
+    desconhecida, programa maior que a memória...) são guardados e o
+    primeiro deles é levantado no fim, depois de todos os da primeira.
+    """
+    mem = [0] * 256
+    listing = []
+    labels = {}
+    fixups = []       # (índice da instrução, bytes, rótulo)
+    deferred = None   # (índice da instrução, erro)
+    addr = 0
+    for line in lines:
+        if '//' in line:
+            line = line.split('//', 1)[0]
+        line = line.strip()
+        if not line:
+            continue
+        rest = line
+        if ':' in line:
+            label, rest = line.split(':', 1)
+            label = label.strip()
+            rest = rest.strip()
+            if label:
+                if label in labels:
+                    raise ValueError(f"Duplicate label: {label}")
+                labels[label] = addr
+            if not rest:
+                continue
+        parts = rest.split()
+        instr = parts[0].lower()
+        args = [a.strip() for a in ' '.join(parts[1:]).split(',') if a.strip()]
+
+        k = len(listing)
+        error = None
+        if instr in JUMP_CODES:
+            size = 2
+            if len(args) != 1:
+                error = ValueError("Jump expects 1 label")
+            else:
+                target = labels.get(args[0])
+                bytes_list = [JUMP_CODES[instr], target]
+                if target is None:
+                    fixups.append((k, bytes_list, args[0]))
+        elif instr == 'nop':
+            size = 1
+            if args:
+                error = ValueError("nop no args")
+            bytes_list = [0xFF]
+        else:
+            if instr in _UNARY:
+                if len(args) != 1:
+                    raise ValueError(f"{instr} expects 1 arg")
+                dst, src = _operand(args[0]), None
+            else:
+                if len(args) != 2:
+                    raise ValueError(f"{instr} expects 2 args")
+                dst, src = _operand(args[0]), _operand(args[1])
+            mode, extra = find_mode(dst, src)
+            size = 1 if extra is None else 2
+            if instr in OPCODES:
+                instr_byte = (OPCODES[instr] << 4) | mode
+                bytes_list = [instr_byte] if extra is None else [instr_byte, extra]
+            else:
+                error = ValueError(f"Unknown instr: {instr}")
+
+        if error is None and addr + size > 256:
+            error = IndexError("list assignment index out of range")
+        if error is not None:
+            if deferred is None:
+                deferred = (k, error)
+            bytes_list = []
+        else:
+            mem[addr:addr + size] = bytes_list
+        listing.append((addr, bytes_list, line))
+        addr += size
+
+    for k, bytes_list, label in fixups:
+        target = labels.get(label)
+        if target is None:
+            if deferred is None or k <= deferred[0]:
+                raise ValueError(f"Unknown label: {label}")
+            break
+        start = listing[k][0]
+        bytes_list[1] = target
+        if start + 1 < 256:
+            mem[start + 1] = target
+    if deferred is not None:
+        raise deferred[1]
+    return mem, listing, addr, labels
+
+
+def instruction_lines(lines):
+    """
+    Índice (a partir de 0) em `lines` de cada linha com instrução, na ordem
+    do listing: as mesmas regras de preprocess/parse_line.
+    """
+    found = []
+    for n, line in enumerate(lines):
+        if '//' in line:
+            line = line.split('//', 1)[0]
+        line = line.strip()
+        if ':' in line:
+            line = line.split(':', 1)[1].strip()
+        if line:
+            found.append(n)
+    return found
+
+
+class SourceMap:
+    """
+    Mapa endereço <-> linha do fonte original (1 = primeira linha do texto,
+    contando comentários, linhas vazias e linhas só com rótulo).
+
+    `line_at[addr]` é a linha da instrução que ocupa o byte `addr` (None fora
+    do código) e `addr_at[linha]` o endereço da instrução daquela linha.
+    """
+    def __init__(self, listing, lines):
+        # `lines`: índice (a partir de 0) da linha de cada instrução do listing
+        self.line_at = [None] * 256
+        self.addr_at = {}
+        for (addr, bytes_list, _), n in zip(listing, lines):
+            self.addr_at[n + 1] = addr
+            for a in range(addr, min(addr + len(bytes_list), 256)):
+                self.line_at[a] = n + 1
+
+
+def source_map(lines, listing):
+    """SourceMap do listing montado a partir de `lines`."""
+    return SourceMap(listing, instruction_lines(lines))
@@ -0,0 +1,96 @@
+"""
+Execução em lote: muitos programas, um registro JSON por programa.
+
+Para diretórios inteiros de fontes, um processo `python Z70.py` por arquivo
+paga a partida do interpretador a cada programa e devolve texto que precisa
+ser lido com expressões regulares. Aqui os programas são montados e
+executados num ProcessPoolExecutor (cada processo importa o emulador uma vez)
+e cada resultado é um dicionário pronto para virar uma linha JSON:
+
+    {"file": ..., "status": "halted", "steps": 42, "elapsed": 0.0001,
+     "regs": {"A": 33, "B": 0, "I": 139, "PC": 47},
+     "flags": {"OF": 0, "CF": 0, "ZF": 0, "PF": 1, "SF": 0},
+     "dump": [72, 101, ...], "error": null}
+
+`dump` só aparece com uma faixa pedida; em erro (leitura, montagem)
+os campos da execução não aparecem e `error` traz "Tipo: mensagem".
+Os resultados saem na ordem dos arquivos.
+
+Cada programa tem no máximo DEFAULT_TIMEOUT segundos (ou o `timeout` dado;
+None tira o limite), para que um programa que nunca para não prenda o lote:
+ao estourar, o status é "timeout" (ou "budget", com `max_steps`).
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core.api import load_program, run_program
+
+# Extensões procuradas nos diretórios
+SOURCE_SUFFIXES = ('.z70', '.z70o')
+
+# Limite padrão de cada programa, em segundos (o mesmo do core/server.py)
+DEFAULT_TIMEOUT = 10.0
+
+
+def find_programs(paths):
+    """Arquivos de `paths`, com os diretórios trocados pelos programas dentro deles (ordenados)."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            inner = []
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                inner += [os.path.join(root, f) for f in files if f.endswith(SOURCE_SUFFIXES)]
+            found += sorted(inner)
+        else:
+            found.append(path)
+    return found
+
+
+def run_file(path, dump=None, max_steps=None, timeout=DEFAULT_TIMEOUT, detect_loops=False):
+    """Monta e executa um programa (fonte ou objeto) e devolve o registro do resultado."""
+    rec = {'file': path}
+    t = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        result = run_program(load_program(data), dump=dump, max_steps=max_steps,
+                             timeout=timeout, detect_loops=detect_loops)
+    except Exception as e:
+        rec['elapsed'] = time.perf_counter() - t
+        rec['error'] = f"{type(e).__name__}: {e}"
+        return rec
+    rec['status'] = result.status
+    rec['steps'] = result.steps
+    rec['elapsed'] = time.perf_counter() - t
+    rec['regs'] = result.regs
+    rec['flags'] = result.flags
+    if dump is not None:
+        rec['dump'] = result.dump
+    rec['error'] = None
+    return rec
+
+
+def _run_chunk(paths, options):
+    return [run_file(path, **options) for path in paths]
+
+
+def run_batch(paths, jobs=None, chunksize=None, **options):
+    """
+    Gera o registro de cada programa de `paths`, na ordem. `jobs` processos
+    (padrão: um por núcleo; 1 executa neste processo) recebem os arquivos em
+    blocos de `chunksize`. `options` vão para run_file.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) <= 1:
+        for path in paths:
+            yield run_file(path, **options)
+        return
+    if chunksize is None:
+        # Blocos pequenos o bastante para equilibrar e grandes o bastante para amortizar o IPC
+        chunksize = max(1, min(256, len(paths) // (jobs * 8)))
+    chunks = [paths[i:i + chunksize] for i in range(0, len(paths), chunksize)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for recs in pool.map(_run_chunk, chunks, [options] * len(chunks)):
+            yield from recs
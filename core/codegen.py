@@ -0,0 +1,371 @@
+"""
+Geração dos handlers especializados da CPU.
+
+Para cada byte de instrução válido em DECODE_TABLE (core/arch.py) é gerada
+uma função `op_XX(cpu, x)` já com os operandos resolvidos: 0x04, por exemplo,
+vira "A = A + mem[I]" sem nenhuma comparação de strings. `x` é o byte extra
+da instrução (constante, endereço direto ou destino do salto) ou None.
+Como tudo é derivado das tabelas de arch.py, os handlers acompanham qualquer
+mudança nelas automaticamente.
+
+Compilar os 256 handlers leva milissegundos, o que pesa na partida do
+Z70.py; por isso cada conjunto só é gerado no primeiro uso (handlers()) e o
+código compilado fica em cache em disco (marshal), endereçado pelo fonte
+gerado e pela versão do Python.
+"""
+import hashlib
+import marshal
+import os
+import sys
+
+from core.arch import DECODE_TABLE, JUMP_MASKS, BINARY_MNEMONS
+
+
+def _zsp(res):
+    flags = 0x20 if res == 0 else 0
+    flags |= 0x08 if res & 0x80 else 0
+    flags |= 0x10 if bin(res).count('1') % 2 == 0 else 0
+    return flags
+
+# ZF | SF | PF de cada resultado de 8 bits
+ZSP = bytes(_zsp(r) for r in range(256))
+
+# Operações da ULA: (linhas que calculam r a partir de a/b, expressão das flags)
+# Flags None = instrução não altera FLAGS. {cf} é o bit CF anterior (inc/dec
+# preservam o carry).
+ALU_OPS = {
+    'add': (["r = (a + b) & 0xFF"],
+            "ZSP[r] | (0x40 if a + b > 0xFF else 0) | (0x80 if (a ^ r) & (b ^ r) & 0x80 else 0)"),
+    'sub': (["r = (a - b) & 0xFF"],
+            "ZSP[r] | (0x40 if a < b else 0) | (0x80 if (a ^ b) & (a ^ r) & 0x80 else 0)"),
+    'cmp': (["r = (a - b) & 0xFF"],
+            "ZSP[r] | (0x40 if a < b else 0) | (0x80 if (a ^ b) & (a ^ r) & 0x80 else 0)"),
+    'and': (["r = a & b"], "ZSP[r]"),
+    'or':  (["r = a | b"], "ZSP[r]"),
+    'mov': (["r = b"], None),
+    'inc': (["r = (a + 1) & 0xFF"], "ZSP[r] | {cf} | (0x80 if a == 0x7F else 0)"),
+    'dec': (["r = (a - 1) & 0xFF"], "ZSP[r] | {cf} | (0x80 if a == 0x80 else 0)"),
+    'not': (["r = ~a & 0xFF"], None),
+    'shr': (["r = a >> 1"], "ZSP[r] | ((a & 0x01) << 6) | (a & 0x80)"),
+    'shl': (["r = (a << 1) & 0xFF"],
+            "ZSP[r] | ((a >> 7) << 6) | (((a >> 7) ^ (r >> 7)) << 7)"),
+}
+
+# Modo de flags preguiçosas: cada operação que altera flags grava
+# (tipo, a, b, r) em cpu._lazy e FLAGS só é calculado quando alguém lê.
+LAZY_KINDS = {m: k for k, m in enumerate(m for m, (_, f) in ALU_OPS.items() if f)}
+CARRY_IN = ('inc', 'dec')
+# Flags que dependem só do resultado (jz/js/jp testam direto em ZSP[r])
+RESULT_FLAGS = 0x20 | 0x10 | 0x08
+
+# No modo LUT (core/alu.py) cmp usa a tabela de sub
+LUT_ALIASES = {'cmp': 'sub'}
+
+# Instruções cujo resultado é descartado (só alteram flags)
+NO_STORE = {'cmp'}
+# Instruções que não leem o destino
+NO_READ_DST = {'mov'}
+
+
+def _read(loc, io=False):
+    kind, val = loc
+    if kind == 'reg':
+        return f"cpu.{val}"
+    elif kind == 'const':
+        return "x"
+    elif kind == 'ind_i':
+        addr = "cpu.I"
+    elif kind == 'dir':
+        addr = "x"
+    else:
+        raise ValueError("Invalid loc")
+    if io:
+        return f"(cpu.bus.read({addr}) if cpu.bus.mapped[{addr}] else cpu.mem[{addr}])"
+    return f"cpu.mem[{addr}]"
+
+
+def _write(loc, expr, io=False):
+    kind, val = loc
+    if kind == 'reg':
+        return [f"cpu.{val} = {expr}"]
+    if kind == 'ind_i':
+        addr = "addr"
+        lines = ["addr = cpu.I"]
+    elif kind == 'dir':
+        addr = "x"
+        lines = []
+    else:
+        raise ValueError("Invalid set loc")
+    lines += [
+        f"cpu.mem[{addr}] = {expr}",
+        f"if cpu._covered[{addr}]:",
+        f"    cpu.invalidate_decode({addr})",
+    ]
+    if io:
+        lines += [f"if cpu.bus.mapped[{addr}]:", f"    cpu.bus.write({addr}, {expr})"]
+    return lines
+
+
+def lut_name(mnemon):
+    return 'LUT_' + LUT_ALIASES.get(mnemon, mnemon).upper()
+
+
+def _lut_lines(mnemon):
+    """Cálculo de r e das flags por consulta a tabela (ULA por LUT)."""
+    index = "(a << 8) | b" if mnemon in BINARY_MNEMONS else "a"
+    lines = [f"t = {lut_name(mnemon)}[{index}]", "r = t & 0xFF"]
+    if ALU_OPS[mnemon][1] is None:
+        return lines, []
+    if mnemon in CARRY_IN:
+        return lines, ["cpu._flags = (t >> 8) | (cpu._flags & 0x40)"]
+    return lines, ["cpu._flags = t >> 8"]
+
+
+def _flags_lines(mnemon, lazy):
+    flags = ALU_OPS[mnemon][1]
+    if not lazy:
+        return [f"cpu._flags = {flags.format(cf='(cpu._flags & 0x40)')}"]
+    kind = LAZY_KINDS[mnemon]
+    if mnemon not in CARRY_IN:
+        return [f"cpu._lazy = ({kind}, a, {'b' if mnemon in BINARY_MNEMONS else 0}, r)"]
+    # O carry vem do registro anterior; encadeamentos de inc/dec apontam
+    # direto para a origem do carry, então a profundidade fica limitada a 1.
+    carry_kinds = tuple(LAZY_KINDS[m] for m in CARRY_IN)
+    return [
+        "p = cpu._lazy",
+        f"if p is not None and p[0] in {carry_kinds}:",
+        "    p = p[2]",
+        f"cpu._lazy = ({kind}, a, p, r)",
+    ]
+
+
+def _jump_lines(mask, lazy, target):
+    # Saltos tomados também contam em cpu._taken (core/perf.py)
+    take = [f"    cpu.PC = {target}", "    cpu._taken += 1"]
+    if not mask:
+        return [ln[4:] for ln in take]
+    if not lazy:
+        return [f"if cpu._flags & 0x{mask:02X}:"] + take
+    if mask & RESULT_FLAGS:
+        return [
+            "lz = cpu._lazy",
+            f"if (ZSP[lz[3]] if lz is not None else cpu._flags) & 0x{mask:02X}:",
+        ] + take
+    return [f"if cpu.FLAGS & 0x{mask:02X}:"] + take
+
+
+def handler_source(instr_byte, lazy=False, lut=False, io=False):
+    """
+    Código-fonte do handler especializado de `instr_byte` (None se inválido).
+    `lazy` grava as flags em cpu._lazy; `lut` calcula resultado e flags pelas
+    tabelas LUT_* (ver core/alu.py); `io` passa os acessos a endereços
+    mapeados pelo barramento de dispositivos (core/devices.py).
+    """
+    entry = DECODE_TABLE[instr_byte]
+    if entry is None:
+        return None
+    mnemon, dst, src, _ = entry
+    name = f"op_{instr_byte:02X}"
+    if mnemon == 'nop':
+        body = ["pass"]
+    elif instr_byte in JUMP_MASKS:
+        body = _jump_lines(JUMP_MASKS[instr_byte], lazy, "x")
+    else:
+        lines, flags = ALU_OPS[mnemon]
+        body = []
+        if mnemon not in NO_READ_DST:
+            body.append(f"a = {_read(dst, io)}")
+        if src is not None:
+            body.append(f"b = {_read(src, io)}")
+        if lut and mnemon != 'mov':
+            lines, flags_lines = _lut_lines(mnemon)
+            body += lines + flags_lines
+        else:
+            body += lines
+            if flags is not None:
+                body += _flags_lines(mnemon, lazy)
+        if mnemon not in NO_STORE:
+            body += _write(dst, "r", io)
+    return f"def {name}(cpu, x):\n" + "".join(f"    {ln}\n" for ln in body)
+
+
+def fused_source(jump_byte, lazy=False):
+    """
+    Superinstrução "instrução que altera flags + salto condicional".
+    `x` é a tupla (handler da primeira, byte extra da primeira, destino).
+    """
+    body = ["x[0](cpu, x[1])"] + _jump_lines(JUMP_MASKS[jump_byte], lazy, "x[2]")
+    return f"def fused_{jump_byte:02X}(cpu, x):\n" + "".join(f"    {ln}\n" for ln in body)
+
+
+def lazy_flags_source():
+    """
+    Função que materializa FLAGS a partir de um registro de cpu._lazy.
+    Usa as mesmas expressões de ALU_OPS, então o byte é idêntico ao modo normal.
+    """
+    body = ["k, a, b, r = rec"]
+    for mnemon, kind in LAZY_KINDS.items():
+        flags = ALU_OPS[mnemon][1]
+        body.append(f"if k == {kind}:")
+        if mnemon in CARRY_IN:
+            body.append("    cf = (lazy_flags(b, flags) if b is not None else flags) & 0x40")
+        body.append(f"    return {flags.format(cf='cf')}")
+    body.append("raise ValueError('Invalid lazy flags record')")
+    return "def lazy_flags(rec, flags):\n" + "".join(f"    {ln}\n" for ln in body)
+
+
+# =========================
+# CACHE DE CÓDIGO COMPILADO
+# =========================
+def default_code_cache_dir():
+    base = os.environ.get('Z70_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'z70')
+    return os.path.join(base, 'code')
+
+
+def compiled(code, filename):
+    """
+    compile(code) com cache em disco: a chave é o SHA-256 do fonte e da versão
+    do Python (o formato do marshal muda entre versões). Falhas de E/S só
+    fazem compilar de novo.
+    """
+    key = hashlib.sha256(f"{sys.version}\0{filename}\0{code}".encode()).hexdigest()
+    path = os.path.join(default_code_cache_dir(), key + '.bin')
+    try:
+        with open(path, 'rb') as f:
+            return marshal.loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+    obj = compile(code, filename, "exec")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(marshal.dumps(obj))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return obj
+
+
+def build_handlers(lazy=False, lut=None, io=False):
+    """
+    Compila todos os handlers de uma vez.
+    `lut` é o dicionário {nome: tabela} da ULA por LUT, ou None.
+    Retorna (lista de 256 handlers, {byte do salto: handler fundido}).
+    """
+    if lazy and lut:
+        raise ValueError("Lazy flags and LUT ALU are exclusive")
+    sources = [handler_source(b, lazy, bool(lut), io) for b in range(256)]
+    conds = [b for b, mask in JUMP_MASKS.items() if mask]
+    namespace = {'ZSP': ZSP}
+    namespace.update(lut or {})
+    code = "\n".join(s for s in sources if s) + "\n" + "\n".join(fused_source(b, lazy) for b in conds)
+    exec(compiled(code, "<z70-handlers>"), namespace)
+    handlers = [namespace[f"op_{b:02X}"] if sources[b] else None for b in range(256)]
+    fused = {b: namespace[f"fused_{b:02X}"] for b in conds}
+    return handlers, fused
+
+
+def build_fusible():
+    """
+    Bytes que só alteram flags/registradores e podem ser fundidos com o salto
+    condicional seguinte (não escrevem em memória, então não podem reescrever
+    o próprio salto).
+    """
+    table = bytearray(256)
+    for b, entry in enumerate(DECODE_TABLE):
+        if entry is None:
+            continue
+        mnemon, dst, _, _ = entry
+        if mnemon in ALU_OPS and ALU_OPS[mnemon][1] is not None:
+            if mnemon in NO_STORE or dst[0] == 'reg':
+                table[b] = 1
+    return table
+
+
+# Destino em memória de cada byte: 0 nenhum, MEM_IND em [I], MEM_DIR em [x]
+MEM_IND = 1
+MEM_DIR = 2
+
+
+def _mem_kind(loc):
+    if loc is not None and loc[0] == 'ind_i':
+        return MEM_IND
+    if loc is not None and loc[0] == 'dir':
+        return MEM_DIR
+    return 0
+
+
+def build_mem_dst():
+    """
+    Onde cada instrução escreve na memória (o journal de core/journal.py
+    guarda o byte antigo antes de executá-la).
+    """
+    table = bytearray(256)
+    for b, entry in enumerate(DECODE_TABLE):
+        if entry is None:
+            continue
+        mnemon, dst, _, _ = entry
+        if mnemon in ALU_OPS and mnemon not in NO_STORE:
+            table[b] = _mem_kind(dst)
+    return bytes(table)
+
+
+def build_mem_src():
+    """
+    Onde cada instrução lê da memória (cada modo tem no máximo um operando
+    em memória, lido como destino ou como fonte).
+    """
+    table = bytearray(256)
+    for b, entry in enumerate(DECODE_TABLE):
+        if entry is None:
+            continue
+        mnemon, dst, src, _ = entry
+        if mnemon in ALU_OPS:
+            read_dst = _mem_kind(dst) if mnemon not in NO_READ_DST else 0
+            table[b] = read_dst or _mem_kind(src)
+    return bytes(table)
+
+
+_handlers = {}
+_io_handlers = {}
+
+
+def handlers(lazy=False):
+    """(BYTE_HANDLERS, FUSED_HANDLERS), ou os de flags preguiçosas (gerados no primeiro uso)."""
+    if lazy not in _handlers:
+        _handlers[lazy] = build_handlers(lazy=lazy)
+    return _handlers[lazy]
+
+
+def io_handlers(lazy=False):
+    """Handlers com barramento de dispositivos (gerados no primeiro uso)."""
+    if lazy not in _io_handlers:
+        _io_handlers[lazy] = build_handlers(lazy=lazy, io=True)
+    return _io_handlers[lazy]
+
+
+def _build_lazy_flags():
+    namespace = {'ZSP': ZSP}
+    exec(compiled(lazy_flags_source(), "<z70-lazy-flags>"), namespace)
+    return namespace['lazy_flags']
+
+
+# Tabelas de handlers como atributos do módulo, geradas só quando lidas
+_HANDLER_TABLES = {
+    'BYTE_HANDLERS': (False, 0), 'FUSED_HANDLERS': (False, 1),
+    'LAZY_BYTE_HANDLERS': (True, 0), 'LAZY_FUSED_HANDLERS': (True, 1),
+}
+
+
+def __getattr__(name):
+    if name in _HANDLER_TABLES:
+        lazy, i = _HANDLER_TABLES[name]
+        return handlers(lazy)[i]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+FUSIBLE = build_fusible()
+MEM_DST = build_mem_dst()
+MEM_SRC = build_mem_src()
+lazy_flags = _build_lazy_flags()
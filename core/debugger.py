@@ -0,0 +1,116 @@
+"""
+Breakpoints e watchpoints da CPU.
+
+Tudo fica em bitmaps de 256 posições, consultados pelo laço de depuração
+da CPU (CPU._run_debug) com um acesso indexado por passo:
+
+- `pcs`: endereços com breakpoint. As condições (valores de registradores
+  e flags) só são avaliadas quando o PC cai num endereço marcado;
+- `reads` / `writes`: endereços de memória vigiados.
+
+Sem nada marcado, CPU.run() nem olha para cá e segue no laço rápido.
+"""
+
+REGISTERS = ('A', 'B', 'I')
+FLAG_BITS = {'OF': 7, 'CF': 6, 'ZF': 5, 'PF': 4, 'SF': 3}
+
+_EMPTY = bytes(256)
+
+
+def _check_range(start, end):
+    if end is None:
+        end = start
+    if not 0 <= start <= end <= 0xFF:
+        raise ValueError(f"Invalid address range: {start:X}H-{end:X}H")
+    return start, end
+
+
+def _compile_condition(cond):
+    """{'A': 05H, 'ZF': 1} -> ((nome, valor), ...), validando nomes e valores."""
+    items = []
+    for name, value in sorted(cond.items()):
+        if name in REGISTERS:
+            limit = 0xFF
+        elif name in FLAG_BITS:
+            limit = 1
+        else:
+            raise ValueError(f"Invalid breakpoint condition: {name}")
+        if not 0 <= value <= limit:
+            raise ValueError(f"Invalid value for {name}: {value}")
+        items.append((name, value))
+    return tuple(items)
+
+
+class Breakpoints:
+    def __init__(self):
+        self.pcs = bytearray(256)
+        self.reads = bytearray(256)
+        self.writes = bytearray(256)
+        # pc -> condições; () = para sempre
+        self.conditions = {}
+
+    @property
+    def active(self):
+        return self.pcs != _EMPTY or self.watching
+
+    @property
+    def watching(self):
+        return self.reads != _EMPTY or self.writes != _EMPTY
+
+    # =========================
+    # BREAKPOINTS
+    # =========================
+    def add(self, pc, **cond):
+        """
+        Breakpoint em `pc`. Com condições (ex.: A=05H, ZF=1), só para quando
+        todas valem; vários add() no mesmo endereço param se qualquer um valer.
+        """
+        _check_range(pc, pc)
+        compiled = _compile_condition(cond)
+        conds = self.conditions.setdefault(pc, [])
+        if compiled not in conds:
+            conds.append(compiled)
+        self.pcs[pc] = 1
+
+    def remove(self, pc):
+        self.conditions.pop(pc, None)
+        self.pcs[pc] = 0
+
+    def hit(self, cpu, pc):
+        """Alguma condição do breakpoint em `pc` vale no estado atual?"""
+        for cond in self.conditions.get(pc, ()):
+            for name, value in cond:
+                if name in FLAG_BITS:
+                    if (cpu.FLAGS >> FLAG_BITS[name]) & 1 != value:
+                        break
+                elif getattr(cpu, name) != value:
+                    break
+            else:
+                return True
+        return False
+
+    # =========================
+    # WATCHPOINTS
+    # =========================
+    def watch(self, start, end=None, read=False, write=True):
+        """Para depois de uma instrução que lê/escreve em start..end (inclusive)."""
+        start, end = _check_range(start, end)
+        if not (read or write):
+            raise ValueError("Watchpoint needs read or write")
+        n = end - start + 1
+        if read:
+            self.reads[start:end + 1] = b"\x01" * n
+        if write:
+            self.writes[start:end + 1] = b"\x01" * n
+
+    def unwatch(self, start, end=None):
+        start, end = _check_range(start, end)
+        n = end - start + 1
+        self.reads[start:end + 1] = bytes(n)
+        self.writes[start:end + 1] = bytes(n)
+
+    def clear(self):
+        self.pcs[:] = _EMPTY
+        self.reads[:] = _EMPTY
+        self.writes[:] = _EMPTY
+        self.conditions = {}
@@ -0,0 +1,128 @@
+"""
+Barramento de dispositivos mapeados em memória.
+
+Faixas de endereços podem ser ligadas a dispositivos. Uma leitura num
+endereço mapeado devolve o valor do dispositivo (a RAM não muda); uma escrita
+vai para a RAM, como sempre, e também para o dispositivo, então dump e
+painéis continuam mostrando o que o programa escreveu.
+
+A detecção de laços (CPU.run(detect_loops=True)) inclui no estado da CPU o
+state() de cada dispositivo: um programa esperando entrada só repete estado
+quando a entrada acabou. Dispositivos cujas leituras dependem de estado
+interno devem sobrescrever state().
+
+A CPU só usa os handlers com barramento (core.codegen.io_handlers) quando
+recebe um `bus`; sem dispositivos o caminho rápido é o mesmo de sempre.
+Os dispositivos são ligados pelo Z70.py (--console, --input) e pela API
+(core.api.run_program(bus=...)); a interface gráfica ainda não os mapeia.
+"""
+import sys
+
+
+class Device:
+    """Dispositivo genérico: lê 0 e ignora escritas."""
+
+    def read(self, addr):
+        return 0
+
+    def write(self, addr, value):
+        pass
+
+    def state(self):
+        """Valor que muda sempre que as próximas leituras podem mudar."""
+        return None
+
+
+class ConsoleDevice(Device):
+    """
+    Console de saída: cada byte escrito vira um caractere enviado a `write`
+    (sys.stdout.write por padrão; a interface gráfica pode passar a sua).
+    """
+
+    def __init__(self, write=None):
+        self._write = write or sys.stdout.write
+        self.written = bytearray()
+
+    def write(self, addr, value):
+        self.written.append(value)
+        self._write(chr(value))
+
+    def text(self):
+        return self.written.decode('latin-1')
+
+
+class InputDevice(Device):
+    """
+    Entrada: cada leitura consome o próximo byte de `source` (bytes ou
+    arquivo binário, como sys.stdin.buffer); no fim devolve `eof`.
+    """
+
+    def __init__(self, source, eof=0):
+        if isinstance(source, (bytes, bytearray)):
+            self._data = bytes(source)
+            self._file = None
+        else:
+            self._data = b""
+            self._file = source
+        self._pos = 0
+        self.eof = eof
+        # Bytes entregues até agora (no fim da entrada para de mudar)
+        self.consumed = 0
+
+    def read(self, addr):
+        if self._pos >= len(self._data):
+            if self._file is None:
+                return self.eof
+            self._data = self._file.read(4096) or b""
+            self._pos = 0
+            if not self._data:
+                return self.eof
+        b = self._data[self._pos]
+        self._pos += 1
+        self.consumed += 1
+        return b
+
+    def state(self):
+        return self.consumed
+
+
+class Bus:
+    def __init__(self):
+        # Índice do dispositivo em cada endereço (0 = RAM)
+        self.mapped = bytearray(256)
+        self.devices = [None]
+
+    def map(self, start, end, device):
+        """Liga os endereços start..end (inclusive) a `device`."""
+        if not 0 <= start <= end <= 0xFF:
+            raise ValueError(f"Invalid device range: {start:X}H-{end:X}H")
+        if any(self.mapped[start:end + 1]):
+            raise ValueError(f"Device range {start:02X}H-{end:02X}H overlaps another device")
+        if len(self.devices) > 255:
+            raise ValueError("Too many devices")
+        self.devices.append(device)
+        self.mapped[start:end + 1] = bytes([len(self.devices) - 1]) * (end - start + 1)
+        return device
+
+    def read(self, addr):
+        return self.devices[self.mapped[addr]].read(addr) & 0xFF
+
+    def write(self, addr, value):
+        self.devices[self.mapped[addr]].write(addr, value)
+
+    def state(self):
+        return tuple(dev.state() for dev in self.devices[1:])
+
+    def muted(self):
+        """Mesmo mapeamento, com as escritas descartadas (leituras continuam)."""
+        return MutedBus(self)
+
+
+class MutedBus:
+    def __init__(self, bus):
+        self.mapped = bus.mapped
+        self.read = bus.read
+        self.state = bus.state
+
+    def write(self, addr, value):
+        pass
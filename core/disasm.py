@@ -0,0 +1,182 @@
+"""
+Desmontador dirigido por tabela.
+
+Depois que o programa altera a própria memória (código automodificável, ou
+dados na área de código) o `listing` da montagem deixa de descrever a
+memória. Aqui cada byte de instrução é decodificado por DISASM_TABLE, uma
+tabela de 256 entradas derivada da mesma DECODE_TABLE que a CPU usa (e por
+ela de MODES/UNARY_MODES/OPCODES/JUMP_CODES).
+
+A varredura é linear a partir de 0 até `program_end`; os destinos dos saltos
+viram rótulos (o nome dado na montagem, se houver, senão LxxH) nos pontos
+que são início de instrução. Para um programa montado, o texto gerado
+(`source()`) monta de novo nos mesmos bytes e rótulos.
+
+O Disassembler é incremental: `update()` compara a memória com a anterior e
+só decodifica de novo as instruções que cobrem bytes alterados, até a
+varredura voltar a cair nos inícios de instrução antigos.
+"""
+from bisect import bisect_left, bisect_right
+
+from core.arch import DECODE_TABLE
+
+# Bytes que não são instrução (ou instrução cortada no fim da memória)
+INVALID = (1, "db {:02X}H", None)
+
+
+def _operand(loc):
+    kind, value = loc
+    if kind == 'reg':
+        return value
+    if kind == 'ind_i':
+        return '[I]'
+    if kind == 'const':
+        return '{:02X}H'
+    return '[{:02X}H]'
+
+
+def build_disasm_table():
+    """
+    byte de instrução -> (tamanho, formato do texto, salto?).
+    O formato recebe o byte extra; nos saltos, o nome do rótulo.
+    """
+    table = [None] * 256
+    for op, entry in enumerate(DECODE_TABLE):
+        if entry is None:
+            continue
+        mnemon, dst, src, size = entry
+        if dst is None:
+            table[op] = (size, mnemon, False)
+        elif dst[0] == 'addr':
+            table[op] = (size, mnemon + ' {}', True)
+        else:
+            ops = [_operand(dst)] + ([_operand(src)] if src is not None else [])
+            table[op] = (size, f"{mnemon} {', '.join(ops)}", False)
+    return table
+
+
+DISASM_TABLE = build_disasm_table()
+
+
+def decode(mem, addr, names=None):
+    """(tamanho, texto, destino do salto ou None) da instrução em `addr`."""
+    size, fmt, jump = DISASM_TABLE[mem[addr]] or INVALID
+    if addr + size > 256:
+        size, fmt, jump = INVALID
+    if size == 1:
+        return 1, fmt.format(mem[addr]), None
+    x = mem[addr + 1]
+    if jump:
+        return size, fmt.format(label_name(x, names)), x
+    return size, fmt.format(x), None
+
+
+def label_name(addr, names=None):
+    """Primeiro nome dado a `addr` em `names` (endereço -> [nomes]), ou LxxH."""
+    if names and addr in names:
+        return names[addr][0]
+    return f"L{addr:02X}H"
+
+
+class Disassembler:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._mem = None
+        self._end = None
+        self._names = {}
+        self.starts = []
+        self._info = {}
+        # Quantas instruções foram decodificadas no último update()
+        self.decoded = 0
+
+    def update(self, mem, program_end, labels=None):
+        """
+        Atualiza a desmontagem de `mem[0:program_end]`. `labels` (nome ->
+        endereço, como o da montagem) dá nome aos rótulos recuperados.
+        Devolve os endereços de instrução decodificados de novo.
+        """
+        mem = bytes(mem)
+        names = {}
+        for name, addr in (labels or {}).items():
+            names.setdefault(addr, []).append(name)
+        old = self._mem
+        self._mem = mem
+        if old is None or program_end != self._end or names != self._names:
+            # Tudo de novo: os nomes entram no texto dos saltos
+            self._end, self._names = program_end, names
+            self.starts, self._info = [], {}
+            return self._sweep(program_end, [])
+        if mem == old:
+            self.decoded = 0
+            return []
+        return self._sweep(program_end, [a for a in range(256) if mem[a] != old[a]])
+
+    def _sweep(self, end, changed):
+        """Varredura linear reaproveitando instruções antigas fora de `changed`."""
+        old_starts, info, mem, names = self.starts, self._info, self._mem, self._names
+        addr = 0
+        starts = []
+        redone = []
+        ci = 0
+        while addr < end:
+            while ci < len(changed) and changed[ci] < addr:
+                ci += 1
+            nxt = changed[ci] if ci < len(changed) else 256
+            k = bisect_left(old_starts, addr)
+            if k < len(old_starts) and old_starts[k] == addr:
+                # Alinhado com a varredura antiga: copia tudo que termina antes de `nxt`
+                stop = bisect_right(old_starts, nxt, k)
+                while stop > k and old_starts[stop - 1] + info[old_starts[stop - 1]][0] > nxt:
+                    stop -= 1
+                if stop > k:
+                    starts += old_starts[k:stop]
+                    last = old_starts[stop - 1]
+                    addr = last + info[last][0]
+                    continue
+            size, text, target = info[addr] = decode(mem, addr, names)
+            starts.append(addr)
+            redone.append(addr)
+            addr += size
+        for a in set(info).difference(starts):
+            del info[a]
+        self.starts = starts
+        self.decoded = len(redone)
+        return redone
+
+    # =========================
+    # CONSULTA
+    # =========================
+    def targets(self):
+        return {info[2] for info in self._info.values() if info[2] is not None}
+
+    def label_addresses(self):
+        """Endereços com rótulo: destinos de salto e rótulos dados, em início de instrução (ou no fim)."""
+        points = set(self.starts)
+        points.add(self._end)
+        wanted = self.targets() | set(self._names)
+        return sorted(wanted & points)
+
+    def at(self, pc):
+        """Texto da instrução em `pc`, mesmo fora da varredura."""
+        info = self._info.get(pc)
+        if info is None:
+            info = decode(self._mem, pc, self._names)
+        return info[1]
+
+    def lines(self):
+        """[(endereço, bytes, texto)] como o listing da montagem."""
+        mem = self._mem
+        return [(a, list(mem[a:a + self._info[a][0]]), self._info[a][1]) for a in self.starts]
+
+    def source(self):
+        """Linhas de fonte Z70 (com rótulos) equivalentes à memória varrida."""
+        labels = set(self.label_addresses())
+        out = []
+        for a in self.starts + [self._end]:
+            if a in labels:
+                out += [f"{name}:" for name in self._names.get(a) or [label_name(a)]]
+            if a in self._info:
+                out.append(f"    {self._info[a][1]}")
+        return out
@@ -0,0 +1,126 @@
+"""
+Ganchos de instrumentação da CPU.
+
+Ferramentas externas (tracers, cobertura, correção automática) registram
+funções em quatro pontos da execução:
+
+- 'pre_step'  f(cpu, pc)                 antes de cada instrução;
+- 'post_step' f(cpu, pc)                 depois de cada instrução;
+- 'mem_write' f(cpu, addr, value)        depois de cada escrita em memória;
+- 'branch'    f(cpu, pc, target, taken)  depois de cada salto.
+
+Para cada combinação de tipos registrados é gerado (como os handlers de
+core/codegen.py) um laço próprio que só contém o código daqueles tipos: um
+tipo sem ganchos não custa nada e os usados não testam "há gancho?" a cada
+passo. Os ganchos observam a execução; não devem alterar a CPU.
+"""
+from core.arch import JUMP_MASKS
+from core.codegen import MEM_DST, MEM_IND
+from core.profile import COND_MASKS
+
+HOOK_KINDS = ('pre_step', 'post_step', 'mem_write', 'branch')
+
+# 1 nos bytes de salto (condicional ou não)
+JUMPS = bytes(1 if b in JUMP_MASKS else 0 for b in range(256))
+
+
+def _fanout(fns):
+    if len(fns) == 1:
+        return fns[0]
+
+    def call_all(*args):
+        for f in fns:
+            f(*args)
+    return call_all
+
+
+def loop_source(kinds, hooked=False):
+    """
+    Código do laço para os tipos em `kinds`. A função gerada executa até `n`
+    instruções a partir de `pc` (parando no fim do programa) e devolve
+    quantas executou. `hooked` passa cada passo por journal/trace.
+    """
+    body = ["for i in range(n):", "    rec = cache[pc] or cpu._decode(pc)"]
+    if 'pre_step' in kinds:
+        body.append("    pre(cpu, pc)")
+    if 'mem_write' in kinds or 'branch' in kinds:
+        body.append("    op = mem[pc]")
+    if 'mem_write' in kinds:
+        body += [
+            "    kind = MEM_DST[op]",
+            "    if kind:",
+            "        waddr = cpu.I if kind == MEM_IND else rec[1]",
+        ]
+    if 'branch' in kinds:
+        body += [
+            "    jump = JUMPS[op]",
+            "    if jump:",
+            "        mask = COND_MASKS[op]",
+            "        taken = not mask or bool(cpu.FLAGS & mask)",
+        ]
+    body.append("    cpu._perf += rec[3]")
+    if hooked:
+        body.append("    cpu._exec_hooked(pc, rec)")
+    else:
+        body += ["    cpu.PC = rec[2]", "    rec[0](cpu, rec[1])"]
+    if 'mem_write' in kinds:
+        body += ["    if kind:", "        write(cpu, waddr, mem[waddr])"]
+    if 'branch' in kinds:
+        body += ["    if jump:", "        branch(cpu, pc, rec[1], taken)"]
+    if 'post_step' in kinds:
+        body.append("    post(cpu, pc)")
+    body += [
+        "    pc = cpu.PC",
+        "    if pc >= end:",
+        "        return i + 1",
+        "return n",
+    ]
+    return ("def run_hooks(cpu, pc, n, end, cache, mem, pre, post, write, branch):\n"
+            + "".join(f"    {ln}\n" for ln in body))
+
+
+_loops = {}
+
+
+def hook_loop(kinds, hooked=False):
+    """Laço especializado (gerado no primeiro uso de cada combinação)."""
+    key = (frozenset(kinds), hooked)
+    if key not in _loops:
+        namespace = {'MEM_DST': MEM_DST, 'MEM_IND': MEM_IND,
+                     'JUMPS': JUMPS, 'COND_MASKS': COND_MASKS}
+        exec(compile(loop_source(*key), "<z70-hooks>", "exec"), namespace)
+        _loops[key] = namespace['run_hooks']
+    return _loops[key]
+
+
+class Hooks:
+    def __init__(self):
+        self._fns = {kind: [] for kind in HOOK_KINDS}
+
+    def add(self, kind, fn):
+        if kind not in self._fns:
+            raise ValueError(f"Invalid hook kind: {kind}")
+        self._fns[kind].append(fn)
+
+    def remove(self, kind, fn):
+        if kind not in self._fns:
+            raise ValueError(f"Invalid hook kind: {kind}")
+        if fn in self._fns[kind]:
+            self._fns[kind].remove(fn)
+
+    def clear(self):
+        for fns in self._fns.values():
+            fns.clear()
+
+    @property
+    def kinds(self):
+        return frozenset(kind for kind, fns in self._fns.items() if fns)
+
+    @property
+    def active(self):
+        return any(self._fns.values())
+
+    def callbacks(self):
+        """(pre, post, write, branch): uma função por tipo, ou None."""
+        return tuple(_fanout(list(self._fns[kind])) if self._fns[kind] else None
+                     for kind in HOOK_KINDS)
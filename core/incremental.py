@@ -0,0 +1,129 @@
+"""
+Montador incremental para a interface gráfica.
+
+A cada edição o editor pede a montagem do texto inteiro de novo. Aqui o
+resultado de preprocess/parse_line/tamanho fica em cache por texto de linha,
+então só linhas novas ou alteradas são analisadas. Os endereços só são
+recalculados a partir da primeira instrução cujo tamanho mudou, e cada
+instrução só é codificada de novo se o texto dela ou o endereço do rótulo
+de destino mudou.
+
+O resultado é o mesmo de preprocess + first_pass + second_pass (mem,
+listing, code_end e os rótulos), mais a lista de endereços cujo byte mudou
+desde a montagem anterior; `source_map` fica com o SourceMap do texto
+montado. Em qualquer erro o estado é descartado e a
+montagem completa (assemble) é refeita, então as exceções também são as mesmas.
+"""
+from core.arch import JUMP_CODES
+from core.assembler import preprocess, parse_line, get_instr_size, encode, assemble, source_map, SourceMap
+
+# Tamanho máximo dos caches (entradas); ao passar, são esvaziados
+CACHE_LIMIT = 4096
+
+
+def _parse(text):
+    """(rótulo, instrução, args, linha, tamanho) de uma linha, ou None se vazia."""
+    pp = preprocess([text])
+    if not pp:
+        return None
+    label, instr, args, orig = parse_line(pp[0])
+    size = get_instr_size(instr, args) if instr else 0
+    return label, instr, args, orig, size
+
+
+class IncrementalAssembler:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lines = {}
+        self._encoded = {}
+        self._sizes = []
+        self._addrs = []
+        self._mem = None
+        self.labels = {}
+        self.source_map = None
+        # Quantas linhas foram analisadas e instruções codificadas na última montagem
+        self.parsed = 0
+        self.encoded = 0
+
+    def assemble(self, lines):
+        """(mem, listing, code_end, endereços alterados) de `lines`."""
+        try:
+            return self._assemble(lines)
+        except Exception:
+            self.reset()
+        # Refaz tudo pelo caminho normal: levanta o mesmo erro da montagem completa
+        mem, listing, code_end, self.labels = assemble(lines)
+        self.source_map = source_map(lines, listing)
+        return mem, listing, code_end, list(range(256))
+
+    def _assemble(self, lines):
+        cache = self._lines
+        if len(cache) > CACHE_LIMIT:
+            cache.clear()
+        self.parsed = self.encoded = 0
+
+        # Instruções (instr, args, linha, tamanho), índice da linha de cada uma
+        # e rótulos (nome, índice da instrução seguinte)
+        instrs = []
+        numbers = []
+        label_defs = []
+        for n, text in enumerate(lines):
+            if text not in cache:
+                cache[text] = _parse(text)
+                self.parsed += 1
+            info = cache[text]
+            if info is None:
+                continue
+            label, instr, args, orig, size = info
+            if label:
+                label_defs.append((label, len(instrs)))
+            if instr:
+                instrs.append((instr, args, orig, size))
+                numbers.append(n)
+
+        # Endereços: iguais aos anteriores até a primeira instrução que mudou de tamanho
+        sizes = [ins[3] for ins in instrs]
+        first = 0
+        limit = min(len(sizes), len(self._sizes))
+        while first < limit and sizes[first] == self._sizes[first]:
+            first += 1
+        addrs = self._addrs[:first]
+        addr = addrs[-1] + sizes[first - 1] if first else 0
+        for size in sizes[first:]:
+            addrs.append(addr)
+            addr += size
+        code_end = addr
+
+        labels = {}
+        for label, k in label_defs:
+            if label in labels:
+                raise ValueError(f"Duplicate label: {label}")
+            labels[label] = addrs[k] if k < len(addrs) else code_end
+
+        # Codificação: chave = texto da instrução e, nos saltos, endereço do destino
+        encoded = self._encoded
+        if len(encoded) > CACHE_LIMIT:
+            encoded.clear()
+        mem = [0] * 256
+        listing = []
+        for (instr, args, orig, _), start in zip(instrs, addrs):
+            target = labels.get(args[0]) if instr in JUMP_CODES and len(args) == 1 else None
+            key = (orig, target)
+            bytes_list = encoded.get(key)
+            if bytes_list is None:
+                bytes_list = encoded[key] = encode(instr, args, labels, start)
+                self.encoded += 1
+            a = start
+            for b in bytes_list:
+                mem[a] = b
+                a += 1
+            listing.append((start, bytes_list, orig))
+
+        prev = self._mem
+        changed = list(range(256)) if prev is None else [a for a in range(256) if mem[a] != prev[a]]
+        self._sizes, self._addrs, self._mem = sizes, addrs, mem
+        self.labels = labels
+        self.source_map = SourceMap(listing, numbers)
+        return list(mem), listing, code_end, changed
@@ -0,0 +1,303 @@
+"""
+JIT de blocos: traduz o código Z70 para funções Python.
+
+Cada bloco começa num endereço de entrada e segue em linha reta até um `jmp`,
+um salto para fora ou o fim do programa. Saltos condicionais viram saídas
+laterais (`if F & mask: return destino`), e um salto de volta para a entrada
+do próprio bloco vira um `while True:`, então laços inteiros rodam sem sair
+da função. Dentro do bloco A, B, I e FLAGS são variáveis locais; só são
+gravados de volta na CPU na saída.
+
+Os blocos ficam numa tabela de 256 entradas indexada pelo endereço de
+entrada; cada bloco devolve o endereço do sucessor e o laço de run() segue
+direto para ele. Uma escrita em memória que cai dentro de um bloco compilado
+invalida os blocos que cobrem o endereço e sai imediatamente, então código
+auto-modificável continua correto.
+"""
+import re
+
+from core.arch import DECODE_TABLE, JUMP_MASKS
+from core.codegen import ALU_OPS, ZSP, CARRY_IN, NO_STORE, NO_READ_DST
+
+# Tamanho máximo de um bloco (em instruções)
+MAX_BLOCK = 64
+
+# Blocos já compilados, compartilhados entre instâncias: o código gerado só
+# depende do endereço de entrada e dos bytes do bloco.
+_compiled = {}
+COMPILED_LIMIT = 4096
+
+
+class Instr:
+    def __init__(self, pc, instr_byte, extra):
+        self.pc = pc
+        self.byte = instr_byte
+        self.extra = extra
+        self.mnemon, self.dst, self.src, self.size = DECODE_TABLE[instr_byte]
+        self.next = pc + self.size
+
+    @property
+    def is_jump(self):
+        return self.byte in JUMP_MASKS
+
+    @property
+    def sets_flags(self):
+        return self.mnemon in ALU_OPS and ALU_OPS[self.mnemon][1] is not None
+
+    @property
+    def writes_mem(self):
+        return (self.mnemon in ALU_OPS and self.mnemon not in NO_STORE
+                and self.dst[0] in ('ind_i', 'dir'))
+
+
+def _read(loc, extra):
+    kind, val = loc
+    if kind == 'reg':
+        return val
+    elif kind == 'ind_i':
+        return "mem[I]"
+    elif kind == 'const':
+        return f"0x{extra:02X}"
+    elif kind == 'dir':
+        return f"mem[0x{extra:02X}]"
+    raise ValueError("Invalid loc")
+
+
+class BlockJIT:
+    def __init__(self, cpu):
+        if cpu.bus is not None:
+            raise ValueError("Block JIT does not support a device bus")
+        self.cpu = cpu
+        self.blocks = [None] * 256
+        # Endereços cobertos por algum bloco e, para cada um, as entradas dos blocos
+        self.covered = bytearray(256)
+        self.owners = [set() for _ in range(256)]
+        self.sources = {}
+
+    # =========================
+    # EXECUÇÃO
+    # =========================
+    def run(self):
+        cpu = self.cpu
+        # O cache do interpretador não vê as escritas feitas pelo JIT
+        cpu.invalidate_decode()
+        end = cpu.program_end
+        blocks = self.blocks
+        mem = cpu.mem
+        covered = self.covered
+        pc = cpu.PC
+        try:
+            while pc < end:
+                fn = blocks[pc] or self.compile(pc)
+                pc = fn(cpu, mem, covered, self)
+        finally:
+            cpu.PC = pc
+            cpu.invalidate_decode()
+
+    def invalidate(self, addr=None):
+        if addr is None:
+            self.blocks[:] = [None] * 256
+            self.covered[:] = bytes(256)
+            for owners in self.owners:
+                owners.clear()
+            return
+        for entry in self.owners[addr]:
+            self.blocks[entry] = None
+        self.owners[addr].clear()
+        self.covered[addr] = 0
+
+    # =========================
+    # COMPILAÇÃO
+    # =========================
+    def collect(self, entry):
+        """Instruções do bloco que começa em `entry`."""
+        mem = self.cpu.mem
+        end = self.cpu.program_end
+        instrs = []
+        pc = entry
+        while pc < end and len(instrs) < MAX_BLOCK:
+            instr_byte = mem[pc]
+            entry_info = DECODE_TABLE[instr_byte]
+            if entry_info is None or pc + entry_info[3] > 256:
+                break
+            ins = Instr(pc, instr_byte, mem[pc + 1] if entry_info[3] == 2 else None)
+            instrs.append(ins)
+            if ins.byte == 0xA0:
+                break
+            pc = ins.next
+        return instrs
+
+    def compile(self, entry):
+        instrs = self.collect(entry)
+        if not instrs:
+            # Instrução inválida: o interpretador gera o erro
+            return self._fallback(entry)
+        key = (entry, bytes(self.cpu.mem[entry:instrs[-1].next]))
+        cached = _compiled.get(key)
+        if cached is None:
+            src = self.source(entry, instrs)
+            namespace = {'ZSP': ZSP}
+            exec(compile(src, f"<z70-block-{entry:02X}>", "exec"), namespace)
+            if len(_compiled) >= COMPILED_LIMIT:
+                _compiled.clear()
+            cached = _compiled[key] = (namespace[f"block_{entry:02X}"], src)
+        fn, self.sources[entry] = cached
+        self.blocks[entry] = fn
+        for ins in instrs:
+            for a in range(ins.pc, ins.next):
+                self.covered[a] = 1
+                self.owners[a].add(entry)
+        return fn
+
+    def _fallback(self, entry):
+        def step(cpu, mem, covered, jit):
+            cpu.PC = entry
+            cpu.step()
+            return cpu.PC
+        return step
+
+    @staticmethod
+    def _head_live(entry, instrs):
+        """
+        Bits de FLAGS que podem ser lidos a partir da entrada do bloco antes
+        de serem sobrescritos (ponto fixo por causa do salto de volta).
+        """
+        head = 0
+        while True:
+            live = 0xF8
+            if instrs[-1].byte == 0xA0:
+                live = head if instrs[-1].extra == entry else 0xF8
+            for ins in reversed(instrs):
+                if ins.is_jump:
+                    back = head if ins.extra == entry else 0xF8
+                    if ins.byte == 0xA0:
+                        live = back
+                    else:
+                        live |= back | JUMP_MASKS[ins.byte]
+                    continue
+                if ins.writes_mem:
+                    live = 0xF8
+                if ins.sets_flags:
+                    live = 0x40 if ins.mnemon in CARRY_IN and live & 0x40 else 0
+            if live | head == head:
+                return head
+            head |= live
+
+    def source(self, entry, instrs):
+        written = set()
+        for ins in instrs:
+            if ins.sets_flags:
+                written.add('F')
+            if ins.mnemon in ALU_OPS and ins.mnemon not in NO_STORE and ins.dst[0] == 'reg':
+                written.add(ins.dst[1])
+        regs = [r for r in ('A', 'B', 'I') if r in written]
+        head_live = self._head_live(entry, instrs)
+
+        # Estado das flags durante a compilação: `pending` é a última operação
+        # que alterou as flags e ainda não foi gravada em F; `valid` são os
+        # bits de F que continuam corretos mesmo assim (inc/dec preservam CF).
+        state = {'pending': None, 'valid': 0xF8}
+
+        def materialize():
+            p = state['pending']
+            if p is None:
+                return []
+            return [f"F = {p}"]
+
+        def exit_lines(target):
+            out = [f"cpu.{r} = {r}" for r in regs]
+            if 'F' in written:
+                out += materialize() + ["cpu.FLAGS = F"]
+            return out + [f"return 0x{target:02X}"]
+
+        def back_edge():
+            if state['pending'] is not None and head_live & ~state['valid']:
+                return materialize() + ["continue"]
+            return ["continue"]
+
+        def branch(target):
+            return back_edge() if target == entry else exit_lines(target)
+
+        loops = any(ins.is_jump and ins.extra == entry for ins in instrs)
+        body = []
+        for n, ins in enumerate(instrs):
+            body.append(f"# {ins.pc:02X}H: {ins.mnemon}")
+            if ins.mnemon == 'nop':
+                continue
+            if ins.is_jump:
+                mask = JUMP_MASKS[ins.byte]
+                if not mask:
+                    body += branch(ins.extra)
+                    continue
+                p = state['pending']
+                if state['valid'] & mask or p is None:
+                    test = f"F & 0x{mask:02X}"
+                elif mask == 0x20:
+                    test = f"{state['result']} == 0"
+                elif mask & 0x18:
+                    test = f"ZSP[{state['result']}] & 0x{mask:02X}"
+                else:
+                    body += materialize()
+                    state['pending'], state['valid'] = None, 0xF8
+                    test = f"F & 0x{mask:02X}"
+                body.append(f"if {test}:")
+                body += ["    " + ln for ln in branch(ins.extra)]
+                continue
+
+            if ins.mnemon == 'mov':
+                value = _read(ins.src, ins.extra)
+                if ins.dst[0] == 'reg':
+                    body.append(f"{ins.dst[1]} = {value}")
+                    continue
+                body.append(f"r{n} = {value}")
+            else:
+                self._emit_alu(ins, n, body, state)
+                if ins.mnemon in NO_STORE:
+                    continue
+            kind = ins.dst[0]
+            if kind == 'reg':
+                body.append(f"{ins.dst[1]} = r{n}")
+                continue
+            addr = "I" if kind == 'ind_i' else f"0x{ins.extra:02X}"
+            body.append(f"mem[{addr}] = r{n}")
+            body.append(f"if covered[{addr}]:")
+            body.append(f"    jit.invalidate({addr})")
+            body += ["    " + ln for ln in exit_lines(ins.next)]
+
+        last = instrs[-1]
+        if last.byte != 0xA0:
+            body += exit_lines(last.next)
+
+        head = [
+            f"def block_{entry:02X}(cpu, mem, covered, jit):",
+            "    A = cpu.A",
+            "    B = cpu.B",
+            "    I = cpu.I",
+            "    F = cpu.FLAGS",
+        ]
+        indent = "    "
+        if loops:
+            head.append("    while True:")
+            indent = "        "
+        return "\n".join(head + [indent + ln for ln in body]) + "\n"
+
+    @staticmethod
+    def _emit_alu(ins, n, body, state):
+        lines, flags = ALU_OPS[ins.mnemon]
+        names = {'a': f"a{n}", 'b': f"b{n}", 'r': f"r{n}"}
+        rename = lambda code: re.sub(r"\b([abr])\b", lambda m: names[m.group(1)], code)
+        if ins.mnemon not in NO_READ_DST:
+            body.append(f"a{n} = {_read(ins.dst, ins.extra)}")
+        if ins.src is not None:
+            body.append(f"b{n} = {_read(ins.src, ins.extra)}")
+        body += [rename(ln) for ln in lines]
+        if flags is None:
+            return
+        p = state['pending']
+        if ins.mnemon in CARRY_IN and p is not None and not state['valid'] & 0x40:
+            cf = f"(({p}) & 0x40)"
+        else:
+            cf = "(F & 0x40)"
+        state['pending'] = "(" + rename(flags).format(cf=cf) + ")"
+        state['result'] = f"r{n}"
+        state['valid'] &= 0x40 if ins.mnemon in CARRY_IN else 0
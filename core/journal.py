@@ -0,0 +1,170 @@
+"""
+Execução reversível: journal de desfazer da CPU.
+
+Com um Journal ligado, a CPU grava antes de cada instrução o estado que ela
+vai destruir: PC, A, B, I, FLAGS e, se a instrução escreve na memória, o
+endereço e o byte antigo. Cada registro cabe num inteiro de 64 bits, num
+anel de `ring` posições (`array('Q')`), então a memória do journal é
+limitada: passos mais antigos que `ring` são esquecidos.
+
+A cada `snapshot_every` passos também é guardado o estado completo. Assim
+seek() restaura o snapshot mais próximo e desfaz (ou refaz) só a distância
+até ele, sem reexecutar desde o início.
+
+Passos são numerados a partir de 0 (o estado quando o journal foi ligado);
+`pos` é o passo atual e `head` o mais adiantado já executado. Depois de
+voltar, executar de novo refaz o mesmo caminho (a CPU é determinística);
+quem alterar a CPU por fora deve chamar truncate() para descartar o futuro.
+
+Com dispositivos (`cpu.bus`) a CPU deixa de ser determinística e refazer um
+passo repetiria a E/S (o console imprimiria de novo, a entrada consumiria
+outro byte). Por isso seek() não avança com barramento, e executar depois
+de voltar descarta o futuro gravado em vez de supor o mesmo caminho.
+"""
+from array import array
+
+from core.codegen import MEM_DST, MEM_IND
+
+
+def _pack(cpu, pc, mem):
+    """
+    Registro de desfazer: PC, A, B, I e FLAGS nos bytes 0-4, byte antigo no
+    byte 5 e endereço + 1 a partir do bit 48 (0 = sem escrita em memória).
+    """
+    kind = MEM_DST[mem[pc]]
+    if kind:
+        addr = cpu.I if kind == MEM_IND else mem[pc + 1]
+        tail = (mem[addr] << 40) | ((addr + 1) << 48)
+    else:
+        tail = 0
+    return pc | (cpu.A << 8) | (cpu.B << 16) | (cpu.I << 24) | (cpu.FLAGS << 32) | tail
+
+
+class Journal:
+    def __init__(self, cpu, ring=1 << 20, snapshot_every=4096):
+        if ring < 1 or snapshot_every < 1:
+            raise ValueError("ring and snapshot_every must be positive")
+        self.cpu = cpu
+        self.ring = ring
+        self.snapshot_every = snapshot_every
+        self.pos = 0
+        self.head = 0
+        self.first = 0
+        self._entries = array('Q')
+        self._snapshots = {}
+        cpu.journal = self
+
+    def detach(self):
+        self.cpu.journal = None
+
+    # =========================
+    # GRAVAÇÃO
+    # =========================
+    def record(self):
+        """Chamado pela CPU antes de executar a instrução em cpu.PC."""
+        pos = self.pos
+        self.pos = pos + 1
+        cpu = self.cpu
+        if pos < self.head:
+            if cpu.bus is None:
+                # Refazendo um passo já gravado: o registro é o mesmo
+                return
+            # Com dispositivos o passo pode dar outro resultado: o futuro vira este
+            self.pos = pos
+            self.truncate()
+            self.pos = pos + 1
+        if pos % self.snapshot_every == 0:
+            self._snapshots[pos] = self._snapshot()
+        entry = _pack(cpu, cpu.PC, cpu.mem)
+        if len(self._entries) < self.ring:
+            # O anel ainda não deu a volta: o passo i está na posição i
+            self._entries.append(entry)
+        else:
+            self._entries[pos % self.ring] = entry
+        if pos - self.first == self.ring:
+            # O passo mais antigo sai do anel
+            self._snapshots.pop(self.first, None)
+            self.first += 1
+        self.head = pos + 1
+
+    def reset(self):
+        """Esquece o histórico: o estado atual vira o passo 0."""
+        self.pos = self.head = self.first = 0
+        self._entries = array('Q')
+        self._snapshots = {}
+
+    def truncate(self):
+        """Descarta os passos à frente de `pos`."""
+        for s in [s for s in self._snapshots if s > self.pos]:
+            del self._snapshots[s]
+        if self.head > self.pos and len(self._entries) < self.ring:
+            del self._entries[self.pos:]
+        self.head = self.pos
+
+    def _snapshot(self):
+        cpu = self.cpu
+        return (cpu.A, cpu.B, cpu.I, cpu.FLAGS, cpu.PC, bytes(cpu.mem))
+
+    # =========================
+    # VOLTAR / AVANÇAR
+    # =========================
+    def step_back(self, n=1):
+        """Volta até `n` passos; devolve quantos voltou."""
+        target = max(self.first, self.pos - n)
+        moved = self.pos - target
+        self.seek(target)
+        return moved
+
+    def seek(self, step):
+        """
+        Leva a CPU ao estado depois de `step` passos, para qualquer passo
+        entre `first` e `head`. O custo é a distância ao snapshot (ou à
+        posição atual) mais próximo na direção do movimento. Com barramento
+        de dispositivos só é possível voltar.
+        """
+        if not self.first <= step <= self.head:
+            raise ValueError(f"Step {step} outside journal ({self.first}-{self.head})")
+        if step > self.pos and self.cpu.bus is not None:
+            raise ValueError("Cannot seek forward with a device bus (it would repeat device I/O)")
+        k = self.snapshot_every
+        if step < self.pos:
+            start = step + (-step % k)
+            if start < self.pos and start in self._snapshots:
+                self._restore(self._snapshots[start])
+            else:
+                start = self.pos
+            for i in range(start - 1, step - 1, -1):
+                self._undo(self._entries[i % self.ring])
+            self.pos = step
+        elif step > self.pos:
+            start = step - step % k
+            if start > self.pos and start in self._snapshots:
+                self._restore(self._snapshots[start])
+                self.pos = start
+            cpu = self.cpu
+            while self.pos < step:
+                cpu.step()
+
+    def _restore(self, snap):
+        cpu = self.cpu
+        cpu.A, cpu.B, cpu.I, cpu.FLAGS, cpu.PC, mem = snap
+        cpu.mem[:] = mem
+        cpu.invalidate_decode()
+
+    def _undo(self, entry):
+        cpu = self.cpu
+        cpu.PC = entry & 0xFF
+        cpu.A = (entry >> 8) & 0xFF
+        cpu.B = (entry >> 16) & 0xFF
+        cpu.I = (entry >> 24) & 0xFF
+        cpu.FLAGS = (entry >> 32) & 0xFF
+        addr = entry >> 48
+        if addr:
+            addr -= 1
+            cpu.mem[addr] = (entry >> 40) & 0xFF
+            if cpu._covered[addr]:
+                cpu.invalidate_decode(addr)
+
+    def footprint(self):
+        """Bytes de dados dos registros e snapshots."""
+        return self._entries.itemsize * len(self._entries) + len(self._snapshots) * (256 + 5)
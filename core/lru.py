@@ -0,0 +1,69 @@
+"""
+Diretórios de cache com tamanho limitado: as entradas usadas há mais tempo
+(mtime mais antigo) são apagadas até caber em `max_bytes`. Base de
+BuildCache (core/objfile.py) e ResultCache (core/result_cache.py).
+
+Varrer o diretório (scandir + stat de cada arquivo) custa O(n); fazer isso a
+cada gravação custaria tanto quanto o trabalho que o cache economiza. Por
+isso cada cache guarda uma estimativa do tamanho do diretório (o total da
+última varredura mais o que gravou depois) e só varre quando ela passa de
+`max_bytes`. Sem estimativa (a primeira gravação de um processo, caso de
+cada execução do Z70.py), varre em uma a cada `evict_every` gravações,
+escolhidas pela chave, que já é um hash: o diretório pode passar do limite
+por algumas entradas até a próxima varredura.
+"""
+import os
+
+# Sem estimativa, uma gravação em EVICT_EVERY varre o diretório
+EVICT_EVERY = 32
+
+
+class LruDirectory:
+    # Extensão das entradas (as demais, como os .tmp, são ignoradas)
+    suffix = ''
+
+    def __init__(self, directory, max_bytes, evict_every=EVICT_EVERY):
+        if evict_every < 1:
+            raise ValueError("evict_every must be positive")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self.scans = 0
+        self._size = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _written(self, key, size):
+        """Chamado depois de gravar `size` bytes na entrada `key` (hex); varre se preciso."""
+        if self._size is None:
+            if int(key[:8], 16) % self.evict_every:
+                return
+        else:
+            self._size += size
+            if self._size <= self.max_bytes:
+                return
+        self.evict()
+
+    def evict(self):
+        """Apaga as entradas usadas há mais tempo até caber em max_bytes."""
+        self.scans += 1
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.name.endswith(self.suffix):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self._size = total
@@ -0,0 +1,210 @@
+"""
+Arquivo objeto Z70: o programa montado, carregável sem montar de novo.
+
+Guarda a imagem de 256 bytes, `program_end`, os rótulos e o listing com a
+linha do fonte de cada instrução (mapa endereço -> linha), mais o SHA-256 do
+fonte que o gerou. Z70.py executa um objeto direto e, para fontes, usa o
+BuildCache: o objeto fica em disco endereçado pelo hash do fonte e da
+assinatura do montador, então rodar de novo o mesmo programa não monta nada.
+
+Formato (inteiros little-endian):
+
+    cabeçalho   MAGIC, versão (u8), program_end (u16), SHA-256 do fonte (32 bytes)
+    imagem      256 bytes
+    rótulos     quantidade (u16); cada um: tamanho do nome (u16), nome UTF-8, endereço (u16)
+    listing     quantidade (u16); cada instrução: endereço (u8), tamanho (u8),
+                linha do fonte (u32, a partir de 0), tamanho do texto (u16), texto UTF-8
+
+Os bytes de cada instrução do listing saem da imagem. A versão 1 (tamanho
+do nome em u8) ainda é lida.
+"""
+import hashlib
+import os
+import struct
+
+from core.arch import MODES, UNARY_MODES, OPCODES, JUMP_CODES
+from core.assembler import assemble, instruction_lines, SourceMap
+from core.lru import LruDirectory, EVICT_EVERY
+
+MAGIC = b"Z70OBJ\n"
+VERSION = 2
+SUFFIX = ".z70o"
+
+_HEADER = struct.Struct('<7sBH32s')
+_COUNT = struct.Struct('<H')
+_LABEL = struct.Struct('<H')
+_NAME = struct.Struct('<H')
+_ENTRY = struct.Struct('<BBIH')
+
+
+def _assembler_signature():
+    src = repr((VERSION, MODES, UNARY_MODES, sorted(OPCODES.items()), sorted(JUMP_CODES.items())))
+    return hashlib.sha256(src.encode()).digest()
+
+
+ASSEMBLER_SIGNATURE = _assembler_signature()
+
+
+def source_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+class Program:
+    def __init__(self, mem, program_end, labels, listing, lines, source_hash):
+        self.mem = mem
+        self.program_end = program_end
+        self.labels = labels
+        # listing de second_pass e, para cada instrução, a linha do fonte (0 = primeira)
+        self.listing = listing
+        self.lines = lines
+        self.source_hash = source_hash
+
+    def source_map(self):
+        return SourceMap(self.listing, self.lines)
+
+
+def build(text):
+    """Monta o fonte `text` num Program."""
+    lines = text.splitlines()
+    mem, listing, code_end, labels = assemble(lines)
+    return Program(mem, code_end, labels, listing, instruction_lines(lines), source_hash(text))
+
+
+# =========================
+# SERIALIZAÇÃO
+# =========================
+def dumps(prog):
+    out = [_HEADER.pack(MAGIC, VERSION, prog.program_end, prog.source_hash), bytes(prog.mem)]
+    out.append(_COUNT.pack(len(prog.labels)))
+    for name, addr in prog.labels.items():
+        raw = name.encode('utf-8')
+        if len(raw) > 0xFFFF:
+            raise ValueError("Label too long for object file")
+        out += [_NAME.pack(len(raw)), raw, _LABEL.pack(addr)]
+    out.append(_COUNT.pack(len(prog.listing)))
+    for (addr, bytes_list, text), line in zip(prog.listing, prog.lines):
+        raw = text.encode('utf-8')
+        if len(raw) > 0xFFFF:
+            raise ValueError("Line too long for object file")
+        out += [_ENTRY.pack(addr, len(bytes_list), line, len(raw)), raw]
+    return b''.join(out)
+
+
+def loads(data):
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a Z70 object file")
+    try:
+        _, version, program_end, digest = _HEADER.unpack_from(data)
+        if version not in (1, VERSION):
+            raise ValueError(f"Unsupported object version: {version}")
+        pos = _HEADER.size
+        mem = list(data[pos:pos + 256])
+        if len(mem) != 256:
+            raise struct.error
+        pos += 256
+
+        labels = {}
+        (count,) = _COUNT.unpack_from(data, pos)
+        pos += _COUNT.size
+        for _ in range(count):
+            if version == 1:
+                size = data[pos]
+                pos += 1
+            else:
+                (size,) = _NAME.unpack_from(data, pos)
+                pos += _NAME.size
+            name = data[pos:pos + size].decode('utf-8')
+            pos += size
+            (labels[name],) = _LABEL.unpack_from(data, pos)
+            pos += _LABEL.size
+
+        listing = []
+        lines = []
+        (count,) = _COUNT.unpack_from(data, pos)
+        pos += _COUNT.size
+        for _ in range(count):
+            addr, size, line, length = _ENTRY.unpack_from(data, pos)
+            pos += _ENTRY.size
+            text = data[pos:pos + length].decode('utf-8')
+            pos += length
+            listing.append((addr, mem[addr:addr + size], text))
+            lines.append(line)
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise ValueError("Truncated object file") from None
+    if pos > len(data):
+        raise ValueError("Truncated object file")
+    if pos != len(data):
+        raise ValueError("Trailing data in object file")
+    return Program(mem, program_end, labels, listing, lines, digest)
+
+
+def save(prog, path):
+    data = dumps(prog)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def load(path):
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def is_object(data):
+    """Os bytes (ou o começo deles) são de um arquivo objeto?"""
+    return data[:len(MAGIC)] == MAGIC
+
+
+# =========================
+# CACHE DE MONTAGEM
+# =========================
+def default_cache_dir():
+    base = os.environ.get('Z70_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'z70')
+    return os.path.join(base, 'objects')
+
+
+class BuildCache(LruDirectory):
+    suffix = SUFFIX
+
+    def __init__(self, directory=None, max_bytes=4 << 20, evict_every=EVICT_EVERY):
+        super().__init__(directory or default_cache_dir(), max_bytes, evict_every)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text):
+        return hashlib.sha256(ASSEMBLER_SIGNATURE + text.encode('utf-8')).hexdigest()
+
+    def build(self, text):
+        """Program de `text`: do disco se já montado, senão monta e grava."""
+        key = self.key(text)
+        path = self._path(key)
+        try:
+            prog = load(path)
+        except (OSError, ValueError):
+            prog = None
+        if prog is not None and prog.source_hash == source_hash(text):
+            self.hits += 1
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return prog
+        self.misses += 1
+        prog = build(text)
+        try:
+            data = dumps(prog)
+        except ValueError:
+            # Não cabe no formato: o programa é válido, só fica fora do cache
+            return prog
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._written(key, len(data))
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        return prog
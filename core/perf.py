@@ -0,0 +1,110 @@
+"""
+Contadores de desempenho e modelo de custo em ciclos.
+
+Cada registro decodificado da CPU carrega um "peso": instruções, ciclos,
+leituras e escritas em memória e saltos daquele registro, empacotados num
+único inteiro (FIELD_BITS bits por campo). O laço só faz uma soma por passo
+e os campos são separados ao ler os contadores, então eles ficam sempre
+ligados. Saltos tomados são contados pelos próprios handlers de salto.
+
+Os ciclos vêm de um CycleModel: custo base por mnemônico mais o custo de
+cada operando, pelo tipo de endereçamento das tabelas MODES/UNARY_MODES de
+core/arch.py (via DECODE_TABLE).
+"""
+from core.arch import DECODE_TABLE, JUMP_CODES, JUMP_MASKS, OPCODES
+from core.codegen import MEM_DST, MEM_SRC
+
+FIELDS = ('instructions', 'cycles', 'reads', 'writes', 'branches')
+FIELD_BITS = 48
+FIELD_MASK = (1 << FIELD_BITS) - 1
+
+# Ciclos de cada mnemônico, sem contar os operandos
+BASE_CYCLES = {**{m: 1 for m in OPCODES}, **{m: 2 for m in JUMP_CODES}, 'nop': 1}
+
+# Ciclos a mais por operando: busca do byte extra e/ou acesso à memória
+OPERAND_CYCLES = {'reg': 0, 'const': 1, 'addr': 1, 'ind_i': 1, 'dir': 2}
+
+
+def pack(*fields):
+    value = 0
+    for k, n in enumerate(fields):
+        value |= n << (FIELD_BITS * k)
+    return value
+
+
+def unpack(value):
+    return tuple((value >> (FIELD_BITS * k)) & FIELD_MASK for k in range(len(FIELDS)))
+
+
+class CycleModel:
+    """
+    Custo em ciclos de cada byte de instrução. `base` e `operands` alteram
+    entradas de BASE_CYCLES e OPERAND_CYCLES (ex.: base={'mov': 2}).
+    """
+
+    def __init__(self, base=None, operands=None):
+        self.base = {**BASE_CYCLES, **(base or {})}
+        self.operands = {**OPERAND_CYCLES, **(operands or {})}
+        for name, table in (('mnemonic', self.base), ('operand', self.operands)):
+            for key, cost in table.items():
+                if cost < 0:
+                    raise ValueError(f"Invalid {name} cost for {key}: {cost}")
+        self.table = [self.cycles(b) for b in range(256)]
+        # Peso empacotado de cada byte (0 nos inválidos)
+        self.weights = [
+            pack(1, self.table[b], int(bool(MEM_SRC[b])), int(bool(MEM_DST[b])),
+                 int(b in JUMP_MASKS))
+            if DECODE_TABLE[b] is not None else 0
+            for b in range(256)
+        ]
+
+    def cycles(self, instr_byte):
+        entry = DECODE_TABLE[instr_byte]
+        if entry is None:
+            return 0
+        mnemon, dst, src, _ = entry
+        cost = self.base[mnemon]
+        for loc in (dst, src):
+            if loc is not None:
+                cost += self.operands[loc[0]]
+        return cost
+
+
+DEFAULT_MODEL = CycleModel()
+
+
+class PerfCounters:
+    """
+    Contadores de uma CPU (CPU.counters()). `host_seconds` é o tempo gasto
+    em run()/run_until(); `ips`, as instruções por segundo nesse tempo.
+    """
+    __slots__ = FIELDS + ('taken', 'host_seconds')
+
+    def __init__(self, packed=0, taken=0, host_seconds=0.0):
+        for name, value in zip(FIELDS, unpack(packed)):
+            setattr(self, name, value)
+        self.taken = taken
+        self.host_seconds = host_seconds
+
+    @property
+    def not_taken(self):
+        return self.branches - self.taken
+
+    @property
+    def ips(self):
+        return self.instructions / self.host_seconds if self.host_seconds else 0.0
+
+    def as_dict(self):
+        d = {name: getattr(self, name) for name in FIELDS}
+        d.update(taken=self.taken, not_taken=self.not_taken,
+                 host_seconds=self.host_seconds, ips=self.ips)
+        return d
+
+    def report(self):
+        cpi = self.cycles / self.instructions if self.instructions else 0.0
+        return "\n".join([
+            f"STATS: {self.instructions} instructions, {self.cycles} cycles (CPI {cpi:.2f})",
+            f"  branches {self.branches} (taken {self.taken}, not taken {self.not_taken})",
+            f"  memory reads {self.reads}, writes {self.writes}",
+            f"  host {self.host_seconds:.6f}s ({self.ips:,.0f} instructions/s)",
+        ])
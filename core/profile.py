@@ -0,0 +1,65 @@
+"""
+Profiler do código Z70.
+
+Contadores planos de 256 posições, indexados por endereço: quantas vezes a
+instrução em cada endereço executou, quantas vezes cada salto condicional
+foi tomado ou não e quantas leituras/escritas cada byte de memória recebeu.
+A CPU preenche os contadores num laço próprio (CPU.run(profile=...)), então
+o laço normal não paga nada quando o profiler está desligado.
+"""
+from array import array
+
+from core.arch import JUMP_MASKS
+
+# Máscara de FLAGS testada por cada byte de salto condicional (0 = não é)
+COND_MASKS = bytes(JUMP_MASKS.get(b, 0) for b in range(256))
+
+
+def _counters():
+    return array('Q', bytes(8 * 256))
+
+
+class Profile:
+    def __init__(self):
+        self.counts = _counters()
+        self.taken = _counters()
+        self.not_taken = _counters()
+        self.reads = _counters()
+        self.writes = _counters()
+
+    @property
+    def steps(self):
+        return sum(self.counts)
+
+    # =========================
+    # RELATÓRIO
+    # =========================
+    def hotspots(self, listing, top=10):
+        """
+        Instruções mais executadas, mapeadas para o código-fonte pelo
+        `listing` de second_pass: (endereço, execuções, fonte).
+        """
+        source = {addr: src.strip() for addr, _, src in listing}
+        hot = sorted((a for a in range(256) if self.counts[a]), key=lambda a: -self.counts[a])
+        return [(a, self.counts[a], source.get(a, '?')) for a in hot[:top]]
+
+    def memory_heat(self, top=10):
+        """Bytes de memória mais acessados: (endereço, leituras, escritas)."""
+        hot = [a for a in range(256) if self.reads[a] or self.writes[a]]
+        hot.sort(key=lambda a: -(self.reads[a] + self.writes[a]))
+        return [(a, self.reads[a], self.writes[a]) for a in hot[:top]]
+
+    def report(self, listing, top=10):
+        total = self.steps or 1
+        lines = [f"PROFILE: {self.steps} instructions"]
+        for addr, n, src in self.hotspots(listing, top):
+            line = f"  {addr:02X}H {n:>10} {100 * n / total:5.1f}%  {src}"
+            if self.taken[addr] or self.not_taken[addr]:
+                line += f"  (taken {self.taken[addr]}, not taken {self.not_taken[addr]})"
+            lines.append(line)
+        heat = self.memory_heat(top)
+        if heat:
+            lines.append("MEMORY: addr reads writes")
+            for addr, r, w in heat:
+                lines.append(f"  {addr:02X}H {r:>10} {w:>10}")
+        return "\n".join(lines)
@@ -0,0 +1,127 @@
+"""
+Cache de resultados em disco, endereçado por conteúdo.
+
+Um programa Z70 é determinístico: a mesma imagem de memória, o mesmo
+`program_end` e o mesmo estado inicial sempre terminam no mesmo estado. A
+chave é o SHA-256 disso tudo (mais a assinatura da ULA/decodificação, para
+que mudanças no emulador não reaproveitem resultados velhos) e o valor é o
+estado final (registradores, PC de 16 bits, instruções executadas e a
+memória) num arquivo de 278 bytes.
+
+Só execuções que terminam (HALTED) são guardadas. O diretório tem tamanho
+limitado: cada acerto atualiza o mtime do arquivo e os arquivos mais antigos
+são apagados até caber em `max_bytes` (LRU, ver core/lru.py).
+"""
+import hashlib
+import os
+import struct
+
+from core.arch import DECODE_TABLE, JUMP_MASKS
+from core.codegen import ALU_OPS
+from core.CPU import RunOutcome, HALTED
+from core.lru import LruDirectory, EVICT_EVERY
+
+MAGIC = b"Z70RES2\n"
+# A, B, I, FLAGS, PC (u16: um programa de 256 bytes termina com PC=100H) e passos
+STATE = struct.Struct('<4BHQ')
+RESULT_SIZE = len(MAGIC) + STATE.size + 256
+# Parte da chave além da memória: fim do programa, A, B, I, FLAGS e PC
+KEY_STATE = struct.Struct('<HBBBBH')
+SUFFIX = ".res"
+
+
+def default_cache_dir():
+    base = os.environ.get('Z70_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'z70')
+    return os.path.join(base, 'results')
+
+
+def _engine_signature():
+    src = repr((sorted(ALU_OPS.items()), DECODE_TABLE, sorted(JUMP_MASKS.items())))
+    return hashlib.sha256(src.encode()).digest()
+
+
+ENGINE_SIGNATURE = _engine_signature()
+
+
+def state_key(cpu):
+    """Chave do estado inicial da CPU (imagem, fim do programa e registradores)."""
+    h = hashlib.sha256(ENGINE_SIGNATURE)
+    h.update(bytes(cpu.mem))
+    # PC e fim do programa vão até 100H: 16 bits
+    h.update(KEY_STATE.pack(cpu.program_end, cpu.A, cpu.B, cpu.I, cpu.FLAGS, cpu.PC))
+    return h.hexdigest()
+
+
+class ResultCache(LruDirectory):
+    suffix = SUFFIX
+
+    def __init__(self, directory=None, max_bytes=16 << 20, evict_every=EVICT_EVERY):
+        super().__init__(directory or default_cache_dir(), max_bytes, evict_every)
+        self.hits = 0
+        self.misses = 0
+
+    # =========================
+    # LEITURA / GRAVAÇÃO
+    # =========================
+    def get(self, key):
+        """(A, B, I, FLAGS, PC, passos, mem) do estado final, ou None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != RESULT_SIZE or not data.startswith(MAGIC):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return (*STATE.unpack_from(data, len(MAGIC)), data[len(MAGIC) + STATE.size:])
+
+    def put(self, key, cpu, steps):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC + STATE.pack(cpu.A, cpu.B, cpu.I, cpu.FLAGS, cpu.PC, steps) + bytes(cpu.mem))
+        os.replace(tmp, path)
+        self._written(key, RESULT_SIZE)
+
+    # =========================
+    # EXECUÇÃO
+    # =========================
+    def run(self, cpu, max_steps=None, timeout=None, detect_loops=False):
+        """
+        CPU.run() com cache. Com `max_steps`, trace, dispositivos,
+        breakpoints ou ganchos, a CPU sempre executa (o resultado depende do
+        limite ou da execução em si).
+        Num acerto, o journal da CPU (se houver) recomeça do estado final.
+        Quando termina, `steps` do resultado é sempre o número de instruções,
+        executadas agora ou guardadas no cache.
+        """
+        if (max_steps is not None or cpu.trace is not None or cpu.bus is not None
+                or cpu.breakpoints is not None and cpu.breakpoints.active
+                or cpu.hooks is not None and cpu.hooks.active):
+            return cpu.run(max_steps=max_steps, timeout=timeout, detect_loops=detect_loops)
+        key = state_key(cpu)
+        hit = self.get(key)
+        if hit is not None:
+            self.hits += 1
+            cpu.A, cpu.B, cpu.I, cpu.FLAGS, cpu.PC, steps, mem = hit
+            cpu.mem[:] = mem
+            cpu.invalidate_decode()
+            if cpu.journal is not None:
+                cpu.journal.reset()
+            return RunOutcome(HALTED, steps, cached=True)
+        self.misses += 1
+        before = cpu.counters().instructions
+        outcome = cpu.run(timeout=timeout, detect_loops=detect_loops)
+        if outcome.halted:
+            if outcome.steps is None:
+                outcome.steps = cpu.counters().instructions - before
+            try:
+                self.put(key, cpu, outcome.steps)
+            except OSError:
+                pass
+        return outcome
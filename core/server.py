@@ -0,0 +1,267 @@
+"""
+Emulador residente: JSON-RPC 2.0 por stdin/stdout ou por socket Unix.
+
+Abrir um interpretador Python por programa custa dezenas de milissegundos;
+aqui o processo fica de pé com o núcleo importado e atende pedidos, um
+objeto JSON por linha (ou uma lista deles, em lote). Cada pedido diz a
+sessão (`session`, padrão "default"): cada sessão tem a sua CPU, então
+vários clientes podem trabalhar ao mesmo tempo. Imagens montadas ficam em
+cache pelo hash do fonte, então o mesmo fonte não é montado duas vezes.
+
+Métodos (params por nome):
+
+    assemble  source                          carrega o programa na sessão
+    run       [source], max_steps, timeout,   executa até o fim (ou limite);
+              detect_loops, dump              `source` monta antes
+    step      count=1                         executa até `count` instruções
+    dump      start=0, end=255                bytes da memória (faixa pode dar a volta)
+    reset                                     volta ao estado inicial (devolve regs e flags)
+    close                                     descarta a sessão
+
+run/step devolvem status, steps, regs e flags (como core/api.py; `dump`
+[início, fim] acrescenta a memória). Erros do programa (montagem, sessão sem
+programa) vêm com código APP_ERROR e mensagem "Tipo: mensagem".
+
+Um programa que não termina não pode prender o servidor: todo run/step tem
+os limites do Server (`timeout`, padrão DEFAULT_TIMEOUT segundos, e
+`max_steps`, se dado). Pedidos podem pedir limites menores, nunca maiores;
+ao estourar, o status é "timeout" ou "budget" e a sessão continua dali.
+
+Sessões também não crescem sem fim: passando de `max_sessions` (padrão
+SESSION_LIMIT), a usada há mais tempo é descartada, como num `close`.
+"""
+import json
+import os
+import socketserver
+import stat
+import threading
+from collections import OrderedDict
+
+from core.CPU import CPU
+from core.api import registers, dump_range
+from core.objfile import build, source_hash
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+APP_ERROR = -32000
+
+# Imagens montadas guardadas (entradas); ao passar, o cache é esvaziado
+IMAGE_LIMIT = 256
+
+# Limite de tempo padrão de cada run/step (segundos)
+DEFAULT_TIMEOUT = 10.0
+
+# Sessões abertas ao mesmo tempo; além disso, a usada há mais tempo sai
+SESSION_LIMIT = 1024
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class Session:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.program = None
+        self.cpu = None
+
+    def load(self, program):
+        self.program = program
+        self.cpu = CPU(program.mem, program.labels)
+        self.cpu.program_end = program.program_end
+
+
+class Server:
+    def __init__(self, max_steps=None, timeout=DEFAULT_TIMEOUT, max_sessions=SESSION_LIMIT):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be positive")
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.images = {}
+        self._lock = threading.Lock()
+        self.methods = {
+            'assemble': self.assemble, 'run': self.run, 'step': self.step,
+            'dump': self.dump, 'reset': self.reset, 'close': self.close,
+        }
+
+    # =========================
+    # MÉTODOS
+    # =========================
+    def _image(self, source):
+        """Program do fonte, montado só na primeira vez."""
+        key = source_hash(source)
+        prog = self.images.get(key)
+        if prog is None:
+            prog = build(source)
+            with self._lock:
+                if len(self.images) >= IMAGE_LIMIT:
+                    self.images.clear()
+                self.images[key] = prog
+        return prog
+
+    def _cpu(self, session):
+        if session.cpu is None:
+            raise RpcError(APP_ERROR, "No program loaded")
+        return session.cpu
+
+    def _state(self, cpu, status, steps, dump=None):
+        rec = {'status': status, 'steps': steps}
+        rec.update(registers(cpu))
+        if dump is not None:
+            a, b = dump
+            rec['dump'] = dump_range(cpu.memory_view(), (a & 0xFF, b & 0xFF))
+        return rec
+
+    def assemble(self, session, source):
+        cached = source_hash(source) in self.images
+        prog = self._image(source)
+        session.load(prog)
+        return {'program_end': prog.program_end, 'labels': prog.labels, 'cached': cached}
+
+    def run(self, session, source=None, max_steps=None, timeout=None, detect_loops=False, dump=None):
+        if source is not None:
+            session.load(self._image(source))
+        cpu = self._cpu(session)
+        max_steps = _limit(max_steps, self.max_steps)
+        timeout = _limit(timeout, self.timeout)
+        before = cpu.counters().instructions
+        outcome = cpu.run(max_steps=max_steps, timeout=timeout, detect_loops=detect_loops)
+        return self._state(cpu, outcome.status, cpu.counters().instructions - before, dump)
+
+    def step(self, session, count=1):
+        return self.run(session, max_steps=count)
+
+    def dump(self, session, start=0, end=255):
+        return {'memory': dump_range(self._cpu(session).memory_view(), (start & 0xFF, end & 0xFF))}
+
+    def reset(self, session):
+        if session.program is None:
+            raise RpcError(APP_ERROR, "No program loaded")
+        session.load(session.program)
+        return registers(session.cpu)
+
+    def close(self, session):
+        return {}
+
+    # =========================
+    # PROTOCOLO
+    # =========================
+    def _session(self, name, method):
+        with self._lock:
+            if method == 'close':
+                return self.sessions.pop(name, None) or Session()
+            session = self.sessions.get(name)
+            if session is not None:
+                self.sessions.move_to_end(name)
+                return session
+            if len(self.sessions) >= self.max_sessions:
+                self.sessions.popitem(last=False)
+            session = self.sessions[name] = Session()
+            return session
+
+    def call(self, method, params):
+        fn = self.methods.get(method)
+        if fn is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+        if not isinstance(params, dict):
+            raise RpcError(INVALID_PARAMS, "params must be an object")
+        params = dict(params)
+        name = params.pop('session', 'default')
+        if not isinstance(name, (str, int)):
+            raise RpcError(INVALID_PARAMS, "session must be a string or integer")
+        session = self._session(name, method)
+        with session.lock:
+            try:
+                return fn(session, **params)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, str(e)) from None
+            except RpcError:
+                raise
+            except Exception as e:
+                raise RpcError(APP_ERROR, f"{type(e).__name__}: {e}") from None
+
+    def handle(self, request):
+        """Resposta (dict) a um pedido já decodificado; None para notificações."""
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' \
+                or not isinstance(request.get('method'), str):
+            return _error(None, INVALID_REQUEST, "Invalid request")
+        rid = request.get('id')
+        try:
+            result = self.call(request['method'], request.get('params', {}))
+        except RpcError as e:
+            response = _error(rid, e.code, str(e))
+        else:
+            response = {'jsonrpc': '2.0', 'id': rid, 'result': result}
+        return response if 'id' in request else None
+
+    def handle_line(self, line):
+        """Linha de resposta (sem '\\n') a uma linha de pedido, ou None."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return json.dumps(_error(None, PARSE_ERROR, "Parse error"))
+        if isinstance(request, list):
+            if not request:
+                return json.dumps(_error(None, INVALID_REQUEST, "Invalid request"))
+            responses = [r for r in map(self.handle, request) if r is not None]
+            return json.dumps(responses) if responses else None
+        response = self.handle(request)
+        return json.dumps(response) if response is not None else None
+
+    # =========================
+    # TRANSPORTES
+    # =========================
+    def serve_stream(self, rfile, wfile):
+        """Atende pedidos de `rfile` (texto, uma linha cada) até o fim da entrada."""
+        for line in rfile:
+            if not line.strip():
+                continue
+            out = self.handle_line(line)
+            if out is not None:
+                wfile.write(out + '\n')
+                wfile.flush()
+
+    def unix_server(self, path):
+        """Servidor de socket Unix em `path` (uma thread por conexão); chame serve_forever()."""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw in self.rfile:
+                    if not raw.strip():
+                        continue
+                    out = server.handle_line(raw.decode('utf-8'))
+                    if out is not None:
+                        self.wfile.write(out.encode('utf-8') + b'\n')
+
+        remove_socket(path)
+        unix = socketserver.ThreadingUnixStreamServer(path, Handler)
+        unix.daemon_threads = True
+        return unix
+
+
+def remove_socket(path):
+    """Apaga o socket Unix em `path`, se existir; outro tipo de arquivo dá ValueError."""
+    try:
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise ValueError(f"Not a socket, refusing to remove: {path}")
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _limit(requested, cap):
+    """Limite pedido, sem passar de `cap` (None = sem limite)."""
+    if cap is None:
+        return requested
+    return cap if requested is None else min(requested, cap)
+
+
+def _error(rid, code, message):
+    return {'jsonrpc': '2.0', 'id': rid, 'error': {'code': code, 'message': message}}
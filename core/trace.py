@@ -0,0 +1,168 @@
+"""
+Trace binário da execução.
+
+Com um TraceRecorder ligado, a CPU registra cada instrução executada: PC,
+byte da instrução, byte de operando, A/B/I/FLAGS depois dela e, se ela
+escreveu na memória, o endereço e o valor escritos. Os registros vão para
+colunas `array` pré-alocadas de `capacity` posições (nenhum objeto Python por
+instrução).
+
+Com `path`, cada bloco cheio é gravado no arquivo e as colunas são reusadas,
+então a memória é constante mesmo em execuções de dezenas de milhões de
+instruções. Sem `path`, as colunas funcionam como anel com os últimos
+`capacity` registros.
+
+Formato do arquivo: MAGIC e depois blocos, cada um com o número de registros
+(uint32 little-endian) seguido das colunas na ordem de COLUMNS, uma depois
+da outra (`waddr` em uint16 little-endian, NO_WRITE = sem escrita).
+"""
+import struct
+import sys
+from array import array
+
+from core.codegen import MEM_DST, MEM_IND
+
+MAGIC = b"Z70TRC1\n"
+
+COLUMNS = ('pc', 'op', 'arg', 'A', 'B', 'I', 'FLAGS', 'wval', 'waddr')
+NO_WRITE = 0xFFFF
+
+_COUNT = struct.Struct('<I')
+
+
+def _typecode(name):
+    return 'H' if name == 'waddr' else 'B'
+
+
+def _little_endian(col):
+    if sys.byteorder == 'big' and col.itemsize > 1:
+        col = array(col.typecode, col)
+        col.byteswap()
+    return col
+
+
+class TraceRecorder:
+    def __init__(self, cpu, path=None, capacity=1 << 16):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.cpu = cpu
+        self.path = path
+        self.capacity = capacity
+        # Total de instruções registradas e posição no bloco atual
+        self.count = 0
+        self.fill = 0
+        self.columns = {
+            name: array(_typecode(name), [0]) * capacity for name in COLUMNS
+        }
+        self._cols = tuple(self.columns[name] for name in COLUMNS)
+        self._file = None
+        if path is not None:
+            self._file = open(path, 'wb')
+            self._file.write(MAGIC)
+        cpu.trace = self
+
+    # =========================
+    # GRAVAÇÃO
+    # =========================
+    def record(self, pc, op, arg):
+        """Chamado pela CPU depois de executar `op` (lido antes) em `pc`."""
+        i = self.fill
+        cpu = self.cpu
+        pcs, ops, args, a, b, ireg, flags, wval, waddr = self._cols
+        pcs[i] = pc
+        ops[i] = op
+        args[i] = arg or 0
+        a[i] = cpu.A
+        b[i] = cpu.B
+        ireg[i] = cpu.I
+        flags[i] = cpu.FLAGS
+        kind = MEM_DST[op]
+        if kind:
+            addr = cpu.I if kind == MEM_IND else arg
+            waddr[i] = addr
+            wval[i] = cpu.mem[addr]
+        else:
+            waddr[i] = NO_WRITE
+            wval[i] = 0
+        self.count += 1
+        i += 1
+        if i == self.capacity:
+            if self._file is not None:
+                self._write_chunk(i)
+            i = 0
+        self.fill = i
+
+    def _write_chunk(self, n):
+        f = self._file
+        f.write(_COUNT.pack(n))
+        for name in COLUMNS:
+            f.write(_little_endian(self.columns[name][:n]).tobytes())
+
+    def flush(self):
+        if self._file is not None and self.fill:
+            self._write_chunk(self.fill)
+            self.fill = 0
+            self._file.flush()
+
+    def close(self):
+        """Grava o que falta, fecha o arquivo e desliga o trace da CPU."""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.cpu.trace is self:
+            self.cpu.trace = None
+
+    # =========================
+    # LEITURA (modo em memória)
+    # =========================
+    def records(self):
+        """Últimos registros em ordem, como tuplas na ordem de COLUMNS."""
+        n = min(self.count, self.capacity)
+        start = (self.fill - n) % self.capacity
+        cols = [self.columns[name] for name in COLUMNS]
+        return [tuple(col[(start + k) % self.capacity] for col in cols) for k in range(n)]
+
+
+def iter_chunks(path):
+    """Blocos de um arquivo de trace, como {coluna: array}."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a Z70 trace: {path}")
+        while True:
+            head = f.read(_COUNT.size)
+            if not head:
+                return
+            n, = _COUNT.unpack(head)
+            chunk = {}
+            for name in COLUMNS:
+                col = array(_typecode(name))
+                col.frombytes(f.read(n * col.itemsize))
+                chunk[name] = _little_endian(col)
+            yield chunk
+
+
+def read_trace(path):
+    """Arquivo inteiro em colunas (para traces que cabem na memória)."""
+    columns = {name: array(_typecode(name)) for name in COLUMNS}
+    for chunk in iter_chunks(path):
+        for name in COLUMNS:
+            columns[name].extend(chunk[name])
+    return columns
+
+
+def trace_to_npz(path, npz_path):
+    """
+    Converte um trace para .npz bloco a bloco (memória constante). Cada bloco
+    vira os arrays `<coluna>_<bloco>`; numpy só é necessário aqui.
+    """
+    import zipfile
+
+    import numpy as np
+
+    with zipfile.ZipFile(npz_path, 'w', allowZip64=True) as zf:
+        for k, chunk in enumerate(iter_chunks(path)):
+            for name in COLUMNS:
+                arr = np.frombuffer(chunk[name], dtype=np.uint16 if name == 'waddr' else np.uint8)
+                with zf.open(f"{name}_{k:06d}.npy", 'w', force_zip64=True) as f:
+                    np.lib.format.write_array(f, arr)
@@ -0,0 +1,206 @@
+"""
+Motor vetorizado: executa o mesmo programa em N instâncias do Z70 ao mesmo
+tempo, com NumPy (dependência opcional, só este módulo a usa).
+
+O estado das N máquinas fica em arrays: um vetor uint8 por registrador, a
+matriz de memória (N, 256) e um PC por instância. A cada passo as instâncias
+ativas são agrupadas pelo byte de instrução no seu PC e cada grupo executa
+a instrução de uma vez, com atualizações mascaradas. Assim instâncias que
+divergem em saltos condicionais (ou que têm código diferente na memória)
+continuam corretas, e o resultado é idêntico ao de `CPU` bit a bit.
+"""
+import numpy as np
+
+from core.arch import DECODE_TABLE, JUMP_MASKS
+from core.codegen import ZSP
+
+ZSP_TABLE = np.frombuffer(ZSP, dtype=np.uint8).astype(np.int16)
+
+# Situação final de cada instância
+RUNNING = 0
+HALTED = 1
+BUDGET = 2
+ERROR = 3
+
+# Mensagem do IndexError de `CPU` (memória em bytearray) ao ler o byte extra
+# de uma instrução em FFH
+MEM_RANGE_ERROR = "bytearray index out of range"
+
+
+def _alu(mnemon, a, b, flags):
+    """
+    Resultado e FLAGS de uma operação sobre vetores int16 (os operandos uint8
+    são promovidos para que carry e borrow não se percam).
+    Mesma semântica de ALU_OPS em core/codegen.py.
+    """
+    if mnemon == 'add':
+        u = a + b
+        r = u & 0xFF
+        f = ZSP_TABLE[r] | (u > 0xFF) * 0x40 | (((a ^ r) & (b ^ r) & 0x80) != 0) * 0x80
+    elif mnemon in ('sub', 'cmp'):
+        r = (a - b) & 0xFF
+        f = ZSP_TABLE[r] | (a < b) * 0x40 | (((a ^ b) & (a ^ r) & 0x80) != 0) * 0x80
+    elif mnemon == 'and':
+        r = a & b
+        f = ZSP_TABLE[r]
+    elif mnemon == 'or':
+        r = a | b
+        f = ZSP_TABLE[r]
+    elif mnemon == 'mov':
+        return b, None
+    elif mnemon == 'inc':
+        r = (a + 1) & 0xFF
+        f = ZSP_TABLE[r] | (flags & 0x40) | (a == 0x7F) * 0x80
+    elif mnemon == 'dec':
+        r = (a - 1) & 0xFF
+        f = ZSP_TABLE[r] | (flags & 0x40) | (a == 0x80) * 0x80
+    elif mnemon == 'not':
+        return ~a & 0xFF, None
+    elif mnemon == 'shr':
+        r = a >> 1
+        f = ZSP_TABLE[r] | ((a & 0x01) << 6) | (a & 0x80)
+    elif mnemon == 'shl':
+        r = (a << 1) & 0xFF
+        f = ZSP_TABLE[r] | ((a >> 7) << 6) | (((a >> 7) ^ (r >> 7)) << 7)
+    else:
+        raise ValueError(f"Invalid instr: {mnemon}")
+    return r, f
+
+
+class VectorCPU:
+    def __init__(self, mem, program_end, n=None, mems=None, A=0, B=0, I=0, FLAGS=0, PC=0):
+        """
+        `mem`/`program_end` vêm de core.assembler.second_pass. `mems` é uma
+        matriz (N, 256) opcional com a memória inicial de cada instância; sem
+        ela, todas começam com `mem`. Registradores aceitam escalar ou vetor.
+        """
+        if mems is None:
+            if n is None:
+                raise ValueError("VectorCPU needs n or mems")
+            mems = np.broadcast_to(np.asarray(mem, dtype=np.uint8), (n, 256))
+        self.mem = np.array(mems, dtype=np.uint8)
+        if self.mem.ndim != 2 or self.mem.shape[1] != 256:
+            raise ValueError("mems must have shape (N, 256)")
+        n = self.mem.shape[0]
+        self.n = n
+        self.program_end = program_end
+
+        def vec(val):
+            return np.broadcast_to(np.asarray(val, dtype=np.int16) & 0xFF, (n,)).astype(np.uint8)
+
+        self.A = vec(A)
+        self.B = vec(B)
+        self.I = vec(I)
+        self.FLAGS = vec(FLAGS)
+        self.PC = np.broadcast_to(np.asarray(PC, dtype=np.int32), (n,)).copy()
+        self.status = np.full(n, RUNNING, dtype=np.int8)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.errors = {}
+
+    # =========================
+    # EXECUÇÃO
+    # =========================
+    def run(self, max_steps=None):
+        """
+        Executa até todas as instâncias pararem. Com `max_steps`, instâncias
+        que passarem do limite ficam com status BUDGET.
+        """
+        while self.step(max_steps):
+            pass
+        return self.status
+
+    def step(self, max_steps=None):
+        """Um passo em todas as instâncias ativas; False quando não resta nenhuma."""
+        running = self.status == RUNNING
+        self.status[running & (self.PC >= self.program_end)] = HALTED
+        if max_steps is not None:
+            self.status[running & (self.steps >= max_steps) & (self.status == RUNNING)] = BUDGET
+        active = np.nonzero(self.status == RUNNING)[0]
+        if active.size == 0:
+            return False
+        ops = self.mem[active, self.PC[active]]
+        for op in np.unique(ops):
+            self._execute(int(op), active[ops == op])
+        self.steps[active] += 1
+        return True
+
+    def _execute(self, op, sel):
+        entry = DECODE_TABLE[op]
+        pc = self.PC[sel]
+        if entry is None:
+            self._fail(sel, "Invalid instruction: {:02X}H at {:02X}H", op, pc)
+            return
+        mnemon, dst, src, size = entry
+        if size == 2:
+            bad = pc + 1 > 0xFF
+            if bad.any():
+                self._fail(sel[bad], MEM_RANGE_ERROR, op, pc[bad])
+                sel, pc = sel[~bad], pc[~bad]
+            extra = self.mem[sel, pc + 1].astype(np.int16)
+        else:
+            extra = None
+        self.PC[sel] = pc + size
+
+        if mnemon == 'nop':
+            return
+        if op in JUMP_MASKS:
+            mask = JUMP_MASKS[op]
+            if mask:
+                taken = (self.FLAGS[sel] & mask) != 0
+                self.PC[sel[taken]] = extra[taken]
+            else:
+                self.PC[sel] = extra
+            return
+
+        a = None if mnemon == 'mov' else self._read(dst, sel, extra)
+        b = self._read(src, sel, extra) if src is not None else None
+        r, f = _alu(mnemon, a, b, self.FLAGS[sel])
+        if f is not None:
+            self.FLAGS[sel] = f
+        if mnemon != 'cmp':
+            self._write(dst, sel, extra, r)
+
+    def _read(self, loc, sel, extra):
+        kind, val = loc
+        if kind == 'reg':
+            return getattr(self, val)[sel].astype(np.int16)
+        elif kind == 'ind_i':
+            return self.mem[sel, self.I[sel]].astype(np.int16)
+        elif kind == 'const':
+            return extra
+        elif kind == 'dir':
+            return self.mem[sel, extra].astype(np.int16)
+        raise ValueError("Invalid loc")
+
+    def _write(self, loc, sel, extra, val):
+        kind, name = loc
+        if kind == 'reg':
+            getattr(self, name)[sel] = val
+        elif kind == 'ind_i':
+            self.mem[sel, self.I[sel]] = val
+        elif kind == 'dir':
+            self.mem[sel, extra] = val
+        else:
+            raise ValueError("Invalid set loc")
+
+    def _fail(self, sel, msg, op, pc):
+        self.status[sel] = ERROR
+        for k, p in zip(sel.tolist(), np.broadcast_to(pc, sel.shape).tolist()):
+            self.errors[k] = msg.format(op, p)
+
+    # =========================
+    # RESULTADOS
+    # =========================
+    def state(self, k):
+        """Estado final da instância k: (A, B, I, FLAGS, PC, bytes da memória)."""
+        return (int(self.A[k]), int(self.B[k]), int(self.I[k]),
+                int(self.FLAGS[k]), int(self.PC[k]), self.mem[k].tobytes())
+
+    def regs(self, k):
+        return (f"A={int(self.A[k]):02X}H B={int(self.B[k]):02X}H "
+                f"I={int(self.I[k]):02X}H PC={int(self.PC[k]):02X}H")
+
+    def flags(self, k):
+        f = int(self.FLAGS[k])
+        return (f"OF={(f >> 7) & 1} CF={(f >> 6) & 1} ZF={(f >> 5) & 1} "
+                f"PF={(f >> 4) & 1} SF={(f >> 3) & 1}")
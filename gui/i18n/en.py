@@ -3,6 +3,7 @@ STRINGS = {
 
     "run": "Run",
     "step": "Step",
+    "step_back": "Step back",
     "reset": "Reset",
 
     "editor_title": "Assembly Code (Z70)",
@@ -13,6 +14,10 @@ STRINGS = {
 
     "program_loaded": "Program loaded successfully.",
     "program_finished": "Program finished.",
+    "program_loop": "Infinite loop at {lo:02X}H-{hi:02X}H: the program never halts (stopped after {steps} instructions).",
+    "program_timeout": "Time limit reached: execution paused after {steps} instructions.",
+    "no_step_back": "No previous step.",
+    "breakpoint_hit": "Breakpoint at {pc:02X}H (after {steps} instructions).",
 
     "flag_ZF": "Zero Flag (result is zero)",
     "flag_CF": "Carry Flag (carry occurred)",
@@ -3,6 +3,7 @@ STRINGS = {
 
     "run": "Executar",
     "step": "Passo",
+    "step_back": "Voltar passo",
     "reset": "Resetar",
 
     "editor_title": "Código Assembly (Z70)",
@@ -13,6 +14,10 @@ STRINGS = {
 
     "program_loaded": "Programa carregado com sucesso.",
     "program_finished": "Programa finalizado.",
+    "program_loop": "Laço infinito em {lo:02X}H-{hi:02X}H: o programa nunca termina (parado após {steps} instruções).",
+    "program_timeout": "Tempo limite atingido: execução pausada após {steps} instruções.",
+    "no_step_back": "Não há passo anterior.",
+    "breakpoint_hit": "Breakpoint em {pc:02X}H (após {steps} instruções).",
 
     "flag_ZF": "Zero (resultado é zero)",
     "flag_CF": "Carry (houve transporte)",
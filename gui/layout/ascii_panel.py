@@ -34,8 +34,7 @@ class AsciiPanel(tk.Frame):
             return
 
         chars = []
-        for i in range(start, end + 1):
-            b = cpu.mem[i]
+        for b in cpu.memory_view()[start:end + 1]:
             chars.append(chr(b) if 32 <= b <= 126 else ".")
 
         self.text.config(state=tk.NORMAL)
@@ -1,7 +1,7 @@
 import tkinter as tk
 from gui.theme.colors import (
-    BG_PANEL, BG_EDITOR, BG_HIGHLIGHT,
-    TEXT_PRIMARY, TEXT_SECONDARY
+    BG_PANEL, BG_EDITOR, BG_HIGHLIGHT, BG_BREAKPOINT,
+    TEXT_PRIMARY, TEXT_SECONDARY, ERROR
 )
 from gui.theme.fonts import FONT_CODE, FONT_TITLE
 
@@ -10,6 +10,9 @@ class CodeEditor(tk.Frame):
     def __init__(self, parent, title: str):
         super().__init__(parent, bg=BG_PANEL)
 
+        # Linhas (1, 2, ...) marcadas com breakpoint
+        self.breakpoints = set()
+
         # --------- Título ----------
         title_lbl = tk.Label(
             self,
@@ -61,12 +64,16 @@ class CodeEditor(tk.Frame):
         # Eventos
         self.text.bind("<KeyRelease>", self._update_lines)
         self.text.bind("<MouseWheel>", self._update_lines)
+        # Clique na numeração liga/desliga o breakpoint da linha
+        self.lines.bind("<Button-1>", self._on_gutter_click)
 
         # Highlight da linha atual (PC futuramente)
         self.text.tag_configure(
             "current_line",
             background=BG_HIGHLIGHT
         )
+        self.text.tag_configure("breakpoint", background=BG_BREAKPOINT)
+        self.lines.tag_configure("breakpoint", foreground=ERROR)
 
         self._update_lines()
 
@@ -87,6 +94,13 @@ class CodeEditor(tk.Frame):
         self.text.tag_add("current_line", index, f"{line_number}.end")
         self.text.see(index)
 
+    def toggle_breakpoint(self, line_number: int):
+        if line_number in self.breakpoints:
+            self.breakpoints.discard(line_number)
+        else:
+            self.breakpoints.add(line_number)
+        self._update_lines()
+
     # =========================
     # INTERNOS
     # =========================
@@ -95,11 +109,22 @@ class CodeEditor(tk.Frame):
         self.lines.delete("1.0", tk.END)
 
         line_count = int(self.text.index("end-1c").split(".")[0])
+        self.breakpoints = {i for i in self.breakpoints if i <= line_count}
+        self.text.tag_remove("breakpoint", "1.0", tk.END)
         for i in range(1, line_count + 1):
-            self.lines.insert(tk.END, f"{i}\n")
+            if i in self.breakpoints:
+                self.lines.insert(tk.END, f"●{i}\n", "breakpoint")
+                self.text.tag_add("breakpoint", f"{i}.0", f"{i + 1}.0")
+            else:
+                self.lines.insert(tk.END, f"{i}\n")
 
         self.lines.config(state=tk.DISABLED)
 
+    def _on_gutter_click(self, event):
+        line_number = int(self.lines.index(f"@{event.x},{event.y}").split(".")[0])
+        self.toggle_breakpoint(line_number)
+        return "break"
+
     def _on_scroll_y(self, *args):
         self.text.yview(*args)
         self.lines.yview(*args)
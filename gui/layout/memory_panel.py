@@ -1,5 +1,5 @@
 import tkinter as tk
-from gui.theme.colors import BG_PANEL, BG_EDITOR, TEXT_PRIMARY, TEXT_SECONDARY, BG_HIGHLIGHT
+from gui.theme.colors import BG_PANEL, BG_EDITOR, TEXT_PRIMARY, TEXT_SECONDARY, BG_HIGHLIGHT, BG_CHANGED
 from gui.theme.fonts import FONT_CODE, FONT_TITLE
 from gui.i18n.pt import STRINGS
 
@@ -70,13 +70,19 @@ class MemoryPanel(tk.Frame):
             self.clear()
             return
 
+        mem = cpu.memory_view()
         for addr, lbl in self.cells.items():
-            lbl.config(text=f"{cpu.mem[addr]:02X}", bg=BG_EDITOR)
+            lbl.config(text=f"{mem[addr]:02X}", bg=BG_EDITOR)
 
     def highlight(self, addr):
         if addr in self.cells:
             self.cells[addr].config(bg=BG_HIGHLIGHT)
 
+    def mark_changed(self, addrs):
+        """Destaca os bytes que a última edição do código alterou."""
+        for addr in addrs:
+            self.cells[addr].config(bg=BG_CHANGED)
+
     def clear(self):
         for lbl in self.cells.values():
             lbl.config(text="00", bg=BG_EDITOR)
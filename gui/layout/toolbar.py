@@ -8,7 +8,7 @@ from gui.theme.fonts import FONT_NORMAL
 
 
 class Toolbar(tk.Frame):
-    def __init__(self, parent, strings, on_run, on_step, on_reset):
+    def __init__(self, parent, strings, on_run, on_step, on_step_back, on_reset):
         super().__init__(parent, bg=BG_PANEL)
 
         self.strings = strings
@@ -41,6 +41,20 @@ class Toolbar(tk.Frame):
         )
         self.step_btn.pack(side=tk.LEFT, padx=6)
 
+        # Botão STEP BACK
+        self.step_back_btn = tk.Button(
+            self,
+            text="⏮ " + strings["step_back"],
+            command=on_step_back,
+            bg=BG_PANEL,
+            fg=TEXT_PRIMARY,
+            font=FONT_NORMAL,
+            relief=tk.FLAT,
+            padx=12,
+            pady=6
+        )
+        self.step_back_btn.pack(side=tk.LEFT, padx=6)
+
         # Botão RESET
         self.reset_btn = tk.Button(
             self,
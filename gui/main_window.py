@@ -2,8 +2,15 @@ import tkinter as tk
 from tkinter import messagebox
 
 # -------- Core Z70 --------
-from core.assembler import preprocess, first_pass, second_pass
-from core.CPU import CPU
+from core.assembler import preprocess
+from core.incremental import IncrementalAssembler
+from core.disasm import Disassembler
+from core.CPU import CPU, LOOP, BREAKPOINT
+from core.journal import Journal
+from core.result_cache import ResultCache
+
+# Tempo máximo de um "Executar" antes de devolver o controle à interface
+RUN_TIMEOUT = 5.0
 
 # -------- GUI Components --------
 from gui.layout.toolbar import Toolbar
@@ -24,8 +31,17 @@ class Z70App(tk.Tk):
         # ---------- Estado ----------
         self.strings = STRINGS_PT
         self.cpu = None
+        self.journal = None
+        self.result_cache = ResultCache()
+        # Só reanalisa as linhas editadas desde a última montagem
+        self.assembler = IncrementalAssembler()
         self.program_loaded = False
         self.listing = []
+        # Endereço <-> linha do editor da última montagem
+        self.source_map = None
+        self.code_lines = []
+        # O que está de fato na memória em PC (o listing não vê código automodificável)
+        self.disasm = Disassembler()
 
         # 🔒 Garante espaço total suficiente
         self.geometry("1600x900")
@@ -39,6 +55,7 @@ class Z70App(tk.Tk):
             strings=self.strings,
             on_run=self.run_program,
             on_step=self.step_program,
+            on_step_back=self.step_back_program,
             on_reset=self.reset_program
         )
         self.toolbar.pack(fill=tk.X)
@@ -138,17 +155,21 @@ class Z70App(tk.Tk):
         try:
             lines = self.editor.get_code_lines()
 
-            pp = preprocess(lines)
-            parsed, labels = first_pass(pp)
-            mem, listing, code_end = second_pass(parsed, labels)
+            mem, listing, code_end, changed = self.assembler.assemble(lines)
 
             self.listing = listing
-            self.cpu = CPU(mem, labels)
+            self.source_map = self.assembler.source_map
+            self.code_lines = lines
+            self.cpu = CPU(mem, self.assembler.labels)
             self.cpu.program_end = code_end
+            # Grava cada passo para o "Voltar passo"
+            self.journal = Journal(self.cpu)
             self.program_loaded = True
 
             self.log(self.strings["program_loaded"])
             self.update_output()
+            if len(changed) < len(mem):
+                self.memory_panel.mark_changed(changed)
 
         except Exception as e:
             messagebox.showerror("Assembler error", str(e))
@@ -163,15 +184,35 @@ class Z70App(tk.Tk):
         if not self.cpu:
             return
 
-        self.cpu.run()
+        self.sync_breakpoints()
+        # Os painéis só são atualizados quando a execução para
+        outcome = self.result_cache.run(self.cpu, timeout=RUN_TIMEOUT, detect_loops=True)
         self.update_output()
+
+        if outcome.status == BREAKPOINT:
+            self.highlight_pc()
+            self.log(self.strings["breakpoint_hit"].format(pc=self.cpu.PC, steps=outcome.steps))
+            return
+
         self.highlight_pc_end()
         self.explain_last_instruction()
 
-        messagebox.showinfo(
-            self.strings["app_title"],
-            self.strings["program_finished"]
-        )
+        if outcome.halted:
+            messagebox.showinfo(
+                self.strings["app_title"],
+                self.strings["program_finished"]
+            )
+        elif outcome.status == LOOP:
+            lo, hi = outcome.loop
+            messagebox.showwarning(
+                self.strings["app_title"],
+                self.strings["program_loop"].format(lo=lo, hi=hi, steps=outcome.steps)
+            )
+        else:
+            messagebox.showwarning(
+                self.strings["app_title"],
+                self.strings["program_timeout"].format(steps=outcome.steps)
+            )
 
     def step_program(self):
         if not self.program_loaded:
@@ -188,10 +229,26 @@ class Z70App(tk.Tk):
         # ⛔ NÃO mostra popup no STEP
         # Apenas para a execução silenciosamente
 
+    def step_back_program(self):
+        if not self.cpu or not self.journal:
+            return
+
+        if not self.journal.step_back():
+            self.log(self.strings["no_step_back"])
+            return
+
+        self.update_output()
+        self.highlight_pc()
+        self.explain_last_instruction()
+
     def reset_program(self):
         self.cpu = None
+        self.journal = None
         self.program_loaded = False
         self.listing = []
+        self.source_map = None
+        self.code_lines = []
+        self.disasm.reset()
 
         self.output.delete("1.0", tk.END)
         self.cpu_panel.update(None)
@@ -200,6 +257,19 @@ class Z70App(tk.Tk):
         self.editor.highlight_line(0)
         self.explanation_panel.clear()
 
+    def sync_breakpoints(self):
+        """Passa para a CPU os breakpoints marcados no editor."""
+        self.cpu.clear_breakpoints()
+        for addr in self.breakpoint_addresses():
+            self.cpu.add_breakpoint(addr)
+
+    def breakpoint_addresses(self):
+        """Endereço da instrução de cada linha do editor com breakpoint."""
+        if not self.source_map:
+            return []
+        addr_at = self.source_map.addr_at
+        return [addr_at[n] for n in sorted(self.editor.breakpoints) if n in addr_at]
+
     # =========================
     # HELPERS
     # =========================
@@ -217,6 +287,10 @@ class Z70App(tk.Tk):
         self.output.delete("1.0", tk.END)
         self.log(f"REGS:  {self.cpu.regs()}")
         self.log(f"FLAGS: {self.cpu.flags()}")
+        pc = self.cpu.PC
+        if pc < self.cpu.program_end:
+            self.disasm.update(self.cpu.memory_view(), self.cpu.program_end, self.cpu.labels)
+            self.log(f"PC:    {pc:02X}H  {self.disasm.at(pc)}")
 
         self.cpu_panel.update(self.cpu)
         self.memory_panel.update(self.cpu)
@@ -226,38 +300,33 @@ class Z70App(tk.Tk):
     # HIGHLIGHT / EXPLICAÇÃO
     # =========================
     def highlight_pc(self):
-        if not self.cpu or not self.listing:
+        if not self.cpu or not self.source_map:
             return
 
         pc = self.cpu.PC
-        for idx, (addr, _, _) in enumerate(self.listing, start=1):
-            if addr == pc:
-                self.editor.highlight_line(idx)
-                break
+        line = self.source_map.line_at[pc]
+        if line:
+            self.editor.highlight_line(line)
 
         self.memory_panel.highlight(pc)
 
     def highlight_pc_end(self):
-        if not self.cpu or not self.listing:
+        if not self.cpu or not self.source_map:
             return
 
-        last_pc = self.cpu.PC - 1
-        for idx, (addr, _, _) in enumerate(self.listing, start=1):
-            if addr == last_pc:
-                self.editor.highlight_line(idx)
-                break
+        # Último byte executado (PC - 1) cai na última instrução, de 1 ou 2 bytes
+        line = self.source_map.line_at[(self.cpu.PC - 1) & 0xFF]
+        if line:
+            self.editor.highlight_line(line)
 
     def explain_last_instruction(self):
-        if not self.cpu or not self.listing:
+        if not self.cpu or not self.source_map:
             return
 
-        last_pc = self.cpu.PC - 1
-        for addr, _, src in self.listing:
-            if addr == last_pc:
-                instr = src.strip()
-                break
-        else:
+        line = self.source_map.line_at[(self.cpu.PC - 1) & 0xFF]
+        if not line:
             return
+        instr = preprocess([self.code_lines[line - 1]])[0]
 
         lines = [f"Instrução executada: {instr}"]
         low = instr.lower()
@@ -4,6 +4,8 @@ BG_MAIN = "#1e1e1e"        # fundo geral
 BG_PANEL = "#252526"       # painéis
 BG_EDITOR = "#1b1b1b"      # editor de código
 BG_HIGHLIGHT = "#333842"   # destaque (linha atual, seleção)
+BG_BREAKPOINT = "#4a2626"  # linha com breakpoint
+BG_CHANGED = "#2d4a2d"     # bytes alterados pela última edição
 
 TEXT_PRIMARY = "#e6e6e6"   # texto principal
 TEXT_SECONDARY = "#b0b0b0" # texto auxiliar
@@ -1,6 +1,17 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Adiciona a raiz do projeto ao PYTHONPATH
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory):
+    """Caches em disco (ULA por LUT, resultados) num diretório da sessão."""
+    mp = pytest.MonkeyPatch()
+    mp.setenv("Z70_CACHE_DIR", str(tmp_path_factory.mktemp("z70-cache")))
+    yield
+    mp.undo()
@@ -0,0 +1,98 @@
+import pytest
+
+from core import alu
+from core.arch import OPCODES, MODES, UNARY_MODES
+from core.codegen import build_handlers, lut_name
+from core.CPU import CPU, BINARY_HANDLERS, UNARY_HANDLERS
+
+from test_cpu import SAMPLES, make_cpu, state
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return alu.build_tables()
+
+
+@pytest.fixture(scope="module")
+def lut_table(tables):
+    handlers, _ = build_handlers(lut={lut_name(m): t for m, t in tables.items()})
+    return handlers
+
+
+# Modos só com registradores: A op B e op A
+REG_MODE = [m for m, (d, s) in MODES.items() if d == ('reg', 'A') and s == ('reg', 'B')][0]
+UNARY_REG_MODE = [m for m, (d, _) in UNARY_MODES.items() if d == ('reg', 'A')][0]
+
+
+@pytest.mark.parametrize("mnemon", ['add', 'sub', 'cmp', 'and', 'or'])
+def test_lut_binary_full_operand_space(lut_table, mnemon):
+    op = OPCODES[mnemon]
+    lut = lut_table[(op << 4) | REG_MODE]
+    ref_handler = BINARY_HANDLERS[op]
+    ref, gen = CPU([0] * 256, {}), CPU([0] * 256, {})
+    for a in range(256):
+        for b in range(256):
+            ref.A, ref.B, ref.FLAGS = a, b, 0
+            gen.A, gen.B, gen.FLAGS = a, b, 0
+            ref_handler(ref, ('reg', 'A'), ('reg', 'B'))
+            lut(gen, None)
+            assert (gen.A, gen.FLAGS) == (ref.A, ref.FLAGS), (a, b)
+
+
+@pytest.mark.parametrize("mnemon", ['inc', 'dec', 'not', 'shr', 'shl'])
+def test_lut_unary_full_operand_space(lut_table, mnemon):
+    op = OPCODES[mnemon]
+    lut = lut_table[(op << 4) | UNARY_REG_MODE]
+    ref_handler = UNARY_HANDLERS[op]
+    ref, gen = CPU([0] * 256, {}), CPU([0] * 256, {})
+    for a in range(256):
+        for flags in (0x00, 0x40, 0xF8):
+            ref.A, ref.FLAGS = a, flags
+            gen.A, gen.FLAGS = a, flags
+            ref_handler(ref, ('reg', 'A'))
+            lut(gen, None)
+            assert (gen.A, gen.FLAGS) == (ref.A, ref.FLAGS), (a, flags)
+
+
+def test_lut_cache_roundtrip(tables, tmp_path):
+    path = str(tmp_path / "lut.bin")
+    assert alu.read_tables(path) is None
+    alu.save_tables(tables, path)
+    assert alu.read_tables(path) == tables
+    assert alu.footprint(tables) == 4 * 65536 * 2 + 5 * 256 * 2
+
+
+def test_lut_cache_rejects_stale_file(tmp_path):
+    path = tmp_path / "lut.bin"
+    path.write_bytes(alu.MAGIC + b"0000000000000000\n")
+    assert alu.read_tables(str(path)) is None
+
+
+@pytest.mark.parametrize("cut", [1, 2, 1001])
+def test_lut_cache_truncated_file_is_rebuilt(tables, tmp_path, cut):
+    path = str(tmp_path / "lut.bin")
+    alu.save_tables(tables, path)
+    with open(path, 'r+b') as f:
+        f.truncate(f.seek(0, 2) - cut)
+    assert alu.read_tables(path) is None
+    assert alu.load_tables(path) == tables
+    assert alu.read_tables(path) == tables
+
+
+def test_lut_handlers_are_cached_per_path(tmp_path):
+    a = alu.lut_handlers(str(tmp_path / "a.bin"))
+    b = alu.lut_handlers(str(tmp_path / "b.bin"))
+    assert (tmp_path / "a.bin").exists() and (tmp_path / "b.bin").exists()
+    assert a is not b
+    assert alu.lut_handlers(str(tmp_path / "a.bin")) is a
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_lut_cpu_samples(path, tmp_path, monkeypatch):
+    monkeypatch.setenv("Z70_CACHE_DIR", str(tmp_path))
+    src = path.read_text(encoding="utf-8")
+    ref = make_cpu(src)
+    lut = make_cpu(src, alu='lut')
+    ref.run()
+    lut.run()
+    assert state(lut) == state(ref)
@@ -0,0 +1,130 @@
+import itertools
+import random
+
+import pytest
+
+from core.arch import MODES, UNARY_MODES
+from core.assembler import preprocess, first_pass, second_pass, assemble, find_mode, source_map
+
+from test_cpu import SAMPLES
+
+
+def two_pass(lines):
+    parsed, labels = first_pass(preprocess(lines))
+    mem, listing, code_end = second_pass(parsed, labels)
+    return mem, listing, code_end, labels
+
+
+def same_result(lines):
+    """As duas montagens dão o mesmo resultado ou o mesmo erro."""
+    try:
+        expected = two_pass(lines)
+    except Exception as e:
+        with pytest.raises(type(e)) as info:
+            assemble(lines)
+        assert str(info.value) == str(e), lines
+        return False
+    assert assemble(lines) == expected, lines
+    return True
+
+
+def linear_find_mode(dst, src=None):
+    """Busca linear original em MODES/UNARY_MODES."""
+    if src is None:
+        for m, (d, _) in UNARY_MODES.items():
+            if d[0] == dst[0] and d[1] == dst[1]:
+                return m, None
+    else:
+        for m, (d, s) in MODES.items():
+            match_d = (d[0] == dst[0]) and (d[1] == dst[1] if d[1] != 'extra' else True)
+            match_s = (s[0] == src[0]) and (s[1] == src[1] if s[1] != 'extra' else True)
+            if match_d and match_s:
+                extra = dst[1] if d[1] == 'extra' else src[1] if s[1] == 'extra' else None
+                return m, extra
+    raise ValueError(f"No mode found for {dst} {src}")
+
+
+OPERANDS = [('reg', 'A'), ('reg', 'B'), ('reg', 'I'), ('ind_i', None), ('const', 0x12), ('dir', 0x80)]
+
+
+@pytest.mark.parametrize("dst, src", list(itertools.product(OPERANDS, OPERANDS + [None])))
+def test_indexed_find_mode_matches_linear_scan(dst, src):
+    try:
+        expected = linear_find_mode(dst, src)
+    except ValueError as e:
+        with pytest.raises(ValueError, match=str(e).replace('(', r'\(').replace(')', r'\)')):
+            find_mode(dst, src)
+        return
+    assert find_mode(dst, src) == expected
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_samples_match_two_pass(path):
+    assert same_result(path.read_text(encoding="utf-8").splitlines())
+
+
+def test_forward_references_are_patched():
+    mem, listing, code_end, labels = assemble(["jmp END", "nop", "END: nop"])
+    assert mem[:4] == [0xA0, 0x03, 0xFF, 0xFF]
+    assert listing[0] == (0, [0xA0, 0x03], "jmp END")
+    assert (code_end, labels) == (4, {'END': 3})
+
+
+@pytest.mark.parametrize("lines", [
+    ["jmp NOWHERE"],
+    ["foo A, B", "mov A, [ZZ]"],             # erro da 1ª passada vence o da 2ª
+    ["jmp X", "foo A, B"],                   # dois erros da 2ª: o primeiro vence
+    ["foo A, B", "jmp X"],
+    ["X: nop", "X: nop"],
+    ["jz"], ["nop A"], ["inc A, B"], ["mov A"], ["shl 05H"], ["mov [I], [I]"],
+    ["mov A, FFH"] * 127 + ["jmp NOWHERE"],  # cabe: rótulo desconhecido
+    ["mov A, FFH"] * 129,                    # não cabe na memória
+    ["mov A, FFH"] * 127 + ["nop", "jmp X", "X: nop"],
+])
+def test_errors_match_two_pass(lines):
+    assert not same_result(lines)
+
+
+def random_line(rng):
+    label = rng.choice(["", "", "", "L1:", "L2: ", "L3 :", " :"])
+    instr = rng.choice(["mov", "MOV", "add", "cmp", "inc", "shl", "nop", "jmp", "jz", "jc", "foo", ""])
+    args = rng.choice([
+        "", "A", "A, B", "B,A", "A, [I]", "[I], A", "A, 7FH", "[ 80H ], B", "B, [90h]",
+        "I, 10", "A, -1", "L1", "L2", "L3", "NOPE", "A, B, I", "[I], [I]", "[XYZ], A", "A  ,  B",
+    ])
+    comment = rng.choice(["", "", " // nota", "//"])
+    return f"{label} {instr} {args}{comment}"
+
+
+def test_random_programs_match_two_pass():
+    rng = random.Random(18)
+    ok = 0
+    for _ in range(3000):
+        lines = [random_line(rng) for _ in range(rng.randrange(1, 12))]
+        ok += same_result(lines)
+    # Parte dos programas precisa montar, senão só os erros seriam testados
+    assert ok > 50
+
+
+# =========================================================
+# MAPA DE FONTE
+# =========================================================
+def test_source_map_uses_original_line_numbers():
+    lines = ["// cabeçalho", "", "START:", "    mov A, 05H  // dois bytes", "LOOP: dec A", "", "    jz LOOP"]
+    _, listing, _, _ = assemble(lines)
+    smap = source_map(lines, listing)
+    assert smap.addr_at == {4: 0x00, 5: 0x02, 7: 0x03}
+    assert smap.line_at[:6] == [4, 4, 5, 7, 7, None]
+    assert smap.line_at[0xFF] is None
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_source_map_points_at_listing_text(path):
+    lines = path.read_text(encoding="utf-8").splitlines()
+    _, listing, _, _ = assemble(lines)
+    smap = source_map(lines, listing)
+    for addr, bytes_list, orig in listing:
+        line = smap.line_at[addr]
+        assert preprocess([lines[line - 1]]) == [orig]
+        assert smap.addr_at[line] == addr
+        assert smap.line_at[addr + len(bytes_list) - 1] == line
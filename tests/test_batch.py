@@ -0,0 +1,111 @@
+import inspect
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.batch import find_programs, run_batch, run_file, DEFAULT_TIMEOUT
+from core.objfile import build, save
+
+from test_cpu import SAMPLES, make_cpu
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def expected(path, dump=None):
+    cpu = make_cpu(Path(path).read_text(encoding="utf-8"))
+    cpu.run()
+    rec = {'A': cpu.A, 'B': cpu.B, 'I': cpu.I, 'PC': cpu.PC}
+    return rec, list(cpu.mem[dump[0]:dump[1] + 1]) if dump else None
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_run_file_matches_cpu(path):
+    rec = run_file(str(path), dump=(0x80, 0x8F))
+    regs, dump = expected(path, (0x80, 0x8F))
+    assert rec['error'] is None and rec['status'] == 'halted'
+    assert (rec['regs'], rec['dump']) == (regs, dump)
+    assert rec['steps'] > 0 and rec['elapsed'] >= 0
+
+
+def test_wrapping_dump_and_flags():
+    rec = run_file(str(ROOT / "code_samples" / "hello_world.z70"), dump=(0xFE, 0x01))
+    assert len(rec['dump']) == 4
+    assert rec['flags'] == {'OF': 0, 'CF': 0, 'ZF': 0, 'PF': 1, 'SF': 0}
+
+
+def test_errors_and_limits(tmp_path):
+    bad = tmp_path / "bad.z70"
+    bad.write_text("jmp NOWHERE", encoding="utf-8")
+    loop = tmp_path / "loop.z70"
+    loop.write_text("L: inc A\njmp L", encoding="utf-8")
+    assert run_file(str(bad))['error'] == "ValueError: Unknown label: NOWHERE"
+    assert run_file(str(tmp_path / "missing.z70"))['error'].startswith("FileNotFoundError")
+    rec = run_file(str(loop), max_steps=100)
+    assert (rec['status'], rec['steps'], rec['error']) == ('budget', 100, None)
+    assert run_file(str(loop), detect_loops=True)['status'] == 'loop'
+    rec = run_file(str(loop), timeout=0.05)
+    assert (rec['status'], rec['error']) == ('timeout', None) and rec['steps'] > 0
+
+
+def test_programs_have_a_default_timeout():
+    assert inspect.signature(run_file).parameters['timeout'].default == DEFAULT_TIMEOUT
+
+
+def test_objects_are_run_too(tmp_path):
+    obj = tmp_path / "p.z70o"
+    save(build(SAMPLES[0].read_text(encoding="utf-8")), obj)
+    assert run_file(str(obj))['regs'] == expected(SAMPLES[0])[0]
+
+
+def test_find_programs_walks_directories(tmp_path):
+    (tmp_path / "b").mkdir()
+    for name in ("b/2.z70", "1.z70", "notes.txt", "b/3.z70o"):
+        (tmp_path / name).write_text("nop")
+    found = find_programs([str(tmp_path), "x.z70"])
+    assert [Path(p).relative_to(tmp_path).as_posix() for p in found[:-1]] == ["1.z70", "b/2.z70", "b/3.z70o"]
+    assert found[-1] == "x.z70"
+
+
+@pytest.mark.parametrize("jobs, chunksize", [(1, None), (2, None), (2, 1), (3, 2)])
+def test_batch_keeps_order_and_results(jobs, chunksize):
+    paths = [str(p) for p in SAMPLES] * 3
+    recs = list(run_batch(paths, jobs=jobs, chunksize=chunksize, dump=(0x80, 0x83)))
+    assert [r['file'] for r in recs] == paths
+    for rec in recs:
+        assert (rec['regs'], rec['dump']) == expected(rec['file'], (0x80, 0x83))
+
+
+def test_cli_batch(tmp_path):
+    (tmp_path / "bad.z70").write_text("foo A, B", encoding="utf-8")
+    result = subprocess.run(
+        [sys.executable, "Z70.py", "--batch", "code_samples", str(tmp_path),
+         "--dump", "80H-81H", "--jobs", "2"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    assert result.returncode == 1
+    recs = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(recs) == len(SAMPLES) + 1
+    hello = next(r for r in recs if r['file'].endswith("hello_world.z70"))
+    assert hello['dump'] == [0x48, 0x65]
+    assert recs[-1]['error'] == "ValueError: Unknown instr: foo"
+
+
+def test_cli_batch_reports_timeouts(tmp_path):
+    (tmp_path / "loop.z70").write_text("L: inc A\njmp L", encoding="utf-8")
+    result = subprocess.run(
+        [sys.executable, "Z70.py", "--batch", str(tmp_path), "--timeout", "0.2"],
+        cwd=ROOT, capture_output=True, text=True, timeout=30,
+    )
+    assert result.returncode == 0, result.stderr
+    (rec,) = [json.loads(line) for line in result.stdout.splitlines()]
+    assert (rec['status'], rec['error']) == ('timeout', None)
+
+
+def test_cli_batch_rejects_single_run_options():
+    result = subprocess.run([sys.executable, "Z70.py", "--batch", "code_samples", "--stats"],
+                            cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 2
+    assert "--stats cannot be used with --batch" in result.stderr
@@ -0,0 +1,334 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from core.arch import DECODE_TABLE, OPCODES
+from core.assembler import preprocess, first_pass, second_pass
+from core.codegen import BYTE_HANDLERS, LAZY_BYTE_HANDLERS
+from core.CPU import CPU, BINARY_HANDLERS, UNARY_HANDLERS, HALTED, BUDGET, TIMEOUT, LOOP
+
+SAMPLES = sorted((Path(__file__).resolve().parents[1] / "code_samples").glob("*.z70"))
+
+
+def make_cpu(src, **kwargs):
+    pp = preprocess(src.splitlines())
+    parsed, labels = first_pass(pp)
+    mem, listing, code_end = second_pass(parsed, labels)
+    cpu = CPU(mem, labels, **kwargs)
+    cpu.program_end = code_end
+    return cpu
+
+
+def state(cpu):
+    return cpu.regs(), cpu.flags(), list(cpu.mem)
+
+
+# =========================================================
+# CACHE DE DECODIFICAÇÃO
+# =========================================================
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_run_matches_single_steps(path):
+    src = path.read_text(encoding="utf-8")
+
+    fast = make_cpu(src)
+    fast.run()
+
+    slow = make_cpu(src)
+    while slow.PC < slow.program_end:
+        slow.step()
+
+    assert state(fast) == state(slow)
+
+
+def test_self_modifying_code_invalidates_cache():
+    src = """
+        mov B, 00H
+    LOOP:
+        add B, 01H
+        inc I
+        mov A, 05H
+        mov [03H], A
+        cmp B, 0BH
+        jz END
+        jmp LOOP
+    END:
+        nop
+    """
+    cpu = make_cpu(src)
+    cpu.run()
+    # 1 + 5 + 5: o imediato do add é reescrito depois da primeira volta
+    assert cpu.B == 0x0B
+    assert cpu.I == 0x03
+
+
+def test_fused_jump_target_inside_pair():
+    src = """
+        mov A, 02H
+        jmp MID
+    LOOP:
+        dec A
+    MID:
+        jz END
+        jmp LOOP
+    END:
+        nop
+    """
+    cpu = make_cpu(src)
+    cpu.run()
+    assert cpu.A == 0
+    assert cpu.get_flag('ZF') == 1
+
+
+# =========================================================
+# HANDLERS GERADOS x HANDLERS DE REFERÊNCIA
+# =========================================================
+
+ALU_BYTES = [b for b, e in enumerate(DECODE_TABLE) if e and e[0] in OPCODES]
+
+
+def resolve(loc, extra):
+    if loc is not None and loc[1] == 'extra':
+        return (loc[0], extra)
+    return loc
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+@pytest.mark.parametrize("instr_byte", ALU_BYTES, ids=lambda b: f"{b:02X}")
+def test_generated_handler_matches_reference(instr_byte, lazy):
+    _, dst, src, _ = DECODE_TABLE[instr_byte]
+    op = instr_byte >> 4
+    rng = random.Random(instr_byte)
+    mem = [rng.randrange(256) for _ in range(256)]
+    for _ in range(300):
+        regs = [rng.randrange(256) for _ in range(3)]
+        flags = rng.randrange(256) & 0xF8
+        extra = rng.randrange(256)
+
+        ref = CPU(mem, {})
+        gen = CPU(mem, {}, lazy_flags=lazy)
+        for cpu in (ref, gen):
+            cpu.A, cpu.B, cpu.I = regs
+            cpu.FLAGS = flags
+
+        if src is None:
+            UNARY_HANDLERS[op](ref, resolve(dst, extra))
+        else:
+            BINARY_HANDLERS[op](ref, resolve(dst, extra), resolve(src, extra))
+        (LAZY_BYTE_HANDLERS if lazy else BYTE_HANDLERS)[instr_byte](gen, extra)
+
+        assert state(gen) == state(ref)
+        assert gen.FLAGS == ref.FLAGS
+
+
+# =========================================================
+# FLAGS PREGUIÇOSAS
+# =========================================================
+
+def random_program(rng, size=120):
+    mem = []
+    while len(mem) < size:
+        b = rng.choice(ALU_BYTES + [0xA1, 0xA2, 0xA3, 0xA4, 0xA5])
+        mem.append(b)
+        if DECODE_TABLE[b][3] == 2:
+            # saltos só para frente, para o programa sempre terminar
+            mem.append(rng.randrange(len(mem) + 1, size + 2) if b >= 0xA0 and b <= 0xA5 else rng.randrange(256))
+    end = len(mem)
+    return mem + [0] * (256 - end), end
+
+
+def run_steps(cpu, every):
+    """Executa passo a passo, lendo FLAGS só a cada `every` passos."""
+    trace = []
+    try:
+        n = 0
+        while cpu.PC < cpu.program_end:
+            cpu.step()
+            n += 1
+            if n % every == 0:
+                trace.append((cpu.FLAGS, state(cpu)))
+    except ValueError as e:
+        trace.append(str(e))
+    trace.append((cpu.FLAGS, state(cpu)))
+    return trace
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_lazy_flags_bit_identical(seed):
+    rng = random.Random(seed)
+    mem, end = random_program(rng)
+    traces = []
+    for lazy in (False, True):
+        cpu = CPU(mem, {}, lazy_flags=lazy)
+        cpu.program_end = end
+        cpu.I = 0xC0
+        traces.append(run_steps(cpu, every=7))
+    assert traces[0] == traces[1]
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_lazy_flags_samples(path):
+    src = path.read_text(encoding="utf-8")
+    eager = make_cpu(src)
+    lazy = make_cpu(src, lazy_flags=True)
+    eager.run()
+    lazy.run()
+    assert state(lazy) == state(eager)
+    assert lazy.FLAGS == eager.FLAGS
+
+
+# =========================================================
+# LAYOUT COMPACTO
+# =========================================================
+
+def test_cpu_has_no_instance_dict():
+    cpu = CPU([0] * 256, {})
+    assert not hasattr(cpu, "__dict__")
+    with pytest.raises(AttributeError):
+        cpu.X = 1
+
+
+def test_memory_is_bytearray_and_writes_wrap():
+    src = """
+        mov A, FFH
+        mov I, 90H
+        add A, 02H
+        mov [I], A
+        mov I, 80H
+        dec [I]
+    """
+    cpu = make_cpu(src)
+    assert isinstance(cpu.mem, bytearray)
+    cpu.run()
+    assert cpu.mem[0x90] == 0x01
+    assert cpu.mem[0x80] == 0xFF
+
+
+def test_memory_view_is_live_and_read_only():
+    cpu = make_cpu("mov A, 41H\nmov [A0H], A")
+    view = cpu.memory_view()
+    assert view.readonly
+    assert len(view) == 256
+    cpu.run()
+    assert view[0xA0] == 0x41
+    with pytest.raises(TypeError):
+        view[0] = 1
+
+
+def test_memory_view_numpy_zero_copy():
+    np = pytest.importorskip("numpy")
+    cpu = make_cpu("mov A, 07H\nmov [F0H], A")
+    arr = np.frombuffer(cpu.memory_view(), dtype=np.uint8)
+    cpu.run()
+    assert arr[0xF0] == 7
+    assert not arr.flags.writeable
+
+
+# =========================================================
+# LIMITES E LAÇOS INFINITOS
+# =========================================================
+
+def test_run_without_limits_halts():
+    cpu = make_cpu("mov A, 01H\nadd A, 02H")
+    outcome = cpu.run()
+    assert outcome.status == HALTED and outcome.halted
+    assert outcome.steps is None
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_limited_run_matches_fast_run(path):
+    src = path.read_text(encoding="utf-8")
+    fast = make_cpu(src)
+    fast.run()
+    slow = make_cpu(src)
+    outcome = slow.run(max_steps=10 ** 6, timeout=60, detect_loops=True)
+    assert outcome.status == HALTED
+    assert state(slow) == state(fast)
+
+    counted = make_cpu(src)
+    n = 0
+    while counted.PC < counted.program_end:
+        counted.step()
+        n += 1
+    assert outcome.steps == n
+
+
+INFINITE = """
+    mov A, 00H
+LOOP:
+    inc A
+    and A, 0FH
+    jmp LOOP
+"""
+
+
+def test_step_budget():
+    cpu = make_cpu(INFINITE)
+    outcome = cpu.run(max_steps=1000)
+    assert outcome.status == BUDGET
+    assert outcome.steps == 1000
+    # o budget é exato: 1 mov + 333 voltas de 3 instruções
+    assert cpu.A == 333 & 0x0F
+
+
+def test_budget_exactly_at_end_is_halted():
+    cpu = make_cpu("mov A, 01H\nmov B, 02H")
+    outcome = cpu.run(max_steps=2)
+    assert outcome.status == HALTED
+    assert outcome.steps == 2
+
+
+def test_timeout():
+    cpu = make_cpu(INFINITE)
+    outcome = cpu.run(timeout=0.05)
+    assert outcome.status == TIMEOUT
+    assert outcome.steps > 0
+
+
+def test_detects_infinite_loop_with_range():
+    cpu = make_cpu(INFINITE)
+    outcome = cpu.run(detect_loops=True)
+    assert outcome.status == LOOP
+    # inc A (02H), and A (03H), jmp (05H)
+    assert outcome.loop == (0x02, 0x05)
+    # A percorre 16 valores antes de repetir o estado
+    assert outcome.period == 3 * 16
+    assert outcome.steps < 200
+
+
+def test_detects_loop_with_self_jump():
+    cpu = make_cpu("mov A, 01H\nHERE: jmp HERE")
+    outcome = cpu.run(detect_loops=True)
+    assert outcome.status == LOOP
+    assert outcome.loop == (0x02, 0x02)
+    assert outcome.period == 1
+
+
+def test_terminating_loop_is_not_reported():
+    src = """
+        mov B, FFH
+    OUTER:
+        mov A, FFH
+    INNER:
+        dec A
+        jz NEXT
+        jmp INNER
+    NEXT:
+        dec B
+        jz END
+        jmp OUTER
+    END:
+        nop
+    """
+    cpu = make_cpu(src)
+    assert cpu.run(detect_loops=True).status == HALTED
+    assert (cpu.A, cpu.B) == (0, 0)
+
+
+def test_detects_loop_through_memory():
+    # O contador fica na memória: o estado só repete depois de 256 voltas
+    cpu = make_cpu("mov I, 80H\nLOOP: inc [I]\njmp LOOP")
+    outcome = cpu.run(detect_loops=True)
+    assert outcome.status == LOOP
+    assert outcome.period == 2 * 256
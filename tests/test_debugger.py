@@ -0,0 +1,199 @@
+import pytest
+
+from core.CPU import BUDGET, LOOP, BREAKPOINT, WATCHPOINT
+from core.debugger import Breakpoints
+from core.journal import Journal
+from core.result_cache import ResultCache
+
+from test_cpu import SAMPLES, make_cpu, state
+
+COUNTDOWN = """
+    mov A, 05H
+LOOP:
+    dec A
+    jz END
+    jmp LOOP
+END:
+    mov I, 80H
+    mov [I], A
+    mov B, [80H]
+"""
+# Endereços em COUNTDOWN
+LOOP_ADDR = 0x02
+END_ADDR = 0x07
+STORE_ADDR = 0x09
+
+
+# =========================================================
+# BREAKPOINTS
+# =========================================================
+def test_breakpoint_stops_before_instruction():
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(END_ADDR)
+    outcome = cpu.run()
+    assert outcome.status == BREAKPOINT
+    assert cpu.PC == END_ADDR
+    assert cpu.I == 0
+
+
+def test_run_resumes_from_breakpoint():
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(LOOP_ADDR)
+    hits = []
+    while True:
+        outcome = cpu.run()
+        if outcome.status != BREAKPOINT:
+            break
+        hits.append(cpu.A)
+    assert outcome.halted
+    assert hits == [5, 4, 3, 2, 1]
+
+
+def test_breakpoint_on_first_instruction():
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(0x00)
+    outcome = cpu.run()
+    assert (outcome.status, outcome.steps, cpu.PC) == (BREAKPOINT, 0, 0x00)
+    # Continuar dali executa a instrução em vez de parar de novo
+    assert cpu.run().halted
+    assert cpu.B == 0
+
+
+def test_breakpoint_after_stepping_back_to_it():
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(LOOP_ADDR)
+    assert cpu.run().status == BREAKPOINT
+    cpu.step()
+    cpu.PC = LOOP_ADDR
+    # Instruções executadas desde a parada: o breakpoint vale de novo
+    outcome = cpu.run()
+    assert (outcome.status, outcome.steps) == (BREAKPOINT, 0)
+
+
+def test_conditional_breakpoint():
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(LOOP_ADDR, A=0x02)
+    assert cpu.run().status == BREAKPOINT
+    assert cpu.A == 2
+
+
+def test_flag_condition_and_alternatives():
+    cpu = make_cpu(COUNTDOWN)
+    # jz (03H) com ZF=1 só acontece na última volta
+    cpu.add_breakpoint(0x03, ZF=1)
+    assert cpu.run().status == BREAKPOINT
+    assert cpu.A == 0
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(LOOP_ADDR, A=0x03)
+    cpu.add_breakpoint(LOOP_ADDR, A=0x04)
+    cpu.run()
+    assert cpu.A == 4
+
+
+def test_invalid_conditions():
+    bp = Breakpoints()
+    with pytest.raises(ValueError):
+        bp.add(0x10, X=1)
+    with pytest.raises(ValueError):
+        bp.add(0x10, ZF=2)
+    with pytest.raises(ValueError):
+        bp.add(0x100)
+
+
+def test_removed_breakpoints_use_fast_path(monkeypatch):
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(LOOP_ADDR)
+    cpu.add_watchpoint(0x80)
+    cpu.remove_breakpoint(LOOP_ADDR)
+    cpu.remove_watchpoint(0x80)
+    monkeypatch.setattr(type(cpu), "_run_debug", None)
+    assert cpu.run().halted
+
+
+def test_run_until():
+    cpu = make_cpu(COUNTDOWN)
+    outcome = cpu.run_until(END_ADDR)
+    assert outcome.status == BREAKPOINT and cpu.PC == END_ADDR
+    # Alvo que nunca é alcançado: termina normalmente
+    assert cpu.run_until(LOOP_ADDR).halted
+
+
+def test_run_until_respects_budget_and_breakpoints():
+    cpu = make_cpu(COUNTDOWN)
+    outcome = cpu.run_until(END_ADDR, max_steps=3)
+    assert (outcome.status, outcome.steps) == (BUDGET, 3)
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(LOOP_ADDR, A=0x01)
+    assert cpu.run_until(END_ADDR).status == BREAKPOINT
+    assert cpu.PC == LOOP_ADDR
+
+
+# =========================================================
+# WATCHPOINTS
+# =========================================================
+def test_write_watchpoint_stops_after_write():
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_watchpoint(0x80, 0x8F)
+    outcome = cpu.run()
+    assert (outcome.status, outcome.addr) == (WATCHPOINT, 0x80)
+    assert cpu.PC == STORE_ADDR + 1
+    assert cpu.B == 0
+
+
+def test_read_watchpoint():
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_watchpoint(0x80, read=True, write=False)
+    outcome = cpu.run()
+    assert (outcome.status, outcome.addr) == (WATCHPOINT, 0x80)
+    assert cpu.PC == cpu.program_end
+
+
+# =========================================================
+# INTEGRAÇÃO
+# =========================================================
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_unreached_breakpoint_matches_plain_run(path):
+    src = path.read_text(encoding="utf-8")
+    plain = make_cpu(src)
+    plain.run()
+    cpu = make_cpu(src)
+    cpu.add_breakpoint(0xFF)
+    assert cpu.run().halted
+    assert state(cpu) == state(plain)
+
+
+def test_breakpoint_with_loop_detection():
+    cpu = make_cpu("LOOP:\n inc A\n jmp LOOP")
+    cpu.add_breakpoint(0x00, A=0x10)
+    assert cpu.run(detect_loops=True).status == BREAKPOINT
+    assert cpu.A == 0x10
+    cpu.remove_breakpoint(0x00)
+    cpu.add_breakpoint(0x01, B=0x01)
+    assert cpu.run(detect_loops=True).status == LOOP
+
+
+def test_breakpoint_with_journal():
+    cpu = make_cpu(COUNTDOWN)
+    journal = Journal(cpu)
+    cpu.add_breakpoint(END_ADDR)
+    outcome = cpu.run()
+    assert journal.pos == outcome.steps
+    journal.seek(0)
+    assert (cpu.A, cpu.PC) == (0, 0)
+
+
+def test_result_cache_runs_with_breakpoints(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.run(make_cpu(COUNTDOWN))
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(END_ADDR)
+    outcome = cache.run(cpu)
+    assert outcome.status == BREAKPOINT and not outcome.cached
+
+
+def test_profile_and_breakpoints_are_exclusive():
+    from core.profile import Profile
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_breakpoint(END_ADDR)
+    with pytest.raises(ValueError):
+        cpu.run(profile=Profile())
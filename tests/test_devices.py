@@ -0,0 +1,202 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.CPU import LOOP
+from core.devices import Bus, ConsoleDevice, Device, InputDevice
+from core.jit import BlockJIT
+from core.journal import Journal
+from core.result_cache import ResultCache
+
+from test_cpu import SAMPLES, make_cpu, state
+
+ROOT = Path(__file__).resolve().parents[1]
+
+ECHO = """
+LOOP:
+    mov A, [F0H]
+    cmp A, 00H
+    jz END
+    mov [80H], A
+    jmp LOOP
+END:
+    nop
+"""
+
+
+def console_bus(start=0x80, end=0xFF):
+    out = []
+    bus = Bus()
+    console = bus.map(start, end, ConsoleDevice(out.append))
+    return bus, console, out
+
+
+# =========================================================
+# DISPOSITIVOS
+# =========================================================
+def test_console_streams_hello_world():
+    src = (ROOT / "code_samples" / "hello_world.z70").read_text(encoding="utf-8")
+    bus, console, out = console_bus()
+    cpu = make_cpu(src, bus=bus)
+    assert cpu.run().halted
+    assert "".join(out) == "Hello World!"
+    assert console.text() == "Hello World!"
+    # A escrita também vai para a RAM
+    assert bytes(cpu.mem[0x80:0x8C]) == b"Hello World!"
+
+
+def test_input_device_reads_bytes_then_eof():
+    dev = InputDevice(b"ab", eof=0xFF)
+    assert [dev.read(0) for _ in range(4)] == [0x61, 0x62, 0xFF, 0xFF]
+
+
+def test_input_device_reads_file_in_blocks():
+    dev = InputDevice(io.BytesIO(b"x" * 5000))
+    assert sum(dev.read(0) == 0x78 for _ in range(5000)) == 5000
+    assert dev.read(0) == 0
+
+
+def test_echo_program_copies_input_to_console():
+    bus = Bus()
+    out = []
+    bus.map(0x80, 0x80, ConsoleDevice(out.append))
+    bus.map(0xF0, 0xF0, InputDevice(b"Z70!"))
+    cpu = make_cpu(ECHO, bus=bus)
+    assert cpu.run().halted
+    assert "".join(out) == "Z70!"
+    # Leitura mapeada não altera a RAM
+    assert cpu.mem[0xF0] == 0
+
+
+def test_bus_rejects_bad_and_overlapping_ranges():
+    bus = Bus()
+    bus.map(0x80, 0x8F, Device())
+    with pytest.raises(ValueError):
+        bus.map(0x8F, 0x90, Device())
+    with pytest.raises(ValueError):
+        bus.map(0x20, 0x10, Device())
+    with pytest.raises(ValueError):
+        bus.map(0xF0, 0x100, Device())
+
+
+def test_read_value_is_masked():
+    class Wide(Device):
+        def read(self, addr):
+            return 0x1FF
+
+    bus = Bus()
+    bus.map(0xF0, 0xF0, Wide())
+    assert bus.read(0xF0) == 0xFF
+
+
+# =========================================================
+# CPU COM BARRAMENTO
+# =========================================================
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_unmapped_bus_matches_plain_run(path, lazy):
+    src = path.read_text(encoding="utf-8")
+    plain = make_cpu(src, lazy_flags=lazy)
+    plain.run()
+    with_bus = make_cpu(src, lazy_flags=lazy, bus=Bus())
+    with_bus.run()
+    assert state(with_bus) == state(plain)
+
+
+def test_bus_requires_inline_alu():
+    with pytest.raises(ValueError):
+        make_cpu("nop", alu='lut', bus=Bus())
+
+
+def test_jit_refuses_bus():
+    cpu = make_cpu("nop", bus=Bus())
+    with pytest.raises(ValueError):
+        BlockJIT(cpu)
+
+
+POLL = """
+LOOP:
+    mov A, [F0H]
+    cmp A, 00H
+    jz LOOP
+    mov B, A
+"""
+
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_polling_input_is_not_a_loop(debug):
+    bus = Bus()
+    bus.map(0xF0, 0xF0, InputDevice(bytes([0, 0, 0, 5])))
+    cpu = make_cpu(POLL, bus=bus)
+    if debug:
+        cpu.add_watchpoint(0x40)     # nunca escrito: só liga o laço de depuração
+    outcome = cpu.run(detect_loops=True)
+    assert outcome.halted
+    assert (cpu.A, cpu.B) == (5, 5)
+
+
+def test_polling_exhausted_input_is_a_loop():
+    bus = Bus()
+    bus.map(0xF0, 0xF0, InputDevice(b"\0\0"))
+    cpu = make_cpu(POLL, bus=bus)
+    outcome = cpu.run(detect_loops=True)
+    assert outcome.status == LOOP and outcome.loop == (0x00, 0x04)
+
+
+def test_detected_loop_does_not_repeat_console_output():
+    bus, console, out = console_bus()
+    cpu = make_cpu("mov A, 2AH\nL: mov [80H], A\njmp L", bus=bus)
+    journal = Journal(cpu)
+    outcome = cpu.run(detect_loops=True)
+    assert outcome.status == LOOP and outcome.period == 2
+    # Cada mov executado escreveu uma vez; a volta de conferência não escreve
+    movs = (outcome.steps - 1) // 2
+    assert out == ["*"] * movs and console.written == b"*" * movs
+    assert journal.head == outcome.steps == cpu.counters().instructions
+    assert cpu.bus is bus
+
+
+def test_result_cache_always_runs_with_bus(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for _ in range(2):
+        bus, _, out = console_bus()
+        src = (ROOT / "code_samples" / "hello_world.z70").read_text(encoding="utf-8")
+        outcome = cache.run(make_cpu(src, bus=bus))
+        assert not outcome.cached
+        assert "".join(out) == "Hello World!"
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+# =========================================================
+# CLI
+# =========================================================
+def run_cli(tmp_path, src, *options, stdin=b""):
+    path = tmp_path / "prog.z70"
+    path.write_text(src, encoding="utf-8")
+    return subprocess.run(
+        [sys.executable, "Z70.py", str(path), *options],
+        cwd=ROOT, input=stdin, capture_output=True,
+    )
+
+
+def test_cli_console_and_input(tmp_path):
+    result = run_cli(tmp_path, ECHO, "--console", "80H-80H", "--input", "F0H=-", stdin=b"abc")
+    assert result.returncode == 0
+    assert result.stdout.decode().startswith("abc\nREGS:")
+
+
+def test_cli_polling_input_with_loop_detection(tmp_path):
+    data = tmp_path / "in.bin"
+    data.write_bytes(bytes([0, 0, 0, 5]))
+    result = run_cli(tmp_path, POLL, "--input", f"F0H={data}", "--detect-loops")
+    assert result.returncode == 0, result.stdout
+    assert b"A=05H" in result.stdout
+
+
+def test_cli_rejects_bad_input_mapping(tmp_path):
+    result = run_cli(tmp_path, ECHO, "--input", "zz=-")
+    assert result.returncode == 2
+    assert b"invalid input mapping" in result.stderr
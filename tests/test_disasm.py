@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from core.arch import DECODE_TABLE
+from core.assembler import assemble
+from core.disasm import Disassembler, DISASM_TABLE, decode
+
+from test_cpu import SAMPLES, make_cpu
+
+
+def disassemble(mem, end, labels=None):
+    d = Disassembler()
+    d.update(mem, end, labels)
+    return d
+
+
+# =========================================================
+# TABELA
+# =========================================================
+@pytest.mark.parametrize("op", [op for op in range(256) if DECODE_TABLE[op] is not None])
+def test_every_instruction_reassembles(op):
+    mem = [0] * 256
+    mem[0], mem[1] = op, 0x9C
+    size, text, target = decode(mem, 0)
+    assert size == DECODE_TABLE[op][3] == DISASM_TABLE[op][0]
+    lines = [f"    {text}"]
+    if target is not None:
+        # Rótulo de destino em 9CH
+        lines += ["    nop"] * (0x9C - size) + ["L9CH:"]
+    out = assemble(lines)[0]
+    assert out[:size] == mem[:size]
+
+
+def test_invalid_bytes():
+    mem = [0] * 256
+    mem[0], mem[255] = 0xC0, 0xB6    # inválido; mov A, xx cortado no fim
+    assert decode(mem, 0) == (1, "db C0H", None)
+    assert decode(mem, 255) == (1, "db B6H", None)
+
+
+# =========================================================
+# VARREDURA E IDA E VOLTA
+# =========================================================
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+@pytest.mark.parametrize("named", [True, False])
+def test_roundtrip_through_assembler(path, named):
+    mem, listing, end, labels = assemble(path.read_text(encoding="utf-8").splitlines())
+    d = disassemble(mem, end, labels if named else None)
+    assert [(a, bs) for a, bs, _ in d.lines()] == [(a, bs) for a, bs, _ in listing]
+    mem2, _, end2, labels2 = assemble(d.source())
+    assert (mem2[:end2], end2) == (mem[:end], end)
+    if named:
+        assert labels2 == labels
+
+
+def test_recovered_labels_are_jump_targets():
+    mem, _, end, labels = assemble(["LOOP: dec A", "jz END", "jmp LOOP", "END: nop"])
+    d = disassemble(mem, end)
+    assert d.label_addresses() == [0x00, 0x05]
+    assert d.source() == ["L00H:", "    dec A", "    jz L05H", "    jmp L00H", "L05H:", "    nop"]
+
+
+def test_at_decodes_outside_the_sweep():
+    mem, _, end, _ = assemble(["mov A, FFH", "nop"])
+    d = disassemble(mem, end)
+    assert d.at(0) == "mov A, FFH"
+    # PC no meio da instrução: FFH é nop
+    assert d.at(1) == "nop"
+
+
+# =========================================================
+# INCREMENTAL
+# =========================================================
+def test_operand_change_redecodes_one_instruction():
+    path = SAMPLES[0]
+    mem, listing, end, labels = assemble(path.read_text(encoding="utf-8").splitlines())
+    d = disassemble(mem, end, labels)
+    addr = next(a for a, bs, _ in listing if len(bs) == 2 and bs[0] not in range(0xA0, 0xA6))
+    mem[addr + 1] ^= 0x01
+    assert d.update(mem, end, labels) == [addr]
+    assert d.lines() == disassemble(mem, end, labels).lines()
+    assert d.update(mem, end, labels) == [] and d.decoded == 0
+
+
+def test_resync_after_size_change():
+    mem, _, end, _ = assemble(["mov A, 01H", "inc A", "inc B", "mov B, 02H", "nop"])
+    d = disassemble(mem, end)
+    mem[0] = 0x00                    # add A, B (1 byte): 01H passa a ser instrução
+    redone = d.update(mem, end)
+    # 01H é add B, A e a varredura volta a cair em 02H (início antigo)
+    assert redone == [0x00, 0x01]
+    assert d.lines() == disassemble(mem, end).lines()
+
+
+def test_random_mutations_match_fresh_sweep():
+    rng = random.Random(20)
+    for path in SAMPLES:
+        mem, _, end, labels = assemble(path.read_text(encoding="utf-8").splitlines())
+        d = disassemble(mem, end, labels)
+        for _ in range(200):
+            for _ in range(rng.randrange(1, 4)):
+                mem[rng.randrange(end)] = rng.choice([rng.randrange(256), 0xFF, 0xA0, 0xB6])
+            d.update(mem, end, labels)
+            fresh = disassemble(mem, end, labels)
+            assert d.lines() == fresh.lines()
+            assert d.source() == fresh.source()
+
+
+def test_self_modifying_program():
+    src = (SAMPLES[0].parent / "powers_of_two.z70").read_text(encoding="utf-8")
+    cpu = make_cpu(src)
+    mem, listing, end, labels = assemble(src.splitlines())
+    d = disassemble(cpu.mem, end, labels)
+    cpu.run()
+    d.update(cpu.memory_view(), end, labels)
+    assert d.lines() != [(a, bs, d.at(a)) for a, bs, _ in listing]
+    assert d.lines() == disassemble(cpu.mem, end, labels).lines()
@@ -55,3 +55,79 @@ def test_editing_code_invalidates_program(app):
     app.load_program()
     app.editor.set_code("mov A, 02H")
     assert app.program_loaded is False
+
+
+def test_gui_run_stops_infinite_loop(app, monkeypatch):
+    warnings = []
+    monkeypatch.setattr("gui.main_window.messagebox.showwarning",
+                        lambda title, msg: warnings.append(msg))
+    app.editor.set_code("""
+    LOOP:
+        inc A
+        jmp LOOP
+    """)
+    app.load_program()
+    app.run_program()
+    assert len(warnings) == 1
+    assert "00H-01H" in warnings[0]
+
+
+def test_gui_step_back(app):
+    app.editor.set_code("""
+        mov A, 01H
+        inc A
+    """)
+    app.load_program()
+    app.step_program()
+    app.step_program()
+    assert app.cpu.A == 2
+    app.step_back_program()
+    assert (app.cpu.A, app.cpu.PC) == (1, 2)
+    app.step_back_program()
+    app.step_back_program()
+    assert (app.cpu.A, app.cpu.PC) == (0, 0)
+
+
+def test_gui_run_stops_at_breakpoint(app, monkeypatch):
+    infos = []
+    monkeypatch.setattr("gui.main_window.messagebox.showinfo",
+                        lambda title, msg: infos.append(msg))
+    app.editor.set_code("mov A, 01H\n// comentário\ninc A\ninc A")
+    app.editor.toggle_breakpoint(4)
+    app.load_program()
+    app.run_program()
+    assert (app.cpu.A, app.cpu.PC) == (2, 3)
+    assert infos == []
+    # Executar de novo continua a partir do breakpoint
+    app.run_program()
+    assert app.cpu.A == 3
+    assert len(infos) == 1
+
+
+def test_gui_reload_only_parses_edited_lines(app):
+    app.editor.set_code("mov A, 01H\ninc A\ninc A")
+    app.load_program()
+    app.editor.set_code("mov A, 02H\ninc A\ninc A")
+    app.load_program()
+    assert app.assembler.parsed == 1
+    assert app.cpu.mem[1] == 0x02
+
+
+def test_gui_shows_instruction_really_at_pc(app):
+    # mov [05H], A troca o operando de "mov B, 10H" por 07H antes de executá-lo
+    app.editor.set_code("mov A, 07H\nmov [05H], A\nmov B, 10H")
+    app.load_program()
+    app.step_program()
+    app.step_program()
+    assert "PC:    04H  mov B, 07H" in app.output.get("1.0", "end")
+
+
+def test_gui_highlights_real_source_line(app):
+    app.editor.set_code("// comentário\n\nSTART:\n    mov A, 01H\n\n    inc A\n")
+    app.load_program()
+    app.step_program()
+    # Antes do 2º passo PC está em inc A, linha 6 do editor
+    app.step_program()
+    assert str(app.editor.text.tag_ranges("current_line")[0]) == "6.0"
+    app.editor.breakpoints.update({4, 6})
+    assert app.breakpoint_addresses() == [0x00, 0x02]
@@ -0,0 +1,156 @@
+import itertools
+
+import pytest
+
+from core.CPU import BUDGET
+from core.hooks import HOOK_KINDS, Hooks, hook_loop, loop_source
+from core.journal import Journal
+from core.result_cache import ResultCache
+
+from test_cpu import SAMPLES, make_cpu, state
+
+COUNTDOWN = """
+    mov A, 03H
+LOOP:
+    dec A
+    jz END
+    jmp LOOP
+END:
+    mov I, 80H
+    mov [I], A
+    mov [81H], A
+"""
+
+
+def reference_pcs(src):
+    """Endereços executados, passo a passo e sem ganchos."""
+    cpu = make_cpu(src)
+    pcs = []
+    while cpu.PC < cpu.program_end:
+        pcs.append(cpu.PC)
+        cpu.step()
+    return pcs
+
+
+# =========================================================
+# EVENTOS
+# =========================================================
+def test_pre_and_post_step_see_every_instruction():
+    cpu = make_cpu(COUNTDOWN)
+    pre, post = [], []
+    cpu.add_hook('pre_step', lambda c, pc: pre.append((pc, c.PC)))
+    cpu.add_hook('post_step', lambda c, pc: post.append((pc, c.PC)))
+    outcome = cpu.run()
+    assert outcome.halted and outcome.steps == len(pre) == len(post)
+    assert all(pc == at for pc, at in pre)
+    assert [pc for pc, _ in post] == [pc for pc, _ in pre]
+    assert [pc for pc, _ in pre] == reference_pcs(COUNTDOWN)
+
+
+def test_mem_write_reports_address_and_value():
+    cpu = make_cpu(COUNTDOWN)
+    writes = []
+    cpu.add_hook('mem_write', lambda c, addr, value: writes.append((addr, value)))
+    cpu.run()
+    assert writes == [(0x80, 0), (0x81, 0)]
+
+
+def test_branch_reports_taken_and_not_taken():
+    cpu = make_cpu(COUNTDOWN)
+    branches = []
+    cpu.add_hook('branch', lambda c, pc, target, taken: branches.append((pc, target, taken)))
+    cpu.run()
+    # jz (03H) não toma duas vezes, jmp (05H) volta duas vezes, jz toma na última
+    assert branches == [
+        (0x03, 0x07, False), (0x05, 0x02, True),
+        (0x03, 0x07, False), (0x05, 0x02, True),
+        (0x03, 0x07, True),
+    ]
+
+
+def test_several_hooks_of_same_kind_and_remove():
+    cpu = make_cpu(COUNTDOWN)
+    a, b = [], []
+    fa = lambda c, pc: a.append(pc)
+    cpu.add_hook('pre_step', fa)
+    cpu.add_hook('pre_step', lambda c, pc: b.append(pc))
+    cpu.run(max_steps=3)
+    assert a == b and len(a) == 3
+    cpu.remove_hook('pre_step', fa)
+    cpu.run()
+    assert len(a) == 3 and len(b) > 3
+
+
+def test_step_calls_hooks():
+    cpu = make_cpu(COUNTDOWN)
+    seen = []
+    cpu.add_hook('post_step', lambda c, pc: seen.append(pc))
+    cpu.step()
+    cpu.step()
+    assert seen == [0x00, 0x02]
+
+
+def test_invalid_kind():
+    with pytest.raises(ValueError):
+        Hooks().add('on_read', print)
+
+
+# =========================================================
+# LAÇOS ESPECIALIZADOS
+# =========================================================
+def test_loop_contains_only_used_kinds():
+    plain = loop_source(frozenset())
+    assert "pre(" not in plain and "MEM_DST" not in plain and "JUMPS" not in plain
+    assert "write(" in loop_source({'mem_write'}) and "branch(" not in loop_source({'mem_write'})
+
+
+@pytest.mark.parametrize("n", range(len(HOOK_KINDS) + 1))
+def test_every_combination_matches_plain_run(n):
+    for kinds in itertools.combinations(HOOK_KINDS, n):
+        for path in SAMPLES:
+            src = path.read_text(encoding="utf-8")
+            plain = make_cpu(src)
+            plain.run()
+            cpu = make_cpu(src)
+            for kind in kinds:
+                cpu.add_hook(kind, lambda *args: None)
+            assert cpu.run().halted
+            assert state(cpu) == state(plain), (kinds, path.name)
+
+
+def test_loops_are_cached():
+    assert hook_loop({'branch'}) is hook_loop(frozenset({'branch'}))
+    assert hook_loop({'branch'}) is not hook_loop({'branch'}, hooked=True)
+
+
+# =========================================================
+# INTEGRAÇÃO
+# =========================================================
+def test_hooks_with_journal_and_budget():
+    cpu = make_cpu(COUNTDOWN)
+    journal = Journal(cpu)
+    seen = []
+    cpu.add_hook('pre_step', lambda c, pc: seen.append(pc))
+    outcome = cpu.run(max_steps=4)
+    assert (outcome.status, outcome.steps) == (BUDGET, 4)
+    assert len(seen) == journal.pos == 4
+
+
+def test_hooks_reject_loop_detection_and_breakpoints():
+    cpu = make_cpu(COUNTDOWN)
+    cpu.add_hook('pre_step', lambda c, pc: None)
+    with pytest.raises(ValueError):
+        cpu.run(detect_loops=True)
+    cpu.add_breakpoint(0x02)
+    with pytest.raises(ValueError):
+        cpu.run()
+
+
+def test_result_cache_runs_with_hooks(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.run(make_cpu(COUNTDOWN))
+    cpu = make_cpu(COUNTDOWN)
+    seen = []
+    cpu.add_hook('pre_step', lambda c, pc: seen.append(pc))
+    assert not cache.run(cpu).cached
+    assert seen
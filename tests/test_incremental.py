@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from core.assembler import preprocess, first_pass, second_pass, source_map
+from core.incremental import IncrementalAssembler
+
+from test_cpu import SAMPLES
+
+PROGRAM = """\
+    mov A, 05H
+LOOP:
+    dec A
+    jz END
+    jmp LOOP
+END:
+    mov [80H], A
+"""
+
+
+def full(lines):
+    parsed, labels = first_pass(preprocess(lines))
+    mem, listing, code_end = second_pass(parsed, labels)
+    return mem, listing, code_end, labels
+
+
+def check(asm, lines):
+    """Monta pelos dois caminhos e compara resultado (ou erro)."""
+    try:
+        expected = full(lines)
+    except Exception as e:
+        with pytest.raises(type(e)) as info:
+            asm.assemble(lines)
+        assert str(info.value) == str(e)
+        return None
+    mem, listing, code_end, changed = asm.assemble(lines)
+    assert (mem, listing, code_end, asm.labels) == expected
+    smap = source_map(lines, listing)
+    assert (asm.source_map.line_at, asm.source_map.addr_at) == (smap.line_at, smap.addr_at)
+    return changed
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_matches_full_assemble(path):
+    lines = path.read_text(encoding="utf-8").splitlines()
+    asm = IncrementalAssembler()
+    assert check(asm, lines) == list(range(256))
+    # Segunda montagem idêntica: nada analisado, codificado ou alterado
+    assert check(asm, lines) == []
+    assert (asm.parsed, asm.encoded) == (0, 0)
+
+
+def test_only_edited_line_is_parsed_and_encoded():
+    lines = PROGRAM.splitlines()
+    asm = IncrementalAssembler()
+    check(asm, lines)
+    lines[6] = "    mov [81H], A"
+    changed = check(asm, lines)
+    assert (asm.parsed, asm.encoded) == (1, 1)
+    assert changed == [0x08]
+
+
+def test_size_change_moves_labels_and_reencodes_jumps():
+    lines = PROGRAM.splitlines()
+    asm = IncrementalAssembler()
+    check(asm, lines)
+    # mov A, 05H (2 bytes) -> mov A, B (1 byte): tudo depois se desloca
+    lines[0] = "    mov A, B"
+    check(asm, lines)
+    # A própria linha e os dois saltos (destinos mudaram)
+    assert asm.encoded == 3
+    assert asm.labels == {'LOOP': 0x01, 'END': 0x06}
+
+
+def test_changed_addresses_are_the_byte_delta():
+    lines = PROGRAM.splitlines()
+    asm = IncrementalAssembler()
+    check(asm, lines)
+    before = full(lines)[0]
+    lines.insert(1, "    nop")
+    changed = check(asm, lines)
+    after = full(lines)[0]
+    assert changed == [a for a in range(256) if before[a] != after[a]]
+
+
+def test_errors_match_and_recover():
+    lines = PROGRAM.splitlines()
+    asm = IncrementalAssembler()
+    check(asm, lines)
+    for bad in ("    jmp NOWHERE", "    mov [I], [I]", "LOOP:", "    foo A"):
+        check(asm, lines[:3] + [bad] + lines[3:])
+    assert check(asm, lines) == list(range(256))
+
+
+def test_random_edits_match_full_assemble():
+    rng = random.Random(7)
+    pool = [
+        "", "// comentário", "    nop", "    mov A, FFH", "    mov [I], A", "    shl A",
+        "    add A, [90H]", "    inc I", "    jmp LOOP", "    jz END", "    cmp A, 03H",
+    ]
+    lines = PROGRAM.splitlines()
+    asm = IncrementalAssembler()
+    errors = 0
+    for _ in range(300):
+        # Rótulos ficam; às vezes entra uma linha inválida
+        editable = [k for k, ln in enumerate(lines) if ':' not in ln]
+        op = rng.random()
+        new = "    jmp NOWHERE" if rng.random() < 0.05 else rng.choice(pool)
+        if op < 0.4 or not editable:
+            lines.insert(rng.randrange(len(lines) + 1), new)
+        elif op < 0.7:
+            del lines[rng.choice(editable)]
+        else:
+            lines[rng.choice(editable)] = new
+        if check(asm, lines) is None:
+            errors += 1
+            lines = [ln for ln in lines if "NOWHERE" not in ln]
+    assert errors < 50
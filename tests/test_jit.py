@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from core.CPU import CPU
+from core.jit import BlockJIT
+
+from test_cpu import SAMPLES, make_cpu, state, random_program
+
+NESTED_LOOPS = """
+    mov B, 20H
+OUTER:
+    mov A, 30H
+INNER:
+    dec A
+    jz NEXT
+    jmp INNER
+NEXT:
+    dec B
+    jz END
+    jmp OUTER
+END:
+    nop
+"""
+
+
+def run_jit(cpu):
+    BlockJIT(cpu).run()
+    return cpu
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_jit_matches_interpreter_on_samples(path):
+    src = path.read_text(encoding="utf-8")
+    ref = make_cpu(src)
+    ref.run()
+    assert state(run_jit(make_cpu(src))) == state(ref)
+
+
+def test_jit_nested_loops():
+    ref = make_cpu(NESTED_LOOPS)
+    ref.run()
+    jit = run_jit(make_cpu(NESTED_LOOPS))
+    assert state(jit) == state(ref)
+    assert jit.FLAGS == ref.FLAGS
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_jit_random_programs(seed):
+    rng = random.Random(seed)
+    mem, end = random_program(rng)
+    results = []
+    for engine in ("interp", "jit"):
+        cpu = CPU(mem, {})
+        cpu.program_end = end
+        cpu.I = 0xC0
+        error = None
+        try:
+            cpu.run() if engine == "interp" else run_jit(cpu)
+        except ValueError as e:
+            error = str(e)
+        results.append((state(cpu), error))
+    assert results[0] == results[1]
+
+
+def test_jit_self_modifying_block():
+    src = """
+        mov B, 00H
+    LOOP:
+        add B, 01H
+        inc I
+        mov A, 05H
+        mov [03H], A
+        cmp B, 0BH
+        jz END
+        jmp LOOP
+    END:
+        nop
+    """
+    cpu = run_jit(make_cpu(src))
+    assert cpu.B == 0x0B
+    assert cpu.I == 0x03
+
+
+def test_jit_loop_keeps_carry_across_iterations():
+    src = """
+        mov A, 01H
+        shr A
+        mov B, 03H
+    LOOP:
+        dec B
+        jz END
+        jmp LOOP
+    END:
+        nop
+    """
+    ref = make_cpu(src)
+    ref.run()
+    jit = run_jit(make_cpu(src))
+    assert jit.FLAGS == ref.FLAGS
+    assert jit.get_flag('CF') == 1
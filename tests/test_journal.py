@@ -0,0 +1,197 @@
+import random
+
+import pytest
+
+from core.CPU import CPU, HALTED
+from core.devices import Bus, ConsoleDevice, InputDevice
+from core.journal import Journal
+
+from test_cpu import SAMPLES, make_cpu, random_program
+
+
+def full_state(cpu):
+    return cpu.A, cpu.B, cpu.I, cpu.FLAGS, cpu.PC, bytes(cpu.mem)
+
+
+def record_states(cpu, limit=100000):
+    """Estados depois de cada passo (índice 0 = estado inicial)."""
+    states = [full_state(cpu)]
+    while cpu.PC < cpu.program_end and len(states) <= limit:
+        cpu.step()
+        states.append(full_state(cpu))
+    return states
+
+
+LOOP = """
+    mov I, 80H
+    mov B, 00H
+LOOP:
+    mov A, B
+    add [I], A
+    inc B
+    inc I
+    cmp I, C0H
+    jz END
+    jmp LOOP
+END:
+    nop
+"""
+
+
+def test_step_back_restores_every_state():
+    ref = record_states(make_cpu(LOOP))
+    cpu = make_cpu(LOOP)
+    journal = Journal(cpu, snapshot_every=16)
+    cpu.run()
+    assert journal.pos == journal.head == len(ref) - 1
+    for i in range(len(ref) - 1, 0, -1):
+        assert full_state(cpu) == ref[i]
+        assert journal.step_back() == 1
+    assert full_state(cpu) == ref[0]
+    assert journal.step_back() == 0
+
+
+def test_seek_anywhere_and_redo():
+    ref = record_states(make_cpu(LOOP))
+    cpu = make_cpu(LOOP)
+    journal = Journal(cpu, snapshot_every=8)
+    cpu.run()
+    rng = random.Random(3)
+    for _ in range(200):
+        i = rng.randrange(len(ref))
+        journal.seek(i)
+        assert journal.pos == i
+        assert full_state(cpu) == ref[i]
+    # Executar depois de voltar refaz o mesmo caminho
+    journal.seek(10)
+    assert cpu.run().status == HALTED
+    assert full_state(cpu) == ref[-1]
+    assert journal.head == len(ref) - 1
+
+
+def test_ring_is_bounded():
+    ref = record_states(make_cpu(LOOP))
+    cpu = make_cpu(LOOP)
+    journal = Journal(cpu, ring=50, snapshot_every=16)
+    cpu.run()
+    end = len(ref) - 1
+    assert journal.first == end - 50
+    assert len(journal._entries) == 50
+    assert all(s >= journal.first for s in journal._snapshots)
+    journal.seek(journal.first)
+    assert full_state(cpu) == ref[journal.first]
+    with pytest.raises(ValueError):
+        journal.seek(journal.first - 1)
+    assert journal.step_back(10) == 0
+    journal.seek(end)
+    assert full_state(cpu) == ref[end]
+
+
+def test_self_modifying_code_step_back():
+    src = """
+        mov B, 00H
+    LOOP:
+        add B, 01H
+        mov A, 05H
+        mov [03H], A
+        cmp B, 0BH
+        jz END
+        jmp LOOP
+    END:
+        nop
+    """
+    ref = record_states(make_cpu(src))
+    cpu = make_cpu(src)
+    journal = Journal(cpu, snapshot_every=4)
+    cpu.run()
+    for i in (0, 5, 17, 3, len(ref) - 1, 1):
+        journal.seek(i)
+        assert full_state(cpu) == ref[i]
+        # o cache de decodificação acompanha a memória restaurada
+        cpu.run()
+        assert full_state(cpu) == ref[-1]
+
+
+def test_truncate_after_external_change():
+    cpu = make_cpu(LOOP)
+    journal = Journal(cpu)
+    cpu.run()
+    journal.seek(20)
+    journal.truncate()
+    assert journal.head == 20
+    cpu.B = 0x40
+    cpu.run()
+    journal.seek(20)
+    assert cpu.B == 0x40
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_programs(seed):
+    rng = random.Random(seed)
+    mem, end = random_program(rng)
+
+    def new_cpu():
+        cpu = CPU(mem, {})
+        cpu.program_end = end
+        cpu.I = 0xC0
+        return cpu
+
+    ref = new_cpu()
+    try:
+        states = record_states(ref)
+    except ValueError:
+        pytest.skip("programa inválido")
+    cpu = new_cpu()
+    journal = Journal(cpu, ring=len(states), snapshot_every=5)
+    cpu.run()
+    for i in rng.sample(range(len(states)), min(len(states), 30)):
+        journal.seek(i)
+        assert full_state(cpu) == states[i]
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_samples_rewind_to_start(path):
+    src = path.read_text(encoding="utf-8")
+    cpu = make_cpu(src)
+    start = full_state(cpu)
+    journal = Journal(cpu, snapshot_every=32)
+    cpu.run()
+    journal.seek(0)
+    assert full_state(cpu) == start
+
+
+# =========================================================
+# DISPOSITIVOS
+# =========================================================
+ECHO = """
+LOOP:
+    mov A, [F0H]
+    cmp A, 00H
+    jz END
+    mov [80H], A
+    jmp LOOP
+END:
+    nop
+"""
+
+
+def test_device_io_is_not_repeated():
+    out = []
+    bus = Bus()
+    bus.map(0x80, 0x80, ConsoleDevice(out.append))
+    bus.map(0xF0, 0xF0, InputDevice(b"abc"))
+    cpu = make_cpu(ECHO, bus=bus)
+    journal = Journal(cpu, snapshot_every=4)
+    cpu.run()
+    assert "".join(out) == "abc"
+    head = journal.head
+    journal.seek(4)
+    with pytest.raises(ValueError, match="seek forward"):
+        journal.seek(head)
+    assert "".join(out) == "abc"
+    # Executar de novo depois de voltar é E/S nova: o futuro gravado é descartado
+    assert journal.head == head
+    cpu.step()
+    assert journal.pos == journal.head == 5
+    journal.seek(0)
+    assert cpu.PC == 0 and cpu.A == 0
@@ -0,0 +1,169 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.assembler import assemble, instruction_lines, source_map
+from core.objfile import BuildCache, build, dumps, loads, is_object, MAGIC, VERSION
+
+from test_cpu import SAMPLES
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return BuildCache(str(tmp_path / "objects"))
+
+
+def same_program(a, b):
+    return ((a.mem, a.program_end, a.labels, a.listing, a.lines, a.source_hash)
+            == (b.mem, b.program_end, b.labels, b.listing, b.lines, b.source_hash))
+
+
+# =========================================================
+# FORMATO
+# =========================================================
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_roundtrip(path):
+    text = path.read_text(encoding="utf-8")
+    prog = build(text)
+    assert (prog.mem, prog.listing, prog.program_end, prog.labels) == assemble(text.splitlines())
+    data = dumps(prog)
+    assert is_object(data)
+    assert same_program(loads(data), prog)
+
+
+def test_source_map_points_at_instruction_lines():
+    text = "// início\nSTART:\n    mov A, 01H  // um\n\nEND: inc A\n"
+    prog = build(text)
+    assert prog.lines == [2, 4]
+    lines = text.splitlines()
+    assert [lines[n].strip() for n in prog.lines] == ["mov A, 01H  // um", "END: inc A"]
+
+
+def test_program_source_map():
+    text = SAMPLES[0].read_text(encoding="utf-8")
+    prog = loads(dumps(build(text)))
+    expected = source_map(text.splitlines(), prog.listing)
+    assert prog.source_map().line_at == expected.line_at
+
+
+def test_instruction_lines_follow_listing():
+    for path in SAMPLES:
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(instruction_lines(lines)) == len(assemble(lines)[1])
+
+
+@pytest.mark.parametrize("mutate, message", [
+    (lambda d: b"Z70RES1\n" + d[8:], "Not a Z70 object file"),
+    (lambda d: MAGIC + bytes([VERSION + 1]) + d[len(MAGIC) + 1:], "Unsupported object version"),
+    (lambda d: d[:-3], "Truncated object file"),
+    (lambda d: d[:100], "Truncated object file"),
+    (lambda d: d + b"\0", "Trailing data"),
+])
+def test_bad_objects(mutate, message):
+    data = dumps(build("L: mov A, 01H\njmp L"))
+    with pytest.raises(ValueError, match=message):
+        loads(mutate(data))
+
+
+def test_long_label_roundtrip():
+    name = "L" * 300
+    prog = build(f"{name}: inc A\njmp {name}")
+    assert same_program(loads(dumps(prog)), prog)
+
+
+def test_version_1_objects_still_load():
+    # Sem rótulos, a versão 1 só difere no byte de versão
+    prog = build("mov A, 01H\ninc A")
+    data = dumps(prog)
+    assert same_program(loads(MAGIC + bytes([1]) + data[len(MAGIC) + 1:]), prog)
+
+
+# =========================================================
+# CACHE DE MONTAGEM
+# =========================================================
+def test_cache_hit_skips_assembly(cache, monkeypatch):
+    text = SAMPLES[0].read_text(encoding="utf-8")
+    first = cache.build(text)
+    monkeypatch.setattr("core.objfile.assemble", None)
+    second = cache.build(text)
+    assert same_program(first, second)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_changed_source_is_a_miss(cache):
+    cache.build("mov A, 01H")
+    prog = cache.build("mov A, 02H")
+    assert prog.mem[:2] == [0xB6, 0x02]
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_corrupt_entry_is_rebuilt(cache):
+    cache.build("mov A, 07H")
+    with open(cache._path(cache.key("mov A, 07H")), "wb") as f:
+        f.write(MAGIC + b"garbage")
+    assert cache.build("mov A, 07H").mem[:2] == [0xB6, 0x07]
+    assert cache.misses == 2
+
+
+def test_errors_are_not_cached(cache):
+    with pytest.raises(ValueError, match="Unknown label"):
+        cache.build("jmp NOWHERE")
+    assert not os.path.exists(cache.directory) or not os.listdir(cache.directory)
+
+
+def test_long_label_is_cached(cache):
+    text = f"{'L' * 300}: inc A"
+    cache.build(text)
+    assert cache.build(text).labels == {"L" * 300: 0}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not [n for n in os.listdir(cache.directory) if n.endswith(".tmp")]
+
+
+def test_unserializable_program_is_not_cached(cache, monkeypatch):
+    def too_big(prog):
+        raise ValueError("Label too long for object file")
+    monkeypatch.setattr("core.objfile.dumps", too_big)
+    assert cache.build("mov A, 05H").mem[:2] == [0xB6, 0x05]
+    assert not os.path.exists(cache.directory) or not os.listdir(cache.directory)
+
+
+def test_eviction(tmp_path):
+    cache = BuildCache(str(tmp_path / "objects"), max_bytes=1, evict_every=1)
+    for n in range(3):
+        cache.build(f"mov A, {n:02X}H")
+    assert len(os.listdir(cache.directory)) <= 1
+
+
+# =========================================================
+# CLI
+# =========================================================
+def run_cli(*args, env=None):
+    result = subprocess.run([sys.executable, "Z70.py", *map(str, args)],
+                            capture_output=True, text=True, cwd=ROOT, env=env)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_cli_runs_object_like_source(tmp_path):
+    env = dict(os.environ, Z70_CACHE_DIR=str(tmp_path / "cache"))
+    src = ROOT / "code_samples" / "hello_world.z70"
+    obj = tmp_path / "hello.z70o"
+    assert "Wrote" in run_cli(src, "--emit", obj, env=env)
+    from_src = run_cli(src, "80H-8FH", tmp_path / "a.txt", env=env)
+    from_obj = run_cli(obj, "80H-8FH", tmp_path / "b.txt", env=env)
+    assert from_src.replace("a.txt", "b.txt") == from_obj
+    assert (tmp_path / "a.txt").read_text() == (tmp_path / "b.txt").read_text()
+
+
+def test_cli_uses_build_cache(tmp_path):
+    env = dict(os.environ, Z70_CACHE_DIR=str(tmp_path / "cache"))
+    src = tmp_path / "p.z70"
+    src.write_text("mov A, 2AH\nmov [80H], A", encoding="utf-8")
+    for _ in range(2):
+        assert "80H:2AH" in run_cli(src, "80H-80H", env=env)
+    assert len(os.listdir(tmp_path / "cache" / "objects")) == 1
@@ -0,0 +1,138 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.arch import DECODE_TABLE, JUMP_MASKS
+from core.codegen import MEM_DST, MEM_SRC
+from core.journal import Journal
+from core.perf import CycleModel, DEFAULT_MODEL, PerfCounters, pack, unpack
+
+from test_cpu import SAMPLES, make_cpu
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def expected_counters(src, model=DEFAULT_MODEL):
+    """Contadores esperados, somados passo a passo pelo byte executado."""
+    cpu = make_cpu(src)
+    c = dict.fromkeys(('instructions', 'cycles', 'reads', 'writes', 'branches', 'taken'), 0)
+    while cpu.PC < cpu.program_end:
+        op = cpu.mem[cpu.PC]
+        c['instructions'] += 1
+        c['cycles'] += model.table[op]
+        c['reads'] += bool(MEM_SRC[op])
+        c['writes'] += bool(MEM_DST[op])
+        if op in JUMP_MASKS:
+            c['branches'] += 1
+            c['taken'] += not JUMP_MASKS[op] or bool(cpu.FLAGS & JUMP_MASKS[op])
+        cpu.step()
+    return c
+
+
+def counters_dict(cpu):
+    c = cpu.counters()
+    return {name: getattr(c, name)
+            for name in ('instructions', 'cycles', 'reads', 'writes', 'branches', 'taken')}
+
+
+# =========================================================
+# CONTADORES
+# =========================================================
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+@pytest.mark.parametrize("mode", ["run", "limited", "step", "lazy"])
+def test_counters_match_reference(path, mode):
+    src = path.read_text(encoding="utf-8")
+    cpu = make_cpu(src, lazy_flags=(mode == "lazy"))
+    if mode == "limited":
+        cpu.run(max_steps=10 ** 6)
+    elif mode == "step":
+        while cpu.PC < cpu.program_end:
+            cpu.step()
+    else:
+        cpu.run()
+    assert counters_dict(cpu) == expected_counters(src)
+
+
+def test_not_taken_and_report():
+    src = (ROOT / "code_samples" / "powers_of_two.z70").read_text(encoding="utf-8")
+    cpu = make_cpu(src)
+    cpu.run()
+    c = cpu.counters()
+    assert c.taken + c.not_taken == c.branches
+    assert c.host_seconds > 0 and c.ips > 0
+    assert f"{c.instructions} instructions" in c.report()
+    assert c.as_dict()['not_taken'] == c.not_taken
+
+
+def test_reset_counters():
+    cpu = make_cpu("mov A, 01H\nmov [80H], A")
+    cpu.run()
+    assert cpu.counters().writes == 1
+    cpu.reset_counters()
+    assert counters_dict(cpu) == dict.fromkeys(counters_dict(cpu), 0)
+
+
+def test_journal_and_hooks_count_too():
+    src = (ROOT / "code_samples" / "store_bits.z70").read_text(encoding="utf-8")
+    expected = expected_counters(src)
+    cpu = make_cpu(src)
+    Journal(cpu)
+    cpu.run()
+    assert counters_dict(cpu) == expected
+    cpu = make_cpu(src)
+    cpu.add_hook('post_step', lambda c, pc: None)
+    cpu.run()
+    assert counters_dict(cpu) == expected
+
+
+# =========================================================
+# MODELO DE CICLOS
+# =========================================================
+def test_default_costs_follow_addressing_modes():
+    t = DEFAULT_MODEL.table
+    # add A, B / add A, [I] / add A, [xx] / jmp / nop
+    assert (t[0x00], t[0x04], t[0x0A], t[0xA0], t[0xFF]) == (1, 2, 3, 3, 1)
+    assert all(t[b] == 0 for b in range(256) if DECODE_TABLE[b] is None)
+
+
+def test_custom_cycle_model():
+    src = (ROOT / "code_samples" / "even_and_odd.z70").read_text(encoding="utf-8")
+    model = CycleModel(base={'mov': 4}, operands={'dir': 10})
+    cpu = make_cpu(src, cycle_model=model)
+    cpu.run()
+    assert cpu.counters().cycles == expected_counters(src, model)['cycles']
+    assert cpu.counters().cycles != expected_counters(src)['cycles']
+
+
+def test_set_cycle_model_applies_to_new_instructions():
+    cpu = make_cpu("mov A, 01H\nmov B, 02H")
+    cpu.step()
+    cpu.set_cycle_model(CycleModel(base={'mov': 10}))
+    cpu.step()
+    assert cpu.counters().cycles == 2 + 11
+
+
+def test_invalid_cost():
+    with pytest.raises(ValueError):
+        CycleModel(operands={'dir': -1})
+
+
+def test_pack_roundtrip():
+    assert unpack(pack(1, 2, 3, 4, 5)) == (1, 2, 3, 4, 5)
+    c = PerfCounters(pack(10, 20, 1, 2, 4), taken=3)
+    assert (c.instructions, c.cycles, c.not_taken) == (10, 20, 1)
+
+
+# =========================================================
+# CLI
+# =========================================================
+def test_cli_stats():
+    result = subprocess.run(
+        [sys.executable, "Z70.py", "code_samples/powers_of_two.z70", "--stats"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    assert result.returncode == 0
+    assert "STATS: 1282 instructions" in result.stdout
+    assert "taken 256, not taken 255" in result.stdout
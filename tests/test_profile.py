@@ -0,0 +1,99 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.assembler import preprocess, first_pass, second_pass
+from core.profile import Profile
+from core.CPU import HALTED, BUDGET
+
+from test_cpu import SAMPLES, make_cpu, state
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SRC = """
+    mov I, 80H
+    mov B, 04H
+LOOP:
+    mov A, [90H]
+    add [I], A
+    dec B
+    jz END
+    jmp LOOP
+END:
+    nop
+"""
+
+
+def listing_of(src):
+    parsed, labels = first_pass(preprocess(src.splitlines()))
+    return second_pass(parsed, labels)[1]
+
+
+def test_counts_and_jumps():
+    cpu = make_cpu(SRC)
+    profile = Profile()
+    outcome = cpu.run(profile=profile)
+    assert outcome.status == HALTED
+    # mov I (00H), mov B (02H), laço em 04H..0AH, nop em 0CH
+    assert profile.counts[0x00] == 1
+    assert profile.counts[0x04] == 4
+    assert profile.counts[0x08] == 4
+    assert profile.counts[0x0A] == 3
+    assert (profile.taken[0x08], profile.not_taken[0x08]) == (1, 3)
+    assert profile.steps == outcome.steps == 2 + 4 * 4 + 3 + 1
+    assert profile.reads[0x90] == 4
+    assert (profile.reads[0x80], profile.writes[0x80]) == (4, 4)
+    assert sum(profile.writes) == 4
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_profiled_run_matches_plain_run(path):
+    src = path.read_text(encoding="utf-8")
+    plain = make_cpu(src)
+    plain.run()
+    profiled = make_cpu(src)
+    profile = Profile()
+    profiled.run(profile=profile)
+    assert state(profiled) == state(plain)
+
+    counted = make_cpu(src)
+    expected = [0] * 256
+    while counted.PC < counted.program_end:
+        expected[counted.PC] += 1
+        counted.step()
+    assert list(profile.counts) == expected
+
+
+def test_profile_budget_and_exclusive_loops():
+    cpu = make_cpu("L: inc A\njmp L")
+    profile = Profile()
+    assert cpu.run(max_steps=10, profile=profile).status == BUDGET
+    assert profile.counts[0] == 5 and profile.counts[1] == 5
+    with pytest.raises(ValueError):
+        cpu.run(detect_loops=True, profile=profile)
+
+
+def test_hotspot_report():
+    cpu = make_cpu(SRC)
+    profile = Profile()
+    cpu.run(profile=profile)
+    listing = listing_of(SRC)
+    hot = profile.hotspots(listing, top=3)
+    assert [n for _, n, _ in hot] == [4, 4, 4]
+    assert hot[0][2] == "mov A, [90H]"
+    report = profile.report(listing)
+    assert "jz END  (taken 1, not taken 3)" in report
+    assert "90H" in report
+
+
+def test_cli_profile():
+    path = ROOT / "code_samples" / "even_and_odd.z70"
+    result = subprocess.run(
+        [sys.executable, "Z70.py", str(path), "--profile"],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "PROFILE: " in result.stdout
+    assert "MEMORY:" in result.stdout
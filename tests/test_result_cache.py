@@ -0,0 +1,162 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from core.api import run_source
+from core.journal import Journal
+from core.result_cache import ResultCache, state_key, RESULT_SIZE
+from core.CPU import HALTED, BUDGET, LOOP
+
+from test_cpu import SAMPLES, make_cpu, state
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "results"))
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_hit_gives_same_final_state(cache, path):
+    src = path.read_text(encoding="utf-8")
+    first = make_cpu(src)
+    outcome = cache.run(first)
+    assert outcome.halted and not outcome.cached
+
+    second = make_cpu(src)
+    outcome = cache.run(second)
+    assert outcome.status == HALTED and outcome.cached
+    assert state(second) == state(first)
+    assert second.FLAGS == first.FLAGS
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_full_memory_program_halting_at_100h(cache):
+    src = "\n".join(["mov A, FFH"] * 128)
+    first = make_cpu(src)
+    assert cache.run(first).halted and first.PC == 0x100
+    second = make_cpu(src)
+    outcome = cache.run(second)
+    assert outcome.cached and outcome.steps == 128
+    assert state(second) == state(first)
+
+
+def test_hit_reports_the_same_steps(cache):
+    src = (ROOT / "code_samples" / "hello_world.z70").read_text(encoding="utf-8")
+    cold = run_source(src, cache=cache)
+    warm = run_source(src, cache=cache)
+    assert not cold.outcome.cached and warm.outcome.cached
+    assert cold.steps == warm.steps == cold.outcome.steps == warm.outcome.steps == 35
+
+
+def test_key_depends_on_image_end_and_registers():
+    cpu = make_cpu("mov A, 01H")
+    keys = {state_key(cpu)}
+    cpu.B = 1
+    keys.add(state_key(cpu))
+    cpu.program_end += 1
+    keys.add(state_key(cpu))
+    cpu.mem[0xF0] = 1
+    keys.add(state_key(cpu))
+    assert len(keys) == 4
+
+
+def test_limits_and_loops_are_not_cached(cache):
+    src = "L: inc A\njmp L"
+    assert cache.run(make_cpu(src), max_steps=10).status == BUDGET
+    assert cache.run(make_cpu(src), detect_loops=True).status == LOOP
+    assert not os.path.exists(cache.directory) or not os.listdir(cache.directory)
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "results"), max_bytes=3 * RESULT_SIZE, evict_every=1)
+    keys = []
+    for n in range(3):
+        cpu = make_cpu(f"mov A, {n:02X}H")
+        keys.append(state_key(cpu))
+        cache.run(cpu)
+    # usa o primeiro, então o segundo é o mais antigo
+    old = time.time() - 100
+    for k, key in enumerate(keys):
+        os.utime(cache._path(key), (old + k, old + k))
+    assert cache.get(keys[0]) is not None
+    cache.run(make_cpu("mov A, 10H"))
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+def test_writes_do_not_rescan_the_directory(tmp_path):
+    directory = str(tmp_path / "results")
+    cache = ResultCache(directory, evict_every=1)
+    for n in range(40):
+        cache.run(make_cpu(f"mov A, {n:02X}H"))
+    # Uma varredura na primeira gravação; depois só a estimativa de tamanho
+    assert cache.scans == 1 and cache.misses == 40
+    # Processos novos (sem estimativa) varrem em uma gravação a cada evict_every
+    scans = 0
+    for n in range(256):
+        fresh = ResultCache(directory, evict_every=8)
+        fresh.run(make_cpu(f"mov B, {n:02X}H"))
+        scans += fresh.scans
+    assert 8 <= scans <= 64
+
+
+def test_estimate_triggers_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "results"), max_bytes=10 * RESULT_SIZE, evict_every=1)
+    for n in range(25):
+        cache.run(make_cpu(f"mov A, {n:02X}H"))
+    assert len(os.listdir(cache.directory)) <= 10
+    assert cache.scans < 25
+
+
+def test_key_with_pc_past_the_end(cache):
+    src = "\n".join(["mov A, FFH"] * 128)
+    cpu = make_cpu(src)
+    assert cache.run(cpu).halted and cpu.PC == 0x100
+    # Rodar de novo uma CPU que já terminou (ex.: Run na GUI depois do fim)
+    key = state_key(cpu)
+    assert key != state_key(make_cpu(src))
+    outcome = cache.run(cpu)
+    assert outcome.halted and cpu.PC == 0x100
+
+
+def test_corrupt_entry_is_a_miss(cache):
+    cpu = make_cpu("mov A, 07H")
+    key = state_key(cpu)
+    cache.run(cpu)
+    with open(cache._path(key), "wb") as f:
+        f.write(b"garbage")
+    again = make_cpu("mov A, 07H")
+    assert not cache.run(again).cached
+    assert again.A == 7
+
+
+def test_hit_resets_journal(cache):
+    src = "mov A, 01H\ninc A"
+    cache.run(make_cpu(src))
+    cpu = make_cpu(src)
+    journal = Journal(cpu)
+    assert cache.run(cpu).cached
+    assert cpu.A == 2
+    assert journal.step_back() == 0
+
+
+def test_cli_uses_cache(tmp_path):
+    src = tmp_path / "p.z70"
+    src.write_text("mov A, 2AH\nmov [80H], A", encoding="utf-8")
+    env = dict(os.environ, Z70_CACHE_DIR=str(tmp_path / "cache"))
+    outs = []
+    for _ in range(2):
+        result = subprocess.run([sys.executable, "Z70.py", str(src), "80H-80H"],
+                                capture_output=True, text=True, cwd=ROOT, env=env)
+        assert result.returncode == 0, result.stderr
+        outs.append(result.stdout)
+    assert outs[0] == outs[1]
+    assert "80H:2AH" in outs[0]
+    assert len(os.listdir(tmp_path / "cache" / "results")) == 1
@@ -0,0 +1,200 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from core.server import Server, remove_socket, PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INVALID_PARAMS, APP_ERROR
+
+from test_cpu import SAMPLES, make_cpu
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PROGRAM = "mov A, 05H\nL: dec A\njz E\njmp L\nE: mov [80H], A"
+
+
+def request(method, rid=1, **params):
+    return json.dumps({'jsonrpc': '2.0', 'id': rid, 'method': method, 'params': params})
+
+
+def call(server, method, **params):
+    response = json.loads(server.handle_line(request(method, **params)))
+    if 'error' in response:
+        return response['error']
+    return response['result']
+
+
+@pytest.fixture
+def server():
+    return Server()
+
+
+# =========================================================
+# MÉTODOS
+# =========================================================
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_run_matches_cpu(server, path):
+    src = path.read_text(encoding="utf-8")
+    cpu = make_cpu(src)
+    cpu.run()
+    result = call(server, 'run', source=src, dump=[0x80, 0x8F])
+    assert result['status'] == 'halted'
+    assert result['regs'] == {'A': cpu.A, 'B': cpu.B, 'I': cpu.I, 'PC': cpu.PC}
+    assert result['dump'] == list(cpu.mem[0x80:0x90])
+    assert result['steps'] == cpu.counters().instructions
+
+
+LOOP = "L: inc A\njmp L"
+
+
+def test_non_halting_program_hits_the_default_timeout():
+    server = Server(timeout=0.05)
+    result = call(server, 'run', source=LOOP)
+    assert result['status'] == 'timeout' and result['steps'] > 0
+    # Pedir mais tempo que o limite do servidor não adianta
+    assert call(server, 'run', timeout=3600)['status'] == 'timeout'
+
+
+def test_server_step_budget_caps_requests():
+    server = Server(max_steps=100)
+    result = call(server, 'run', source=LOOP)
+    assert (result['status'], result['steps']) == ('budget', 100)
+    result = call(server, 'run', max_steps=10 ** 9)
+    assert (result['status'], result['steps']) == ('budget', 100)
+    result = call(server, 'step', count=7)
+    assert (result['status'], result['steps']) == ('budget', 7)
+
+
+def test_step_reset_and_dump(server):
+    assert call(server, 'assemble', source=PROGRAM)['labels'] == {'L': 2, 'E': 7}
+    result = call(server, 'step', count=2)
+    assert (result['status'], result['steps'], result['regs']['A']) == ('budget', 2, 4)
+    assert call(server, 'run')['regs']['PC'] == 9
+    assert call(server, 'reset')['regs'] == {'A': 0, 'B': 0, 'I': 0, 'PC': 0}
+    assert call(server, 'dump', start=0, end=1)['memory'] == [0xB6, 0x05]
+    assert len(call(server, 'dump', start=0xFE, end=0x01)['memory']) == 4
+
+
+def test_images_are_reused(server):
+    assert call(server, 'assemble', source=PROGRAM)['cached'] is False
+    assert call(server, 'assemble', source=PROGRAM, session='other')['cached'] is True
+    assert len(server.images) == 1
+    # Cada sessão tem a sua CPU: a imagem compartilhada não muda
+    call(server, 'run')
+    assert call(server, 'dump', session='other', start=0x80, end=0x80)['memory'] == [0]
+
+
+def test_sessions_are_independent(server):
+    call(server, 'assemble', source=PROGRAM, session=1)
+    call(server, 'assemble', source="mov B, 07H", session=2)
+    call(server, 'step', session=1)
+    assert call(server, 'run', session=2)['regs']['B'] == 7
+    assert call(server, 'step', session=1)['regs']['PC'] == 3
+    call(server, 'close', session=1)
+    assert call(server, 'run', session=1) == {'code': APP_ERROR, 'message': "No program loaded"}
+
+
+def test_least_recently_used_session_is_dropped():
+    server = Server(max_sessions=2)
+    call(server, 'assemble', source="mov B, 01H", session='a')
+    call(server, 'assemble', source="mov B, 02H", session='b')
+    call(server, 'step', session='a')
+    call(server, 'assemble', source="mov B, 03H", session='c')
+    assert list(server.sessions) == ['a', 'c']
+    assert call(server, 'dump', session='a', start=0, end=1)['memory'] == [0xB7, 0x01]
+    assert call(server, 'run', session='b') == {'code': APP_ERROR, 'message': "No program loaded"}
+    assert len(server.sessions) == 2
+
+
+@pytest.mark.parametrize("line, code", [
+    ("not json", PARSE_ERROR),
+    ("[]", INVALID_REQUEST),
+    ('{"id": 1, "method": "run"}', INVALID_REQUEST),
+    (request('explode'), METHOD_NOT_FOUND),
+    (request('step', count=1, bogus=2), INVALID_PARAMS),
+    ('{"jsonrpc": "2.0", "id": 1, "method": "run", "params": [1]}', INVALID_PARAMS),
+    (request('run', source="jmp NOWHERE"), APP_ERROR),
+])
+def test_errors(server, line, code):
+    assert json.loads(server.handle_line(line))['error']['code'] == code
+
+
+def test_batch_and_notifications(server):
+    batch = [
+        {'jsonrpc': '2.0', 'method': 'assemble', 'params': {'source': PROGRAM}},
+        {'jsonrpc': '2.0', 'id': 'a', 'method': 'run', 'params': {}},
+    ]
+    responses = json.loads(server.handle_line(json.dumps(batch)))
+    assert [r['id'] for r in responses] == ['a']
+    assert server.handle_line(json.dumps(batch[0])) is None
+
+
+# =========================================================
+# TRANSPORTES
+# =========================================================
+def test_stdio_daemon():
+    lines = [request('assemble', rid=k, source=PROGRAM) if k == 0 else request('run', rid=k, source=PROGRAM)
+             for k in range(50)]
+    result = subprocess.run([sys.executable, "Z70.py", "serve"], cwd=ROOT, input="\n".join(lines) + "\n",
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    responses = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r['id'] for r in responses] == list(range(50))
+    assert all(r['result']['regs']['PC'] == 9 for r in responses[1:])
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="sem sockets Unix")
+def test_unix_socket_concurrent_sessions(server, tmp_path):
+    path = str(tmp_path / "z70.sock")
+    unix = server.unix_server(path)
+    thread = threading.Thread(target=unix.serve_forever, daemon=True)
+    thread.start()
+    results = {}
+
+    def client(n):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(path)
+            f = s.makefile('rw')
+            out = []
+            for k in range(20):
+                f.write(request('run', rid=k, session=n, source=f"mov A, {n:02X}H\ninc A") + "\n")
+                f.flush()
+                out.append(json.loads(f.readline())['result']['regs']['A'])
+            results[n] = out
+
+    try:
+        clients = [threading.Thread(target=client, args=(n,)) for n in range(4)]
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join(30)
+    finally:
+        unix.shutdown()
+        unix.server_close()
+        os.remove(path)
+    assert results == {n: [n + 1] * 20 for n in range(4)}
+
+
+def test_remove_socket_refuses_other_files(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("importante")
+    with pytest.raises(ValueError, match="Not a socket"):
+        remove_socket(str(path))
+    with pytest.raises(ValueError):
+        Server().unix_server(str(path))
+    assert path.read_text() == "importante"
+    remove_socket(str(tmp_path / "missing.sock"))
+
+
+def test_cli_serve_keeps_regular_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("importante")
+    result = subprocess.run([sys.executable, "Z70.py", "serve", "--socket", str(path)],
+                            cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 2
+    assert "Not a socket" in result.stderr
+    assert path.read_text() == "importante"
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import core.codegen as codegen
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SAMPLE = ROOT / "code_samples" / "hello_world.z70"
+
+# Módulos que uma execução simples do Z70.py não pode importar
+FORBIDDEN = ("tkinter", "gui", "multiprocessing", "concurrent.futures", "socketserver",
+             "numpy", "core.batch", "core.server", "core.devices")
+
+# Limite (ms) do tempo de importação, só verificado com Z70_STARTUP_BUDGET
+# definida: medir tempo de parede numa máquina carregada dá falhas ao acaso.
+# O limite de referência fica em benchmarks/bench_startup.py
+IMPORT_BUDGET_MS = os.environ.get("Z70_STARTUP_BUDGET")
+
+
+def importtime(*args):
+    """{módulo: tempo próprio em µs} de `python -X importtime args` (com bytecode em cache)."""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    cmd = [sys.executable, "-X", "importtime", *args]
+    subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, check=True)   # aquece .pyc e caches
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def test_cli_imports_only_the_run_path():
+    mods = importtime(str(ROOT / "Z70.py"), str(SAMPLE))
+    assert "core.CPU" in mods and "core.objfile" in mods
+    for name in FORBIDDEN:
+        assert not any(m == name or m.startswith(name + ".") for m in mods), name
+
+
+@pytest.mark.skipif(not IMPORT_BUDGET_MS, reason="Z70_STARTUP_BUDGET não definida")
+def test_cli_import_time_budget():
+    base = importtime("-c", "pass")
+    mods = importtime(str(ROOT / "Z70.py"), str(SAMPLE))
+    extra = sum(us for m, us in mods.items() if m not in base) / 1000
+    assert extra < float(IMPORT_BUDGET_MS), f"{extra:.1f} ms de importação"
+
+
+def test_handlers_are_built_on_first_use():
+    code = "import core.CPU, core.codegen as c; print(sorted(c._handlers)); c.BYTE_HANDLERS; print(sorted(c._handlers))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.split("\n")[:2] == ["[]", "[False]"]
+
+
+def test_compiled_code_is_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("Z70_CACHE_DIR", str(tmp_path))
+    src = "def f(x):\n    return x + 1\n"
+    first = codegen.compiled(src, "<teste>")
+    assert len(os.listdir(tmp_path / "code")) == 1
+    second = codegen.compiled(src, "<teste>")
+    assert first == second
+    ns = {}
+    exec(second, ns)
+    assert ns["f"](1) == 2
+
+
+def test_corrupt_code_cache_recompiles(tmp_path, monkeypatch):
+    monkeypatch.setenv("Z70_CACHE_DIR", str(tmp_path))
+    src = "X = 42\n"
+    codegen.compiled(src, "<teste>")
+    (path,) = (tmp_path / "code").iterdir()
+    path.write_bytes(b"lixo")
+    ns = {}
+    exec(codegen.compiled(src, "<teste>"), ns)
+    assert ns["X"] == 42
@@ -0,0 +1,125 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.trace import TraceRecorder, COLUMNS, NO_WRITE, MAGIC, read_trace, iter_chunks, trace_to_npz
+
+from test_cpu import SAMPLES, make_cpu
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SRC = """
+    mov I, 80H
+    mov B, 03H
+LOOP:
+    mov A, B
+    mov [I], A
+    inc I
+    dec B
+    jz END
+    jmp LOOP
+END:
+    mov [F0H], A
+"""
+
+
+def expected_records(src):
+    """Registros esperados, montados passo a passo comparando a memória."""
+    cpu = make_cpu(src)
+    out = []
+    while cpu.PC < cpu.program_end:
+        pc, before = cpu.PC, bytes(cpu.mem)
+        op, arg = cpu.mem[pc], cpu.mem[pc + 1]
+        cpu.step()
+        changed = [a for a in range(256) if cpu.mem[a] != before[a]]
+        waddr, wval = (changed[0], cpu.mem[changed[0]]) if changed else (NO_WRITE, 0)
+        out.append([pc, op, arg, cpu.A, cpu.B, cpu.I, cpu.FLAGS, wval, waddr])
+    return out
+
+
+def check(records, expected):
+    assert len(records) == len(expected)
+    for got, exp in zip(records, expected):
+        got = dict(zip(COLUMNS, got))
+        exp = dict(zip(COLUMNS, exp))
+        # instruções de 1 byte registram operando 0
+        if got['arg'] == 0:
+            exp['arg'] = 0
+        # escrita do mesmo valor não muda a memória
+        if exp['waddr'] == NO_WRITE and got['waddr'] != NO_WRITE:
+            exp['waddr'], exp['wval'] = got['waddr'], got['wval']
+        assert got == exp
+
+
+def test_in_memory_records():
+    cpu = make_cpu(SRC)
+    tracer = TraceRecorder(cpu)
+    cpu.run()
+    check(tracer.records(), expected_records(SRC))
+    assert tracer.records()[-1][COLUMNS.index('waddr')] == 0xF0
+
+
+def test_ring_keeps_last_records():
+    cpu = make_cpu(SRC)
+    tracer = TraceRecorder(cpu, capacity=5)
+    cpu.run()
+    exp = expected_records(SRC)
+    assert tracer.count == len(exp)
+    check(tracer.records(), exp[-5:])
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_file_streams_in_chunks(path, tmp_path):
+    src = path.read_text(encoding="utf-8")
+    out = tmp_path / "t.z70t"
+    cpu = make_cpu(src)
+    tracer = TraceRecorder(cpu, str(out), capacity=7)
+    cpu.run()
+    tracer.close()
+    assert cpu.trace is None
+    assert out.read_bytes().startswith(MAGIC)
+    assert all(len(c['pc']) <= 7 for c in iter_chunks(str(out)))
+
+    ref = make_cpu(src)
+    mem_tracer = TraceRecorder(ref, capacity=100000)
+    ref.run()
+    cols = read_trace(str(out))
+    rows = list(zip(*(cols[name] for name in COLUMNS)))
+    assert rows == mem_tracer.records()
+
+
+def test_tracing_does_not_change_result():
+    plain = make_cpu(SRC)
+    plain.run()
+    traced = make_cpu(SRC)
+    TraceRecorder(traced)
+    traced.run()
+    assert (traced.regs(), traced.flags(), traced.mem) == (plain.regs(), plain.flags(), plain.mem)
+
+
+def test_npz_export(tmp_path):
+    np = pytest.importorskip("numpy")
+    out = tmp_path / "t.z70t"
+    cpu = make_cpu(SRC)
+    tracer = TraceRecorder(cpu, str(out), capacity=4)
+    cpu.run()
+    tracer.close()
+    trace_to_npz(str(out), str(tmp_path / "t.npz"))
+    data = np.load(tmp_path / "t.npz")
+    pcs = np.concatenate([data[k] for k in sorted(data.files) if k.startswith("pc_")])
+    assert pcs.tolist() == list(read_trace(str(out))['pc'])
+
+
+def test_cli_trace_flag(tmp_path):
+    src = tmp_path / "p.z70"
+    src.write_text(SRC, encoding="utf-8")
+    out = tmp_path / "p.z70t"
+    result = subprocess.run(
+        [sys.executable, "Z70.py", str(src), "--trace", str(out)],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Trace:" in result.stdout
+    assert len(read_trace(str(out))['pc']) == len(expected_records(SRC))
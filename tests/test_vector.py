@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.CPU import CPU
+from core.objfile import build
+from core.vector import VectorCPU, HALTED, ERROR
+
+from test_cpu import SAMPLES, make_cpu, random_program
+
+
+def cpu_state(cpu):
+    return cpu.A, cpu.B, cpu.I, cpu.FLAGS, cpu.PC, bytes(cpu.mem)
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_vector_matches_cpu_on_samples(path):
+    ref = make_cpu(path.read_text(encoding="utf-8"))
+    vec = VectorCPU(ref.mem, ref.program_end, n=3)
+    ref.run()
+    vec.run()
+    assert (vec.status == HALTED).all()
+    for k in range(3):
+        assert vec.state(k) == cpu_state(ref)
+        assert vec.regs(k) == ref.regs()
+        assert vec.flags(k) == ref.flags()
+
+
+def test_vector_diverging_instances():
+    src = """
+        mov I, A0H
+    LOOP:
+        shr [I]
+        jc ODD
+        inc A
+        jmp NEXT
+    ODD:
+        inc B
+    NEXT:
+        inc I
+        cmp I, A8H
+        jz END
+        jmp LOOP
+    END:
+        nop
+    """
+    base = make_cpu(src)
+    rng = random.Random(1)
+    mems = []
+    for _ in range(64):
+        m = list(base.mem)
+        for a in range(0xA0, 0xA8):
+            m[a] = rng.randrange(256)
+        mems.append(m)
+
+    vec = VectorCPU(base.mem, base.program_end, mems=mems)
+    vec.run()
+    for k, m in enumerate(mems):
+        cpu = CPU(m, {})
+        cpu.program_end = base.program_end
+        cpu.run()
+        assert vec.state(k) == cpu_state(cpu)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_vector_random_programs_and_registers(seed):
+    rng = random.Random(seed)
+    mem, end = random_program(rng)
+    n = 16
+    regs = {r: [rng.randrange(256) for _ in range(n)] for r in ("A", "B")}
+    vec = VectorCPU(mem, end, n=n, I=0xC0, **regs)
+    vec.run()
+    for k in range(n):
+        cpu = CPU(mem, {})
+        cpu.program_end = end
+        cpu.A, cpu.B, cpu.I = regs["A"][k], regs["B"][k], 0xC0
+        try:
+            cpu.run()
+            assert vec.status[k] == HALTED
+        except (ValueError, IndexError) as e:
+            assert vec.status[k] == ERROR
+            assert vec.errors[k] == str(e)
+        assert vec.state(k) == cpu_state(cpu)
+
+
+def test_vector_out_of_range_error_matches_cpu():
+    mem = [0] * 256
+    mem[0xFF] = build("mov A, 05H").mem[0]    # o byte extra estaria em 100H
+    cpu = CPU(mem, {})
+    cpu.program_end = 256
+    cpu.PC = 0xFF
+    with pytest.raises(IndexError) as info:
+        cpu.run()
+    vec = VectorCPU(mem, 256, n=2, PC=0xFF)
+    vec.run()
+    assert (vec.status == ERROR).all()
+    assert vec.errors == {0: str(info.value), 1: str(info.value)}
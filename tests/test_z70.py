@@ -1,145 +1,81 @@
-
 #TESTES AUTOMATIZADOS USANDO O CHAT GPT
 
+# Os programas rodam no próprio processo (core.api.run_source), sem abrir um
+# Python por teste; só o formato de saída do Z70.py passa por Z70.main().
 
+import pytest
 
-import subprocess
-import tempfile
-import os
-import sys
-
+import Z70
+from core.api import run_source
 
-def run_z70(src_code):
-    """
-    Executa um programa Z70 e retorna o stdout real do emulador.
-    """
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".z70", mode="w") as f:
-        f.write(src_code)
-        src_path = f.name
 
-    out_file = tempfile.NamedTemporaryFile(delete=False)
-    out_file.close()
+def run_z70(src_code, **options):
+    """Monta e executa um programa Z70 e devolve o RunResult."""
+    return run_source(src_code, **options)
 
-    result = subprocess.run(
-        [
-            sys.executable,
-            "Z70.py",
-            src_path,
-            "00h-FFh",
-            out_file.name
-        ],
-        capture_output=True,
-        text=True
-    )
 
-    os.remove(src_path)
-    os.remove(out_file.name)
-
-    return result.stdout
+def check(result, **expected):
+    """Compara registradores (A, B, I, PC) e flags (OF, CF, ZF, PF, SF) pedidos."""
+    state = {**result.regs, **result.flags}
+    assert {k: state[k] for k in expected} == expected
 
 
 # =========================================================
-# TESTES BÁSICOS DE REGISTRADORES
+# PROGRAMAS: (fonte, registradores/flags esperados)
 # =========================================================
-
-def test_add_mov_registers():
-    src = """
+CASES = [
+    # ---------- Registradores ----------
+    pytest.param("""
         mov A, 05H
         mov B, 03H
         add A, B
-    """
-    out = run_z70(src)
-    assert "A=08H" in out
-
-
-def test_sub_registers():
-    src = """
+    """, dict(A=0x08), id="add_mov_registers"),
+    pytest.param("""
         mov A, 05H
         mov B, 02H
         sub A, B
-    """
-    out = run_z70(src)
-    assert "A=03H" in out
+    """, dict(A=0x03), id="sub_registers"),
 
-
-# =========================================================
-# TESTES DE FLAGS
-# =========================================================
-
-def test_zero_flag():
-    src = """
+    # ---------- Flags ----------
+    pytest.param("""
         mov A, 00H
         sub A, 00H
-    """
-    out = run_z70(src)
-    assert "ZF=1" in out
-
-
-def test_carry_flag():
-    src = """
+    """, dict(ZF=1), id="zero_flag"),
+    pytest.param("""
         mov A, 01H
         sub A, 02H
-    """
-    out = run_z70(src)
-    assert "CF=1" in out
-
-
-def test_overflow_flag():
-    src = """
+    """, dict(CF=1), id="carry_flag"),
+    pytest.param("""
         mov A, 7FH
         add A, 01H
-    """
-    out = run_z70(src)
-    assert "OF=1" in out
-
-
-# =========================================================
-# CONTROLE DE FLUXO
-# =========================================================
+    """, dict(OF=1), id="overflow_flag"),
 
-def test_jump_zero():
-    src = """
+    # ---------- Controle de fluxo ----------
+    pytest.param("""
         mov A, 00H
         sub A, 00H
         jz SKIP
         mov B, FFH
     SKIP:
         nop
-    """
-    out = run_z70(src)
-    assert "B=00H" in out
-
-
-def test_unconditional_jump():
-    src = """
+    """, dict(B=0x00), id="jump_zero"),
+    pytest.param("""
         mov A, 01H
         jmp END
         mov A, FFH
     END:
         nop
-    """
-    out = run_z70(src)
-    assert "A=01H" in out
-
-
-# =========================================================
-# MEMÓRIA
-# =========================================================
+    """, dict(A=0x01), id="unconditional_jump"),
 
-def test_memory_store_load():
-    src = """
+    # ---------- Memória ----------
+    pytest.param("""
         mov I, 10H
         mov A, 05H
         mov [I], A
         mov A, 00H
         mov A, [I]
-    """
-    out = run_z70(src)
-    assert "A=05H" in out
-
-
-def test_multiple_memory_positions():
-    src = """
+    """, dict(A=0x05), id="memory_store_load"),
+    pytest.param("""
         mov I, 20H
         mov A, 0AH
         mov [I], A
@@ -148,17 +84,10 @@ def test_multiple_memory_positions():
         mov [I], A
         dec I
         mov A, [I]
-    """
-    out = run_z70(src)
-    assert "A=0AH" in out
+    """, dict(A=0x0A), id="multiple_memory_positions"),
 
-
-# =========================================================
-# LOOPS
-# =========================================================
-
-def test_loop_countdown():
-    src = """
+    # ---------- Laços ----------
+    pytest.param("""
         mov A, 05H
     LOOP:
         dec A
@@ -166,13 +95,8 @@ def test_loop_countdown():
         jmp LOOP
     END:
         nop
-    """
-    out = run_z70(src)
-    assert "A=00H" in out
-
-
-def test_loop_with_counter():
-    src = """
+    """, dict(A=0x00), id="loop_countdown"),
+    pytest.param("""
         mov A, 03H
         mov B, 00H
     LOOP:
@@ -182,49 +106,24 @@ def test_loop_with_counter():
         jmp LOOP
     END:
         nop
-    """
-    out = run_z70(src)
-    assert "B=03H" in out
-
-
-# =========================================================
-# TESTES SURREAIS (EDGE CASES)
-# =========================================================
+    """, dict(B=0x03), id="loop_with_counter"),
 
-def test_overflow_and_carry_together():
-    src = """
+    # ---------- Testes surreais (edge cases) ----------
+    pytest.param("""
         mov A, FFH
         add A, 01H
-    """
-    out = run_z70(src)
-    assert "A=00H" in out
-    assert "CF=1" in out
-    assert "ZF=1" in out
-
-
-def test_double_borrow_chain():
-    src = """
+    """, dict(A=0x00, CF=1, ZF=1), id="overflow_and_carry_together"),
+    pytest.param("""
         mov A, 00H
         sub A, 01H
         sub A, 01H
-    """
-    out = run_z70(src)
-    assert "A=FEH" in out
-    assert "CF=1" in out
-
-
-def test_zero_flag_turns_off():
-    src = """
+    """, dict(A=0xFE, CF=1), id="double_borrow_chain"),
+    pytest.param("""
         mov A, 00H
         sub A, 00H
         add A, 01H
-    """
-    out = run_z70(src)
-    assert "ZF=0" in out
-
-
-def test_self_overwriting_memory():
-    src = """
+    """, dict(ZF=0), id="zero_flag_turns_off"),
+    pytest.param("""
         mov I, 30H
         mov A, 0AH
         mov [I], A
@@ -232,13 +131,8 @@ def test_self_overwriting_memory():
         inc A
         mov [I], A
         mov A, [I]
-    """
-    out = run_z70(src)
-    assert "A=0BH" in out
-
-
-def test_minimal_loop():
-    src = """
+    """, dict(A=0x0B), id="self_overwriting_memory"),
+    pytest.param("""
         mov A, 01H
     LOOP:
         dec A
@@ -246,13 +140,8 @@ def test_minimal_loop():
         jmp LOOP
     END:
         nop
-    """
-    out = run_z70(src)
-    assert "A=00H" in out
-
-
-def test_jump_inside_jump():
-    src = """
+    """, dict(A=0x00), id="minimal_loop"),
+    pytest.param("""
         mov A, 00H
         jz FIRST
         mov A, FFH
@@ -264,26 +153,15 @@ def test_jump_inside_jump():
     SECOND:
         inc B
         nop
-    """
-    out = run_z70(src)
-    assert "A=00H" in out
-    assert "B=02H" in out
-
-
-def test_memory_edge_address():
-    src = """
+    """, dict(A=0x00, B=0x02), id="jump_inside_jump"),
+    pytest.param("""
         mov I, FFH
         mov A, 55H
         mov [I], A
         mov A, 00H
         mov A, [I]
-    """
-    out = run_z70(src)
-    assert "A=55H" in out
-
-
-def test_register_dual_role():
-    src = """
+    """, dict(A=0x55), id="memory_edge_address"),
+    pytest.param("""
         mov I, 40H
         mov A, 03H
     LOOP:
@@ -295,28 +173,98 @@ def test_register_dual_role():
     END:
         dec I
         mov A, [I]
-    """
-    out = run_z70(src)
-    assert "A=01H" in out
-
-
-def test_flag_change_without_value_change():
-    src = """
+    """, dict(A=0x01), id="register_dual_role"),
+    pytest.param("""
         mov A, 01H
         add A, 00H
-    """
-    out = run_z70(src)
-    assert "A=01H" in out
-    assert "ZF=0" in out
+    """, dict(A=0x01, ZF=0), id="flag_change_without_value_change"),
+]
+
+
+@pytest.mark.parametrize("src, expected", CASES)
+def test_program(src, expected):
+    result = run_z70(src)
+    assert result.halted
+    check(result, **expected)
 
 
 def test_nop_stability():
-    src = """
+    result = run_z70("""
         nop
         nop
         nop
         nop
+    """)
+    assert result.halted and result.steps == 4
+    check(result, A=0, B=0, I=0, PC=4)
+
+
+def test_result_has_memory_dump_and_listing():
+    result = run_z70("""
+        mov I, FFH
+        mov A, 55H
+        mov [I], A
+    """, dump=(0xFE, 0x00))
+    assert result.dump == [0x00, 0x55, 0xB8]     # 00H: mov I, FFH
+    assert len(result.memory) == 256 and result.memory[0xFF] == 0x55
+    assert [addr for addr, _, _ in result.listing] == [0x00, 0x02, 0x04]
+
+
+# =========================================================
+# LIMITES DE EXECUÇÃO
+# =========================================================
+LOOP_SRC = """
+    LOOP:
+        inc A
+        jmp LOOP
     """
-    out = run_z70(src)
+
+
+def test_detects_infinite_loop():
+    result = run_z70(LOOP_SRC, detect_loops=True)
+    assert result.status == 'loop' and result.outcome.loop == (0x00, 0x01)
+
+
+def test_step_budget():
+    result = run_z70(LOOP_SRC, max_steps=7)
+    assert result.status == 'budget' and result.steps == 7
+    check(result, A=0x04)
+
+
+# =========================================================
+# SAÍDA DO Z70.py
+# =========================================================
+def run_cli(capsys, tmp_path, src, *options):
+    path = tmp_path / "prog.z70"
+    path.write_text(src, encoding="utf-8")
+    code = 0
+    try:
+        Z70.main([str(path), *options])
+    except SystemExit as e:
+        code = e.code
+    return code, capsys.readouterr().out
+
+
+def test_cli_output(capsys, tmp_path):
+    code, out = run_cli(capsys, tmp_path, "mov A, 48H\nmov [80H], A", "80H-81H", "--no-cache")
+    assert code == 0
+    assert out.splitlines() == [
+        "REGS:  A=48H B=00H I=00H PC=04H",
+        "FLAGS: OF=0 CF=0 ZF=0 PF=0 SF=0",
+        "DUMP: 80H:48H 81H:00H",
+        "ASCII: H.",
+    ]
+
+
+def test_cli_detects_infinite_loop(capsys, tmp_path):
+    code, out = run_cli(capsys, tmp_path, LOOP_SRC, "--detect-loops")
+    assert code == 2
     assert "REGS:" in out
-    assert "FLAGS:" in out
+    assert "STOP: infinite loop at 00H-01H" in out
+
+
+def test_cli_step_budget(capsys, tmp_path):
+    code, out = run_cli(capsys, tmp_path, LOOP_SRC, "--max-steps", "7")
+    assert code == 2
+    assert "A=04H" in out
+    assert "STOP: step budget exhausted after 7 steps" in out